@@ -0,0 +1,38 @@
+"""Dumbbell bundle-adjustment residuals on the tests/test_cavity cameras."""
+
+from pathlib import Path
+
+import numpy as np
+
+from pyptv import ptv
+from pyptv.benchmark import case
+from pyptv.processing import start_processing
+
+TESTS = Path(__file__).resolve().parents[1] / "tests"
+DB_LENGTH = 25.0
+
+
+def _dumbbells(ctx, n_frames):
+    from optv.imgcoord import image_coordinates
+
+    ctx.copy_dataset(TESTS / "test_cavity")
+    exp = start_processing("parameters_Run1.yaml")
+    rng = np.random.default_rng(0)
+    centers = rng.uniform([-20, -20, -10], [20, 20, 10], size=(n_frames, 3))
+    axes = rng.normal(size=(n_frames, 3))
+    axes *= DB_LENGTH / 2 / np.linalg.norm(axes, axis=1, keepdims=True)
+    ends = np.stack([centers - axes, centers + axes], axis=1)
+    mm = exp.cpar.get_multimedia_params()
+    targets = np.stack(
+        [image_coordinates(ends.reshape(-1, 3), cal, mm).reshape(n_frames, 2, 2) for cal in exp.cals]
+    )
+    active = np.ones(exp.num_cams, dtype=bool)
+    cams = np.concatenate([np.r_[cal.get_pos(), cal.get_angles()] for cal in exp.cals])
+    calib_vec = np.concatenate([cams, ends.ravel()])
+    return calib_vec, targets, exp.cpar, exp.cals, active
+
+
+@case(setup=_dumbbells, params={"n_frames": [100, 1_000]}, items="n_frames")
+def dumbbell_ba_residuals(state, n_frames):
+    calib_vec, targets, cpar, cals, active = state
+    ptv.dumbbell_ba_residuals(calib_vec, targets, cpar, cals, active, DB_LENGTH, 1.0)
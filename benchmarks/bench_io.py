@@ -0,0 +1,73 @@
+"""Reading and writing _targets files of generated sizes, and reading the
+cavity images from files, raw dumps, TIFF stacks and an HDF5 frame store."""
+
+from pathlib import Path
+
+import numpy as np
+
+from pyptv import ptv
+from pyptv.benchmark import case
+from pyptv.frame_source import (
+    FileFrameSource,
+    HDF5FrameSource,
+    RawFrameSource,
+    TiffStackFrameSource,
+    ingest_sequence,
+)
+
+TESTS = Path(__file__).resolve().parents[1] / "tests"
+CAVITY_IMAGES = [f"img/cam{cam}.%d" for cam in range(1, 5)]
+CAVITY_FRAMES = range(10000, 10005)
+
+
+def _targets(ctx, n_targets):
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 2048, size=(n_targets, 2))
+    targs = ptv.targets_from_positions(xy, np.arange(n_targets))
+    ptv.write_targets(targs, "cam1", 1)
+    return targs
+
+
+@case(setup=_targets, params={"n_targets": [1_000, 10_000, 100_000]}, items="n_targets")
+def write_targets(targs, n_targets):
+    ptv.write_targets(targs, "cam1", 1)
+
+
+@case(setup=_targets, params={"n_targets": [1_000, 10_000, 100_000]}, items="n_targets")
+def read_targets(targs, n_targets):
+    ptv.read_targets("cam1", 1)
+
+
+def _frame_source(ctx, store):
+    ctx.copy_dataset(TESTS / "test_cavity")
+    files = FileFrameSource(CAVITY_IMAGES)
+    if store == "files":
+        return files
+    if store == "raw":
+        paths = [f"img/cam{cam + 1}.raw" for cam in range(files.num_cams)]
+        for cam, path in enumerate(paths):
+            with open(path, "wb") as f:
+                for frame in CAVITY_FRAMES:
+                    f.write(files.read(cam, frame).tobytes())
+        return RawFrameSource(paths, width=1280, height=1024, first_frame=CAVITY_FRAMES[0])
+    if store == "tiff_stack":
+        import tifffile
+
+        paths = [f"img/cam{cam + 1}_stack.tif" for cam in range(files.num_cams)]
+        for cam, path in enumerate(paths):
+            tifffile.imwrite(path, np.stack([files.read(cam, frame) for frame in CAVITY_FRAMES]))
+        return TiffStackFrameSource(paths, first_frame=CAVITY_FRAMES[0])
+    ingest_sequence(CAVITY_IMAGES, CAVITY_FRAMES, "img/frames.h5", complib=store)
+    return HDF5FrameSource("img/frames.h5")
+
+
+@case(
+    setup=_frame_source,
+    params={"store": ["files", "raw", "tiff_stack", "blosc:lz4", "zlib"]},
+    items=len(CAVITY_IMAGES) * len(CAVITY_FRAMES),
+)
+def read_frames(source, store):
+    # touch every pixel, or mapped raw frames would never be read
+    for frame in CAVITY_FRAMES:
+        for cam in range(source.num_cams):
+            source.read(cam, frame).max()
@@ -0,0 +1,19 @@
+"""Scaling of the parallel sequence batch over worker processes."""
+
+from pathlib import Path
+
+from pyptv.benchmark import case
+
+TESTS = Path(__file__).resolve().parents[1] / "tests"
+FIRST, LAST = 10000, 10004
+
+
+def _cavity(ctx, workers):
+    return ctx.copy_dataset(TESTS / "test_cavity") / "parameters_Run1.yaml"
+
+
+@case(setup=_cavity, params={"workers": [1, 2, 4]}, items=LAST - FIRST + 1, repeat=3)
+def sequence_batch(yaml_file, workers):
+    from pyptv.pyptv_batch_parallel import main as run_parallel
+
+    run_parallel(yaml_file, FIRST, LAST, n_processes=workers, mode="sequence")
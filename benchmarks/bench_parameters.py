@@ -0,0 +1,24 @@
+"""Start-up of a processing run from a compiled parameter bundle."""
+
+from pathlib import Path
+
+from pyptv import parameter_cache
+from pyptv.benchmark import case
+from pyptv.parameter_cache import compile_parameters
+from pyptv.processing import start_processing
+
+TESTS = Path(__file__).resolve().parents[1] / "tests"
+
+
+def _bundle(ctx, cached):
+    ctx.copy_dataset(TESTS / "test_cavity")
+    return compile_parameters("parameters_Run1.yaml")
+
+
+@case(setup=_bundle, params={"cached": [True, False]}, items=1)
+def start_processing_bundle(bundle, cached):
+    # what a batch worker or a GUI reload does with unchanged parameters;
+    # cached=False builds the optv parameter objects field by field
+    if not cached:
+        parameter_cache._optv_objects.clear()
+    start_processing(bundle)
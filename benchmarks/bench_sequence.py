@@ -0,0 +1,139 @@
+"""Sequence-step hot paths on one frame of tests/test_cavity (4 cameras)."""
+
+from pathlib import Path
+
+import numpy as np
+
+from pyptv import ptv
+from pyptv.benchmark import case
+from pyptv.processing import start_processing
+
+TESTS = Path(__file__).resolve().parents[1] / "tests"
+FRAME = 10000
+
+
+def _cavity(ctx):
+    ctx.copy_dataset(TESTS / "test_cavity")
+    exp = start_processing("parameters_Run1.yaml", FRAME, FRAME)
+    names = [exp.spar.get_img_base_name(i) % FRAME for i in range(exp.num_cams)]
+    images = [ptv.imread(name) for name in names]
+    high_pass = [ptv.simple_highpass(img, exp.cpar) for img in images]
+    detections = []
+    corrected = []
+    for i_cam, img in enumerate(high_pass):
+        targs = ptv.target_recognition(img, exp.tpar, i_cam, exp.cpar)
+        targs.sort_y()
+        detections.append(targs)
+        corrected.append(ptv.MatchedCoords(targs, exp.cpar, exp.cals[i_cam]))
+    sorted_pos, sorted_corresp, _ = ptv.correspondences(
+        detections, corrected, exp.cals, exp.vpar, exp.cpar
+    )
+    sorted_corresp = np.concatenate(sorted_corresp, axis=1)
+    flat = np.array(
+        [corr.get_by_pnrs(corresp) for corr, corresp in zip(corrected, sorted_corresp)]
+    ).transpose(1, 0, 2)
+    return {
+        "exp": exp,
+        "names": names,
+        "images": images,
+        "high_pass": high_pass,
+        "detections": detections,
+        "corrected": corrected,
+        "flat": flat,
+    }
+
+
+def _num_cams(state):
+    return len(state["images"])
+
+
+@case(setup=_cavity, items=_num_cams)
+def decode(state):
+    for name in state["names"]:
+        ptv.imread(name)
+
+
+@case(setup=_cavity, items=_num_cams)
+def highpass(state):
+    cpar = state["exp"].cpar
+    for img in state["images"]:
+        ptv.simple_highpass(img, cpar)
+
+
+@case(setup=_cavity, items=_num_cams)
+def detection(state):
+    exp = state["exp"]
+    for i_cam, img in enumerate(state["high_pass"]):
+        ptv.target_recognition(img, exp.tpar, i_cam, exp.cpar)
+
+
+@case(setup=_cavity, items=_num_cams)
+def matched_coords(state):
+    exp = state["exp"]
+    for i_cam, targs in enumerate(state["detections"]):
+        ptv.MatchedCoords(targs, exp.cpar, exp.cals[i_cam])
+
+
+@case(setup=_cavity, items=1)
+def correspondences(state):
+    exp = state["exp"]
+    ptv.correspondences(state["detections"], state["corrected"], exp.cals, exp.vpar, exp.cpar)
+
+
+@case(setup=_cavity, items=lambda state: state["flat"].shape[0])
+def determination(state):
+    exp = state["exp"]
+    ptv.point_positions(state["flat"], exp.cpar, exp.cals, exp.vpar)
+
+
+def _frame(ctx):
+    ctx.copy_dataset(TESTS / "test_cavity")
+    return start_processing("parameters_Run1.yaml", FRAME, FRAME)
+
+
+@case(setup=_frame, items=1)
+def sequence_loop(exp):
+    ptv.py_sequence_loop(exp)
+
+
+def _synthetic_points(ctx, n_points):
+    """Exact projections of random points in the cavity volume."""
+    from optv.imgcoord import image_coordinates
+
+    exp = _frame(ctx)
+    rng = np.random.default_rng(0)
+    xyz = rng.uniform([-30, -30, -15], [30, 30, 15], size=(n_points, 3))
+    mm = exp.cpar.get_multimedia_params()
+    flat = np.stack([image_coordinates(xyz, cal, mm) for cal in exp.cals], axis=1)
+    return exp, flat
+
+
+@case(setup=_synthetic_points, params={"n_points": [1_000, 10_000, 100_000]}, items="n_points")
+def determination_synthetic(state, n_points):
+    exp, flat = state
+    ptv.point_positions(flat, exp.cpar, exp.cals, exp.vpar)
+
+
+
+def _sensor_image(ctx, workers=None):
+    """A sparse particle image of a 25 MP sensor."""
+    from optv.parameters import ControlParams
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 20, size=(5120, 5120), dtype=np.uint8)
+    img[rng.random(img.shape) < 0.002] = 250
+    cpar = ControlParams(1)
+    cpar.set_image_size((img.shape[1], img.shape[0]))
+    return img, cpar
+
+
+@case(setup=_sensor_image, items=1, repeat=3)
+def highpass_25mp(state):
+    img, cpar = state
+    ptv.simple_highpass(img, cpar)
+
+
+@case(setup=_sensor_image, params={"workers": [1, 2, 4, 8]}, items=1, repeat=3)
+def highpass_25mp_numpy(state, workers):
+    img, cpar = state
+    ptv.simple_highpass(img, cpar, backend="numpy", workers=workers)
@@ -0,0 +1,40 @@
+"""Sequence step and renderer on generated particle images of increasing density."""
+
+from pathlib import Path
+
+import numpy as np
+
+from pyptv import ptv
+from pyptv.benchmark import case
+from pyptv.processing import start_processing
+from pyptv.synthetic_sequence import (
+    ParticleSequenceSpec,
+    render_particle_sequence,
+    render_particles,
+)
+
+TESTS = Path(__file__).resolve().parents[1] / "tests"
+FRAME = 10000
+
+
+def _rendered(ctx, n_particles):
+    ctx.copy_dataset(TESTS / "test_cavity")
+    spec = ParticleSequenceSpec(n_particles=n_particles, first=FRAME, last=FRAME)
+    render_particle_sequence(Path("parameters_Run1.yaml"), spec)
+    return start_processing("parameters_Run1.yaml", FRAME, FRAME)
+
+
+@case(setup=_rendered, params={"n_particles": [1_000, 5_000, 10_000]}, items="n_particles", repeat=3)
+def sequence_loop(exp, n_particles):
+    ptv.py_sequence_loop(exp)
+
+
+def _positions(ctx, n_particles):
+    rng = np.random.default_rng(0)
+    return rng.uniform([0, 0], [1280, 1024], size=(n_particles, 2)), np.full(n_particles, 200.0)
+
+
+@case(setup=_positions, params={"n_particles": [10_000, 100_000]}, items="n_particles")
+def render(state, n_particles):
+    xy, intensity = state
+    render_particles(xy, intensity, (1024, 1280), sigma_px=1.0, background=5.0)
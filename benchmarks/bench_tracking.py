@@ -0,0 +1,60 @@
+"""Tracking steps on tests/track (2 cameras, existing targets and rt_is) and on
+synthetic targets/rt_is of the cavity case (4 cameras, no images)."""
+
+import shutil
+from pathlib import Path
+
+from pyptv import ptv
+from pyptv.benchmark import case
+from pyptv.processing import start_processing
+
+TESTS = Path(__file__).resolve().parents[1] / "tests"
+
+
+def _track(ctx):
+    work = ctx.copy_dataset(TESTS / "track")
+    shutil.copytree(work / "img_orig", work / "img", dirs_exist_ok=True)
+    shutil.copytree(work / "res_orig", work / "res", dirs_exist_ok=True)
+    exp = start_processing("parameters_Run1.yaml")
+    return ptv.py_trackcorr_init(exp), exp.spar.get_last() - exp.spar.get_first() + 1
+
+
+@case(setup=_track, items=lambda state: state[1])
+def forward_steps(state):
+    tracker, _ = state
+    tracker.restart()
+    while tracker.step_forward():
+        pass
+    tracker.finalize()
+
+
+@case(setup=_track, items=lambda state: state[1])
+def full_forward(state):
+    state[0].full_forward()
+
+
+def _synthetic(ctx, n_particles):
+    from pyptv.synthetic_sequence import TrackingDataSpec, generate_tracking_data
+
+    work = ctx.copy_dataset(TESTS / "test_cavity")
+    spec = TrackingDataSpec(
+        n_particles=n_particles, first=10000, last=10004, noise_px=0.1, dropout=0.02,
+        ghost_rate=0.05,
+    )
+    generate_tracking_data(work / "parameters_Run1.yaml", spec)
+    exp = start_processing("parameters_Run1.yaml", spec.first, spec.last)
+    return ptv.py_trackcorr_init(exp)
+
+
+# 15k particles stay below optv's limit of 20k targets per camera and frame
+@case(
+    setup=_synthetic,
+    params={"n_particles": [1_000, 5_000, 15_000]},
+    items=lambda state, n_particles: 5 * n_particles,
+    repeat=1,
+)
+def synthetic_forward(tracker, n_particles):
+    tracker.restart()
+    while tracker.step_forward():
+        pass
+    tracker.finalize()
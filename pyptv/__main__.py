@@ -1,3 +1,5 @@
-from pyptv import cli
+import sys
 
-cli()
+from pyptv.cli import cli
+
+sys.exit(cli())
@@ -0,0 +1,374 @@
+"""Background images for the ``masking`` step of the sequence.
+
+With ``masking.mask_flag`` the sequence loop subtracts a background image
+per camera, read from ``masking.mask_base_name``, from every image before
+the highpass. :func:`build_backgrounds` (``python -m pyptv background``)
+computes these images from the sequence itself:
+
+- ``samples`` frames are picked evenly across ``first``..``last``
+- every camera's background is a per-pixel percentile (the median by
+  default) of its sampled frames, after the same grey conversion and
+  ``ptv.negative`` as in the sequence loop
+- the percentile is taken in tiles of rows, so the memory used per camera
+  stays within ``memory_mb`` whatever the number of samples and the sensor
+  size; the sampled frames are spilled to a temporary file next to the
+  output when they do not fit
+- cameras are processed in parallel worker processes
+
+:class:`RollingBackground` is the sliding-window alternative for slowly
+varying illumination: ``masking.rolling`` subtracts the running median or
+minimum of the last frames of each camera in the sequence loop.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+DEFAULT_SAMPLES = 50
+DEFAULT_PERCENTILE = 50.0
+# memory per camera for the sampled frames and one tile of percentiles
+DEFAULT_MEMORY_MB = 512
+DEFAULT_BACKGROUND_NAME = "background_cam%d.tif"
+
+
+def background_path(mask_base_name: str, cam: int) -> str:
+    """The background file of camera ``cam`` (0-based) named by ``mask_base_name``.
+
+    ``%d`` is replaced by the camera number (1-based), as in the sequence
+    loop; ``#`` by the camera index (0-based), as in the GUI.
+    """
+    if "%" in mask_base_name:
+        return mask_base_name % (cam + 1)
+    if "#" in mask_base_name:
+        return mask_base_name.replace("#", str(cam))
+    raise ValueError(
+        f"mask_base_name {mask_base_name!r} has no %d or # for the camera number"
+    )
+
+
+def sample_frames(frames: Sequence[int], samples: int) -> list[int]:
+    """Up to ``samples`` of ``frames``, spread evenly from the first to the last."""
+    if samples < 1:
+        raise ValueError(f"samples must be >= 1, got {samples}")
+    index = np.linspace(0, len(frames) - 1, min(samples, len(frames))).round().astype(int)
+    return [frames[i] for i in np.unique(index)]
+
+
+def grey_image(img: np.ndarray, negative: bool = False) -> np.ndarray:
+    """An image as the sequence loop processes it: 8-bit grey, optionally negative."""
+    if img.ndim > 2:
+        from skimage.color import rgb2gray
+
+        img = rgb2gray(img)
+    if img.dtype != np.uint8:
+        from skimage.util import img_as_ubyte
+
+        img = img_as_ubyte(img)
+    return 255 - img if negative else img
+
+
+def subtract_background(img: np.ndarray, background: np.ndarray) -> np.ndarray:
+    """``img - background`` clipped to 0..255, for 8-bit images and backgrounds of any type."""
+    if background.dtype == np.uint8:
+        # max(img, bg) - bg never wraps around
+        return np.maximum(img, background) - background
+    return np.clip(img.astype(np.int32) - background, 0, 255).astype(np.uint8)
+
+
+def percentile_image(
+    stack: np.ndarray, percentile: float = DEFAULT_PERCENTILE, memory_mb: float = DEFAULT_MEMORY_MB
+) -> np.ndarray:
+    """Per-pixel percentile of a (frames, rows, cols) uint8 stack, rounded to uint8.
+
+    The rows are processed in tiles; np.percentile needs a copy of the tile
+    and a float64 result per pixel.
+    """
+    n, h, w = stack.shape
+    tile_rows = max(1, int(memory_mb * 2**20 // (w * (n + 8))))
+    out = np.empty((h, w), np.uint8)
+    for y0 in range(0, h, tile_rows):
+        tile = np.percentile(stack[:, y0 : y0 + tile_rows], percentile, axis=0)
+        out[y0 : y0 + tile_rows] = np.clip(np.rint(tile), 0, 255)
+    return out
+
+
+def camera_background(
+    source,
+    cam: int,
+    frames: Sequence[int],
+    percentile: float = DEFAULT_PERCENTILE,
+    negative: bool = False,
+    memory_mb: float = DEFAULT_MEMORY_MB,
+    spill_dir: Union[str, Path, None] = None,
+) -> np.ndarray:
+    """The background of camera ``cam`` from ``frames`` of a frame source.
+
+    The frames are read once each. Half of ``memory_mb`` may hold the
+    sampled frames, the rest one tile of percentiles; a larger stack is
+    written to a temporary file in ``spill_dir`` instead.
+    """
+    first = grey_image(source.read(cam, frames[0]), negative)
+    shape = (len(frames), *first.shape)
+    with tempfile.TemporaryDirectory(dir=spill_dir, prefix="background_") as tmp:
+        if np.prod(shape) <= memory_mb * 2**20 / 2:
+            stack = np.empty(shape, np.uint8)
+            budget = memory_mb / 2
+        else:
+            stack = np.lib.format.open_memmap(Path(tmp) / f"cam{cam + 1}.npy", "w+", np.uint8, shape)
+            budget = memory_mb
+        stack[0] = first
+        for k, frame in enumerate(frames[1:], start=1):
+            stack[k] = grey_image(source.read(cam, frame), negative)
+        background = percentile_image(stack, percentile, budget)
+        del stack
+    return background
+
+
+def _camera_task(task: dict) -> dict:
+    """Compute and write the background of one camera (also in a worker process)."""
+    from imageio.v3 import imwrite
+
+    from pyptv.frame_source import open_frame_source
+
+    os.chdir(task["cwd"])
+    with open_frame_source(task["seq_params"], task["num_cams"], task["ptv_params"]) as source:
+        background = camera_background(
+            source,
+            task["cam"],
+            task["frames"],
+            percentile=task["percentile"],
+            negative=task["ptv_params"].get("negative", False),
+            memory_mb=task["memory_mb"],
+            spill_dir=Path(task["path"]).parent,
+        )
+    imwrite(task["path"], background)
+    return {
+        "cam": task["cam"] + 1,
+        "path": task["path"],
+        "mean": float(background.mean()),
+        "max": int(background.max()),
+    }
+
+
+def build_backgrounds(
+    pm,
+    first: Optional[int] = None,
+    last: Optional[int] = None,
+    samples: int = DEFAULT_SAMPLES,
+    percentile: float = DEFAULT_PERCENTILE,
+    mask_base_name: Optional[str] = None,
+    memory_mb: float = DEFAULT_MEMORY_MB,
+    workers: Optional[int] = None,
+) -> dict:
+    """Write the background image of every camera of an experiment.
+
+    Paths are relative to the current directory, the experiment directory.
+
+    Args:
+        pm: ParameterManager of the experiment
+        first, last: frame range to sample (default: the ``sequence`` range);
+            frames missing for any camera are skipped
+        samples: frames sampled per camera
+        percentile: 50 for the median, lower values for a darker background
+        mask_base_name: background file names (default:
+            ``masking.mask_base_name``, or ``DEFAULT_BACKGROUND_NAME`` if empty)
+        memory_mb: memory per camera, see :func:`camera_background`
+        workers: worker processes, one camera each (default: one per
+            camera, at most the CPU count); 1 runs in-process
+
+    Returns:
+        A summary with the sampled frames and one row per camera
+    """
+    from pyptv.frame_source import open_frame_source
+
+    seq_params = dict(pm.get_parameter("sequence"))
+    ptv_params = dict(pm.get_parameter("ptv"))
+    num_cams = pm.num_cams
+    first = seq_params["first"] if first is None else first
+    last = seq_params["last"] if last is None else last
+    # sample the frames every camera has
+    with open_frame_source(seq_params, num_cams, ptv_params) as source:
+        missing = set().union(*source.missing_frames(first, last).values())
+    available = [frame for frame in range(first, last + 1) if frame not in missing]
+    if not available:
+        raise FileNotFoundError(f"No images of frames {first}..{last}")
+    frames = sample_frames(available, samples)
+    mask_base_name = (
+        mask_base_name
+        or (pm.get_parameter("masking") or {}).get("mask_base_name")
+        or DEFAULT_BACKGROUND_NAME
+    )
+
+    tasks = []
+    for cam in range(num_cams):
+        path = background_path(mask_base_name, cam)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tasks.append(
+            {
+                "cam": cam,
+                "path": path,
+                "cwd": os.getcwd(),
+                "seq_params": seq_params,
+                "ptv_params": ptv_params,
+                "num_cams": num_cams,
+                "frames": frames,
+                "percentile": percentile,
+                "memory_mb": memory_mb,
+            }
+        )
+    if workers is None or workers < 1:
+        workers = min(num_cams, os.cpu_count() or 1)
+    if workers <= 1:
+        cameras = [_camera_task(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            cameras = list(executor.map(_camera_task, tasks))
+    return {
+        "mask_base_name": mask_base_name,
+        "frames": len(frames),
+        "first_sample": frames[0],
+        "last_sample": frames[-1],
+        "percentile": percentile,
+        "cameras": cameras,
+    }
+
+
+ROLLING_STATISTICS = ("median", "min")
+
+
+def _replace_sorted(ranked: np.ndarray, old: np.ndarray, new: np.ndarray) -> None:
+    """Replace one ``old`` value per pixel by ``new`` in ``ranked``, sorted along axis 0.
+
+    Every rank is updated with a few elementwise operations on whole uint8
+    images, which is much faster than sorting or np.median over the window.
+    Where ``new >= old`` the ranks from ``old`` upwards move down by one
+    until ``new`` fits, elsewhere the ranks up to ``old`` move up by one.
+    """
+    k = len(ranked)
+    # 255 where new >= old, else 0
+    up = np.negative((new >= old).view(np.uint8))
+    down = ~up
+    below = np.zeros_like(ranked[0])
+    for i in range(k):
+        s = ranked[i].copy()
+        above = ranked[i + 1] if i + 1 < k else np.uint8(255)
+        # ranks below old keep their value: min(.., s) == s
+        keep_low = np.negative((s < old).view(np.uint8))
+        rise = np.minimum(np.minimum(above, s | ~keep_low), np.maximum(s, new))
+        # ranks above old keep their value: max(.., s) == s
+        keep_high = np.negative((s > old).view(np.uint8))
+        fall = np.maximum(np.maximum(below, s & keep_high), np.minimum(s, new))
+        ranked[i] = (rise & up) | (fall & down)
+        below = s
+
+
+class RollingBackground:
+    """Running median or minimum of the last ``window`` frames of one camera.
+
+    The background of a frame is taken over the update frames before it.
+
+    Frames are added on update frames only, every ``every``-th frame counted
+    from ``origin`` (``sequence.first``), so the background of a frame does
+    not depend on where a run or a batch chunk starts: a run starting later
+    first pushes the update frames before it (:meth:`warm_up_frames`).
+
+    The last ``window`` frames are kept in a ring buffer; for the median, a
+    second buffer keeps them sorted per pixel and is updated incrementally.
+    The background is recomputed only after an update.
+    """
+
+    def __init__(self, window: int, statistic: str = "median", every: int = 1, origin: int = 0):
+        if window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        if every < 1:
+            raise ValueError(f"every must be >= 1, got {every}")
+        if statistic not in ROLLING_STATISTICS:
+            raise ValueError(f"Unknown statistic {statistic!r}, expected one of {ROLLING_STATISTICS}")
+        self.window = int(window)
+        self.statistic = statistic
+        self.every = int(every)
+        self.origin = int(origin)
+        self.count = 0
+        self._pos = 0
+        self._ring: Optional[np.ndarray] = None
+        self._ranked: Optional[np.ndarray] = None
+        self._background: Optional[np.ndarray] = None
+
+    def is_update(self, frame: int) -> bool:
+        """Whether ``frame`` is added to the window."""
+        return (frame - self.origin) % self.every == 0
+
+    def warm_up_frames(self, frame: int) -> list[int]:
+        """The update frames before ``frame`` (not before ``origin``) still in its window."""
+        last = frame - 1 - (frame - 1 - self.origin) % self.every
+        first = max(self.origin, last - (self.window - 1) * self.every)
+        return list(range(first, last + 1, self.every)) if last >= self.origin else []
+
+    def push(self, img: np.ndarray) -> None:
+        """Add an 8-bit image, dropping the oldest one of a full window."""
+        if self._ring is None:
+            self._ring = np.empty((self.window, *img.shape), np.uint8)
+            if self.statistic == "median":
+                # unfilled ranks hold 255 and stay above the filled ones
+                self._ranked = np.full((self.window, *img.shape), 255, np.uint8)
+        if self._ranked is not None:
+            old = self._ring[self._pos] if self.count == self.window else np.uint8(255)
+            _replace_sorted(self._ranked, old, img)
+        self._ring[self._pos] = img
+        self._pos = (self._pos + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+        self._background = None
+
+    def background(self) -> np.ndarray:
+        """The current background, uint8; the median of an even count is rounded."""
+        if self._background is None:
+            if self.count == 0:
+                raise ValueError("No frames in the rolling background yet")
+            n = self.count
+            if self.statistic == "min":
+                self._background = self._ring[:n].min(axis=0)
+            elif n % 2:
+                self._background = self._ranked[n // 2].copy()
+            else:
+                pair = self._ranked[n // 2 - 1].astype(np.uint16) + self._ranked[n // 2]
+                self._background = np.rint(pair / 2).astype(np.uint8)
+        return self._background
+
+    def subtract(self, frame: int, img: np.ndarray) -> np.ndarray:
+        """Subtract the background of the frames before ``img``, then add it if an update frame.
+
+        A frame is never part of its own background, which would remove its
+        particles; the first frame, with an empty window, is returned as is.
+        """
+        out = img if self.count == 0 else subtract_background(img, self.background())
+        if self.is_update(frame):
+            self.push(img)
+        return out
+
+
+def rolling_backgrounds(pm, num_cams: int) -> Optional[list[RollingBackground]]:
+    """One RollingBackground per camera from ``masking.rolling``, or None if not set.
+
+    ``masking.rolling`` is a mapping with ``window`` (frames), ``statistic``
+    (``median`` or ``min``) and ``every`` (update every n-th frame).
+    """
+    options = (pm.get_parameter("masking") or {}).get("rolling")
+    if not options or not options.get("window"):
+        return None
+    origin = pm.get_parameter("sequence")["first"]
+    return [
+        RollingBackground(
+            int(options["window"]),
+            options.get("statistic", "median"),
+            int(options.get("every", 1)),
+            origin,
+        )
+        for _ in range(num_cams)
+    ]
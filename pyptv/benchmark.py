@@ -0,0 +1,353 @@
+"""Benchmark suite runner with JSON results and baseline comparison.
+
+Benchmark cases live in ``bench_*.py`` files of a suite directory
+(``benchmarks/`` in the source tree) and are registered with the
+:func:`case` decorator::
+
+    from pyptv.benchmark import case
+
+    def _setup(ctx, n_targets):
+        ctx.copy_dataset(TESTS / "test_cavity")
+        return make_targets(n_targets)
+
+    @case(setup=_setup, params={"n_targets": [1_000, 100_000]}, items="n_targets")
+    def write_targets(targets, n_targets):
+        ptv.write_targets(targets, "cam1", 1)
+
+Every parameter combination becomes one benchmark named like
+``bench_io.write_targets[n_targets=1000]``. ``setup`` runs once per
+benchmark inside a fresh temporary directory (which is also the current
+directory while the case runs) and its return value is passed to the timed
+function. The first value of every parameter list is the "quick" size.
+
+:func:`run_suite` returns a JSON-serialisable dict and :func:`compare`
+checks it against a saved baseline. The ``python -m pyptv benchmark``
+command wraps both; with ``--experiment`` it times the sequence/tracking
+pipeline of an experiment as a single case through :func:`run_cases`.
+
+The suite is not part of the installed package: outside a source checkout
+pass its directory explicitly.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import importlib.util
+import io
+import itertools
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+SCHEMA_VERSION = 1
+# only present in a source checkout; the suite uses the datasets of tests/
+DEFAULT_SUITE = Path(__file__).resolve().parents[1] / "benchmarks"
+
+_registry: list["Case"] = []
+
+
+@dataclass
+class Case:
+    """One benchmark function with its setup and parameter grid."""
+
+    name: str
+    func: Callable
+    setup: Optional[Callable] = None
+    params: dict = field(default_factory=dict)
+    items: Union[int, str, Callable, None] = None
+    repeat: Optional[int] = None
+
+    def variants(self, quick: bool = False) -> list[tuple[str, dict]]:
+        """(full name, keyword arguments) for every parameter combination."""
+        if not self.params:
+            return [(self.name, {})]
+        keys = list(self.params)
+        values = [self.params[k][:1] if quick else self.params[k] for k in keys]
+        out = []
+        for combo in itertools.product(*values):
+            kwargs = dict(zip(keys, combo))
+            label = ",".join(f"{k}={v}" for k, v in kwargs.items())
+            out.append((f"{self.name}[{label}]", kwargs))
+        return out
+
+    def count_items(self, state, kwargs: dict) -> Optional[int]:
+        if self.items is None:
+            return None
+        if isinstance(self.items, int):
+            return self.items
+        if isinstance(self.items, str):
+            return int(kwargs[self.items])
+        return int(self.items(state, **kwargs))
+
+
+def case(
+    func: Optional[Callable] = None,
+    *,
+    name: Optional[str] = None,
+    setup: Optional[Callable] = None,
+    params: Optional[dict] = None,
+    items: Union[int, str, Callable, None] = None,
+    repeat: Optional[int] = None,
+):
+    """Register a benchmark function.
+
+    Args:
+        setup: ``setup(ctx, **params)`` returning the state handed to the
+            timed function, which is called as ``func(state, **params)``
+        params: parameter name -> list of values; the first value is used
+            by quick runs
+        items: work items per call (an int, the name of a parameter or a
+            callable ``items(state, **params)``), to report items per second
+        repeat: timed repetitions, overriding the runner default
+    """
+
+    def register(f):
+        module = f.__module__.rsplit(".", 1)[-1]
+        _registry.append(
+            Case(
+                name=f"{module}.{name or f.__name__}",
+                func=f,
+                setup=setup,
+                params=params or {},
+                items=items,
+                repeat=repeat,
+            )
+        )
+        return f
+
+    return register(func) if func is not None else register
+
+
+class Context:
+    """Working directory of one benchmark; passed to the setup function."""
+
+    def __init__(self, workdir: Path):
+        self.workdir = Path(workdir)
+
+    def copy_dataset(self, source: Union[str, Path], name: Optional[str] = None) -> Path:
+        """Copy an experiment directory into the work dir and change into it."""
+        source = Path(source)
+        target = self.workdir / (name or source.name)
+        if not target.exists():
+            shutil.copytree(source, target)
+        (target / "res").mkdir(exist_ok=True)
+        os.chdir(target)
+        return target
+
+
+def load_suite(suite_dir: Union[str, Path, None] = None) -> list[Case]:
+    """Import every bench_*.py of ``suite_dir`` and return the registered cases."""
+    if suite_dir is None:
+        if not DEFAULT_SUITE.is_dir():
+            raise FileNotFoundError(
+                f"No benchmark suite at {DEFAULT_SUITE}: benchmarks/ ships with the pyptv "
+                "source tree, not with the installed package; pass its directory as suite_dir"
+            )
+        suite_dir = DEFAULT_SUITE
+    suite_dir = Path(suite_dir)
+    if not suite_dir.is_dir():
+        raise FileNotFoundError(f"Benchmark suite directory does not exist: {suite_dir}")
+    _registry.clear()
+    for path in sorted(suite_dir.glob("bench_*.py")):
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[path.stem] = module
+        spec.loader.exec_module(module)
+    return list(_registry)
+
+
+def select(cases: Sequence[Case], patterns: Sequence[str] = (), quick: bool = False):
+    """(case, full name, kwargs) triples whose name matches any of ``patterns``.
+
+    ``*`` and ``?`` are wildcards; a pattern without them matches as a
+    substring. Brackets match literally, as in ``write_targets[n_targets=1000]``.
+    """
+    globs = [
+        (p if "*" in p or "?" in p else f"*{p}*").replace("[", "[[]") for p in patterns
+    ]
+    selected = []
+    for c in cases:
+        for full_name, kwargs in c.variants(quick):
+            if globs and not any(fnmatch.fnmatchcase(full_name, g) for g in globs):
+                continue
+            selected.append((c, full_name, kwargs))
+    return selected
+
+
+def machine_info() -> dict:
+    """Interpreter and library versions recorded with every result file."""
+    import numpy as np
+
+    from pyptv import __version__
+
+    try:
+        from importlib.metadata import version
+
+        optv_version = version("optv")
+    except Exception:
+        optv_version = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "optv": optv_version,
+        "pyptv": __version__,
+    }
+
+
+def run_case(c: Case, kwargs: dict, repeat: int = 5, warmup: int = 1, quiet: bool = True) -> dict:
+    """Time one parameter combination of a case; returns seconds per call."""
+    previous = Path.cwd()
+    output = io.StringIO() if quiet else None
+    with tempfile.TemporaryDirectory(prefix="pyptv_bench_") as tmp:
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+                state = c.setup(Context(Path(tmp)), **kwargs) if c.setup else None
+                for _ in range(warmup):
+                    c.func(state, **kwargs)
+                times = []
+                for _ in range(c.repeat or repeat):
+                    start = time.perf_counter()
+                    c.func(state, **kwargs)
+                    times.append(time.perf_counter() - start)
+                items = c.count_items(state, kwargs)
+        finally:
+            os.chdir(previous)
+    median = statistics.median(times)
+    return {
+        "params": kwargs,
+        "repeat": len(times),
+        "times": times,
+        "min": min(times),
+        "median": median,
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "items": items,
+        "items_per_second": items / median if items and median > 0 else None,
+    }
+
+
+def run_suite(
+    suite_dir: Union[str, Path, None] = None,
+    patterns: Sequence[str] = (),
+    quick: bool = False,
+    repeat: int = 5,
+    warmup: int = 1,
+    progress: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """Run the selected benchmarks of a suite; failures are recorded, not raised."""
+    return run_cases(select(load_suite(suite_dir), patterns, quick), quick, repeat, warmup, progress)
+
+
+def run_cases(
+    selected: Sequence[tuple],
+    quick: bool = False,
+    repeat: int = 5,
+    warmup: int = 1,
+    progress: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """Run (case, full name, kwargs) triples as returned by :func:`select`."""
+    results = {}
+    for c, full_name, kwargs in selected:
+        try:
+            result = run_case(c, kwargs, repeat=repeat, warmup=warmup)
+        except Exception as exc:
+            result = {"params": kwargs, "error": f"{type(exc).__name__}: {exc}"}
+        results[full_name] = result
+        if progress is not None:
+            progress(full_name, result)
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def save_results(results: dict, path: Union[str, Path]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2), encoding="utf8")
+    return path
+
+
+def load_results(path: Union[str, Path]) -> dict:
+    results = json.loads(Path(path).read_text(encoding="utf8"))
+    if results.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported benchmark result schema in {path}")
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.1) -> list[dict]:
+    """Compare median times benchmark by benchmark.
+
+    ``ratio`` is current / baseline median; a benchmark is ``slower`` or
+    ``faster`` when the ratio leaves ``[1 - threshold, 1 + threshold]``.
+    """
+    rows = []
+    base = baseline["results"]
+    for name, result in current["results"].items():
+        old = base.get(name)
+        if "error" in result:
+            status, ratio = "error", None
+        elif old is None or "median" not in old:
+            status, ratio = "new", None
+        else:
+            ratio = result["median"] / old["median"] if old["median"] > 0 else math.inf
+            if ratio > 1 + threshold:
+                status = "slower"
+            elif ratio < 1 - threshold:
+                status = "faster"
+            else:
+                status = "same"
+        rows.append(
+            {
+                "name": name,
+                "baseline": old.get("median") if old else None,
+                "current": result.get("median"),
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+    for name in base:
+        if name not in current["results"]:
+            rows.append(
+                {"name": name, "baseline": base[name].get("median"), "current": None,
+                 "ratio": None, "status": "missing"}
+            )
+    return rows
+
+
+def format_results(results: dict, comparison: Optional[list[dict]] = None) -> str:
+    """Results (and the comparison, if given) as a plain-text table."""
+    ratios = {row["name"]: row for row in comparison or []}
+    width = max([len(n) for n in results["results"]] + [9])
+    lines = [f"{'benchmark':<{width}}{'median ms':>12}{'min ms':>10}{'items/s':>12}"
+             + (f"{'vs base':>10}" if comparison else "")]
+    for name, r in results["results"].items():
+        if "error" in r:
+            lines.append(f"{name:<{width}}  ERROR {r['error']}")
+            continue
+        rate = f"{r['items_per_second']:>12.4g}" if r["items_per_second"] else f"{'-':>12}"
+        line = f"{name:<{width}}{1e3 * r['median']:>12.3f}{1e3 * r['min']:>10.3f}{rate}"
+        row = ratios.get(name)
+        if row is not None:
+            line += f"{row['ratio']:>9.2f}x" if row["ratio"] is not None else f"{row['status']:>10}"
+            if row["status"] in ("slower", "faster"):
+                line += f" {row['status']}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -17,6 +17,7 @@ from skimage.color import rgb2gray
 
 from traits.api import HasTraits, Str, Int, Bool, Instance, Button
 from traitsui.api import View, Item, HGroup, VGroup, ListEditor
+from pyface.api import GUI
 from enable.component_editor import ComponentEditor
 
 from chaco.api import (
@@ -28,20 +29,18 @@ from chaco.api import (
 from chaco.tools.image_inspector_tool import ImageInspectorTool
 from chaco.tools.better_zoom import BetterZoom as SimpleZoom
 
-from pyptv.text_box_overlay import TextBoxOverlay
+from pyptv.text_box_overlay import TextBoxesOverlay
 from pyptv.code_editor import oriEditor, addparEditor
 
 
 from optv.imgcoord import image_coordinates
 from optv.transforms import convert_arr_metric_to_pixel
-from optv.orientation import match_detection_to_ref
-from optv.orientation import external_calibration, full_calibration
-from optv.calibration import Calibration
 from optv.tracking_framebuf import TargetArray
 
 
 from pyptv import ptv
 from pyptv.experiment import Experiment
+from pyptv.frame_source import open_frame_source
 
 
 # recognized names for the flags:
@@ -213,17 +212,20 @@ class PlotWindow(HasTraits):
                 )
 
     def plot_num_overlay(self, x, y, txt, text_color="white", border_color="red"):
-        for i, (x_val, y_val, txt_val) in enumerate(zip(x, y, txt)):
-            coord_x, coord_y = self._plot.map_screen([(x_val, y_val)])[0]
-            ovlay = TextBoxOverlay(
+        if len(x) == 0:
+            return
+        # one overlay paints all the labels, however many points there are
+        self._plot.overlays.append(
+            TextBoxesOverlay(
                 component=self._plot,
-                text=str(txt_val),
-                alternate_position=(coord_x, coord_y),
-                real_position=(x_val, y_val),
+                texts=[str(txt_val) for txt_val in txt],
+                positions=np.column_stack(
+                    (np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+                ),
                 text_color=text_color,
                 border_color=border_color,
             )
-            self._plot.overlays.append(ovlay)
+        )
 
     def update_image(self, image, is_float=False):
         if is_float:
@@ -623,27 +625,22 @@ class CalibrationGUI(HasTraits):
 
         self.cals = []
         for i_cam in range(self.num_cams):
-            cal = Calibration()
             tmp = self.get_parameter('cal_ori')['img_ori'][i_cam]
-            cal.from_file(tmp, tmp.replace(".ori", ".addpar"))
-            self.cals.append(cal)
+            self.cals.append(ptv.read_calibration(tmp, tmp.replace(".ori", ".addpar")))
 
         for i_cam in range(self.num_cams):
             self._project_cal_points(i_cam)
 
     def _project_cal_points(self, i_cam, color="orange"):
-        x, y, pnr = [], [], []
-        for row in self.cal_points:
-            projected = image_coordinates(
-                np.atleast_2d(row["pos"]),
-                self.cals[i_cam],
-                self.cpar.get_multimedia_params(),
-            )
-            pos = convert_arr_metric_to_pixel(projected, self.cpar)
+        projected = image_coordinates(
+            np.ascontiguousarray(self.cal_points["pos"], dtype=float).reshape(-1, 3),
+            self.cals[i_cam],
+            self.cpar.get_multimedia_params(),
+        )
+        pos = convert_arr_metric_to_pixel(projected, self.cpar)
 
-            x.append(pos[0][0])
-            y.append(pos[0][1])
-            pnr.append(row["id"])
+        x, y = pos[:, 0], pos[:, 1]
+        pnr = self.cal_points["id"]
 
         self.drawcross("init_x", "init_y", x, y, color, 3, i_cam=i_cam)
         self.camera[i_cam].plot_num_overlay(x, y, pnr)
@@ -661,27 +658,37 @@ class CalibrationGUI(HasTraits):
             return
 
         self.cal_points = self._read_cal_points()
-        self.sorted_targs = []
+        self.sorted_targs = [None] * self.num_cams
 
         print("_button_sort_grid_fired")
 
-        for i_cam in range(self.num_cams):
-            targs = match_detection_to_ref(
-                self.cals[i_cam],
-                self.cal_points["pos"],
-                self.detections[i_cam],
-                self.cpar,
+        tasks = [
+            {
+                "cam": i_cam,
+                "mode": "sortgrid",
+                "cal": self.cals[i_cam],
+                "xyz": self.cal_points["pos"],
+                "xy": np.array(
+                    [t.pos() for t in self.detections[i_cam]], dtype=float
+                ).reshape(-1, 2),
+            }
+            for i_cam in range(self.num_cams)
+        ]
+
+        for result in ptv.orient_cameras(
+            tasks, self.get_parameter('ptv'), self.num_cams
+        ):
+            i_cam = result["cam"]
+            matched = result["pnr"] != -999
+            x, y = result["xy"][matched].T
+            pnr = self.cal_points["id"][result["pnr"][matched]]
+
+            self.sorted_targs[i_cam] = ptv.targets_from_positions(
+                result["xy"], result["pnr"]
             )
-            x, y, pnr = [], [], []
-            for t in targs:
-                if t.pnr() != -999:
-                    pnr.append(self.cal_points["id"][t.pnr()])
-                    x.append(t.pos()[0])
-                    y.append(t.pos()[1])
-
-            self.sorted_targs.append(targs)
             self.camera[i_cam]._plot.overlays = []
             self.camera[i_cam].plot_num_overlay(x, y, pnr)
+            GUI.process_events()
 
         self.status_text = "Sort grid finished."
         self.pass_sortgrid = True
@@ -693,6 +700,7 @@ class CalibrationGUI(HasTraits):
 
         self._backup_ori_files()
 
+        tasks = []
         for i_cam in range(self.num_cams):
             selected_points = np.zeros((4, 3))
             for i, cp_id in enumerate(self.cal_points["id"]):
@@ -705,19 +713,29 @@ class CalibrationGUI(HasTraits):
                 (self.camera[i_cam]._x, self.camera[i_cam]._y)
             ).T
 
-            success = external_calibration(
-                self.cals[i_cam],
-                selected_points,
-                manual_detection_points,
-                self.cpar,
+            tasks.append(
+                {
+                    "cam": i_cam,
+                    "mode": "raw",
+                    "cal": self.cals[i_cam],
+                    "xyz": selected_points,
+                    "init_xyz": selected_points,
+                    "init_xy": manual_detection_points,
+                }
             )
 
-            if success is False:
+        for result in ptv.orient_cameras(
+            tasks, self.get_parameter('ptv'), self.num_cams
+        ):
+            i_cam = result["cam"]
+            if result["success"] is False:
                 print("Initial guess has not been successful\n")
             else:
+                ptv.update_calibration_from_dict(self.cals[i_cam], result["cal"])
                 self.camera[i_cam]._plot.overlays = []
                 self._project_cal_points(i_cam, color="red")
                 self._write_ori(i_cam)
+                GUI.process_events()
 
         self.status_text = "Orientation finished"
         self.pass_raw_orient = True
@@ -732,6 +750,8 @@ class CalibrationGUI(HasTraits):
         orient_params = self.get_parameter('orient')
         flags = [name for name in NAMES if orient_params.get(name) == 1]
 
+        tasks = []
+        cam_targs = {}
         for i_cam in range(self.num_cams):
             if self.epar.get('Combine_Flag', False):
                 self.status_text = "Multiplane calibration."
@@ -806,29 +826,37 @@ class CalibrationGUI(HasTraits):
             else:
                 targs = self.sorted_targs[i_cam]
 
-            try:
-                print(f"Calibrating external (6DOF) and flags: {flags} \n")
-                residuals, targ_ix, err_est = full_calibration(
-                    self.cals[i_cam],
-                    self.cal_points["pos"],
-                    targs,
-                    self.cpar,
-                    flags,
-                )
-            except BaseException:
-                print("Error in OPTV full_calibration, attempting Scipy")
+            tasks.append(
+                {
+                    "cam": i_cam,
+                    "mode": "fine",
+                    "cal": self.cals[i_cam],
+                    "xyz": self.cal_points["pos"],
+                    "xy": np.array([t.pos() for t in targs], dtype=float).reshape(-1, 2),
+                    "pnr": np.array([t.pnr() for t in targs], dtype=int),
+                    "flags": flags,
+                    "scipy_fallback": True,
+                }
+            )
+            cam_targs[i_cam] = targs
+
+        print(f"Calibrating external (6DOF) and flags: {flags} \n")
+        for result in ptv.orient_cameras(
+            tasks, self.get_parameter('ptv'), self.num_cams
+        ):
+            i_cam = result["cam"]
+            if result["success"] is False:
+                print("Initial guess has not been successful\n")
+                continue
+            targs = cam_targs[i_cam]
+            residuals = result["residuals"]
+            targ_ix = result["targ_ix"]
+            if result["fallback"]:
+                print(f"Error in OPTV full_calibration for camera {i_cam + 1}, used Scipy")
+                # the points as projected by the calibration OPTV started from
                 self._project_cal_points(i_cam)
 
-                residuals = ptv.full_scipy_calibration(
-                    self.cals[i_cam],
-                    self.cal_points["pos"],
-                    targs,
-                    self.cpar,
-                    flags=flags,
-                )
-
-                targ_ix = [t.pnr() for t in targs if t.pnr() != -999]
-
+            ptv.update_calibration_from_dict(self.cals[i_cam], result["cal"])
             self._write_ori(i_cam, addpar_flag=True)
 
             x, y = [], []
@@ -848,48 +876,10 @@ class CalibrationGUI(HasTraits):
                 y + SCALE * residuals[: len(x), 1],
                 "red",
             )
+            GUI.process_events()
 
         self.status_text = "Orientation finished."
 
-    def _residuals_k(self, x, cal, XYZ, xy, cpar):
-        cal.set_radial_distortion(x)
-        targets = convert_arr_metric_to_pixel(
-            image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
-        )
-        xyt = np.array([t.pos() if t.pnr() != -999 else [np.nan, np.nan] for t in xy])
-        residuals = np.nan_to_num(xyt - targets)
-        return np.sum(residuals**2)
-
-    def _residuals_p(self, x, cal, XYZ, xy, cpar):
-        cal.set_decentering(x)
-        targets = convert_arr_metric_to_pixel(
-            image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
-        )
-        xyt = np.array([t.pos() if t.pnr() != -999 else [np.nan, np.nan] for t in xy])
-        residuals = np.nan_to_num(xyt - targets)
-        return np.sum(residuals**2)
-
-    def _residuals_s(self, x, cal, XYZ, xy, cpar):
-        cal.set_affine_trans(x)
-        targets = convert_arr_metric_to_pixel(
-            image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
-        )
-        xyt = np.array([t.pos() if t.pnr() != -999 else [np.nan, np.nan] for t in xy])
-        residuals = np.nan_to_num(xyt - targets)
-        return np.sum(residuals**2)
-
-    def _residuals_combined(self, x, cal, XYZ, xy, cpar):
-        cal.set_radial_distortion(x[:3])
-        cal.set_decentering(x[3:5])
-        cal.set_affine_trans(x[5:])
-
-        targets = convert_arr_metric_to_pixel(
-            image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
-        )
-        xyt = np.array([t.pos() if t.pnr() != -999 else [np.nan, np.nan] for t in xy])
-        residuals = np.nan_to_num(xyt - targets)
-        return residuals
-
     def _write_ori(self, i_cam, addpar_flag=False):
         tmp = np.array(
             [
@@ -914,7 +904,7 @@ class CalibrationGUI(HasTraits):
             addpar = "tmp.addpar"
 
         print("Saving:", ori, addpar)
-        self.cals[i_cam].write(ori.encode(), addpar.encode())
+        ptv.write_calibration(self.cals[i_cam], ori, addpar)
         if self.epar.get('Examine_Flag', False) and not self.epar.get('Combine_Flag', False):
             self.save_point_sets(i_cam)
 
@@ -949,7 +939,14 @@ class CalibrationGUI(HasTraits):
         base_names = [
             self.spar.get_img_base_name(i) for i in range(self.num_cams)
         ]
+        seq_params = dict(self.get_parameter('sequence'), base_name=base_names)
+        with open_frame_source(seq_params, self.num_cams) as source:
+            self._show_orient_part(source, seq_first, seq_last, targs_all, targ_ix_all, residuals_all)
 
+        self.status_text = "Orientation with particles finished."
+
+    def _show_orient_part(self, source, seq_first, seq_last, targs_all, targ_ix_all, residuals_all):
+        """Draw the particles used for orientation over the maximum of the shaking frames."""
         for i_cam in range(self.num_cams):
             targ_ix = targ_ix_all[i_cam]
             targs = targs_all[i_cam]
@@ -960,16 +957,15 @@ class CalibrationGUI(HasTraits):
 
             self.camera[i_cam]._plot.overlays.clear()
 
-            if os.path.exists(base_names[i_cam] % seq_first):
-                for i_seq in range(seq_first, seq_last + 1):
-                    temp_img = []
-                    for seq in range(seq_first, seq_last):
-                        _ = imread(base_names[i_cam] % seq)
-                        temp_img.append(img_as_ubyte(_))
-
-                    temp_img = np.array(temp_img)
-                    temp_img = np.max(temp_img, axis=0)
-
+            if source.has_frame(i_cam, seq_first):
+                temp_img = np.max(
+                    [
+                        img_as_ubyte(source.read(i_cam, seq))
+                        for seq in range(seq_first, seq_last + 1)
+                        if source.has_frame(i_cam, seq)
+                    ],
+                    axis=0,
+                )
                 self.camera[i_cam].update_image(temp_img)
 
             self.drawcross("orient_x", "orient_y", x, y, "orange", 5, i_cam=i_cam)
@@ -982,8 +978,6 @@ class CalibrationGUI(HasTraits):
                 "red",
             )
 
-        self.status_text = "Orientation with particles finished."
-
 
     def _button_orient_dumbbell_fired(self):
         """ Orientation using a dumbbell calibration method."""
@@ -1049,6 +1043,7 @@ class CalibrationGUI(HasTraits):
             shutil.copyfile(f + ".bck", f)
             g = f.replace("ori", "addpar")
             shutil.copyfile(g, g + ".bck")
+        ptv.clear_calibration_cache()
 
     def _read_cal_points(self):
         return np.atleast_1d(
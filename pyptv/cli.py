@@ -1,2 +1,829 @@
-def cli():
-    return "CLI template"
+"""Command-line interface: ``python -m pyptv <command> ...``
+
+Commands
+    run        sequence and/or tracking, serial or in parallel worker processes
+    track      tracking only
+    calibrate  per-camera calibration from known 3D/2D correspondences (.npz)
+    sweep      repeat the sequence step over a grid of parameter overrides
+    synth      render a synthetic particle-image sequence with ground truth
+    ingest     pack the sequence images into a chunked HDF5 frame store
+    frames     check that every image of the sequence exists (gaps, missing frames)
+    background median/percentile background images for masking, sampled from the sequence
+    benchmark  run the benchmark suite in benchmarks/, or time the pipeline of an
+               experiment (--experiment), and compare with a baseline
+    profile    run once under cProfile (all worker processes) and report the hottest functions
+    gui        start the GUI (also the default when no command is given)
+
+Every processing command starts through :func:`pyptv.processing.start_processing`
+and accepts ``--json``, which prints one JSON document on stdout while all
+progress messages go to stderr. ``--metrics FILE``, ``--summary`` and
+``--memory`` enable the per-stage instrumentation of :mod:`pyptv.instrumentation`.
+
+Examples
+    python -m pyptv run tests/test_cavity/parameters_Run1.yaml --backend process --workers 4
+    python -m pyptv track tests/test_cavity/parameters_Run1.yaml --first 10000 --last 10004
+    python -m pyptv sweep params.yaml --set targ_rec.gvthres=20,30,40 --json
+    python -m pyptv benchmark --experiment params.yaml --repeat 5 --mode sequence --json
+    python -m pyptv benchmark --quick --output bench.json
+    python -m pyptv benchmark bench_sequence --baseline bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+MODES = ("both", "sequence", "tracking")
+BACKENDS = ("serial", "process")
+
+
+class CLIError(Exception):
+    """Invalid command-line input."""
+
+
+@contextlib.contextmanager
+def working_directory(path: Path):
+    """Temporarily change the current directory."""
+    previous = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+@contextlib.contextmanager
+def stdout_to_stderr():
+    """Send everything written to stdout, including by C extensions, to stderr."""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+
+
+def _yaml_path(value: str) -> Path:
+    path = Path(value).resolve()
+    if not path.is_file():
+        raise argparse.ArgumentTypeError(f"YAML parameter file does not exist: {path}")
+    return path
+
+
+def _frame_range(args) -> tuple[int, int]:
+    """First/last frame from the command line, defaulting to the YAML sequence."""
+    from pyptv.processing import load_parameters
+
+    seq = load_parameters(args.yaml).get_parameter("sequence")
+    first = seq["first"] if args.first is None else args.first
+    last = seq["last"] if args.last is None else args.last
+    if first > last:
+        raise CLIError(f"First frame ({first}) must be <= last frame ({last})")
+    return int(first), int(last)
+
+
+def _run_pipeline(
+    yaml_file: Path,
+    first: int,
+    last: int,
+    mode: str,
+    backend: str = "serial",
+    workers: Optional[int] = None,
+    sequence_plugin: Optional[str] = None,
+    tracking_plugin: Optional[str] = None,
+    profile_dir: Optional[Path] = None,
+) -> None:
+    """Dispatch one run to the serial, parallel or plugin batch runner.
+
+    With ``profile_dir`` every process of the run writes a .pstats file
+    into that directory.
+    """
+    from pyptv.profiling import profiled
+
+    (yaml_file.parent / "res").mkdir(exist_ok=True)
+    main_profile = Path(profile_dir) / "main.pstats" if profile_dir else None
+    if sequence_plugin or tracking_plugin:
+        from pyptv.pyptv_batch_plugins import run_batch
+
+        with profiled(main_profile):
+            run_batch(
+                yaml_file,
+                first,
+                last,
+                tracking_plugin=tracking_plugin or "default",
+                sequence_plugin=sequence_plugin or "default",
+                mode=mode,
+            )
+    elif backend == "process":
+        from pyptv.pyptv_batch_parallel import main as run_parallel
+
+        run_parallel(
+            yaml_file, first, last, n_processes=workers, mode=mode, profile_dir=profile_dir
+        )
+    else:
+        from pyptv.pyptv_batch import run_batch
+
+        with profiled(main_profile):
+            run_batch(yaml_file, first, last, mode=mode)
+
+
+def _profile_dir(args) -> Optional[Path]:
+    """Directory for the .pstats files of this run, or None without --profile."""
+    if args.profile is None:
+        return None
+    if args.profile:
+        return Path(args.profile).resolve()
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return args.yaml.parent / "res" / "profile" / f"{args.command}_{stamp}"
+
+
+def _profile_report(profile_dir: Path, sort: str = "cumulative", limit: int = 0) -> dict:
+    """Merge the per-process profiles of a run and list the top functions."""
+    from pyptv.profiling import MERGED_COLLAPSED, MERGED_PSTATS, merge_profile_dir, top_functions
+
+    stats = merge_profile_dir(profile_dir)
+    report = {
+        "pstats": str(profile_dir / MERGED_PSTATS),
+        "collapsed": str(profile_dir / MERGED_COLLAPSED),
+    }
+    if limit:
+        report["top"] = top_functions(stats, sort, limit)
+    return report
+
+
+def _count_particles(res_dir: Path, first: int, last: int) -> list[int]:
+    """Number of 3D particles in res/rt_is.<frame> for each frame."""
+    counts = []
+    for frame in range(first, last + 1):
+        rt_is = res_dir / f"rt_is.{frame}"
+        if rt_is.exists():
+            with rt_is.open() as f:
+                counts.append(int(f.readline().split()[0]))
+        else:
+            counts.append(0)
+    return counts
+
+
+def cmd_run(args) -> dict:
+    first, last = _frame_range(args)
+    profile_dir = _profile_dir(args)
+    start = time.perf_counter()
+    _run_pipeline(
+        args.yaml,
+        first,
+        last,
+        args.mode,
+        backend=args.backend,
+        workers=args.workers,
+        sequence_plugin=args.sequence_plugin,
+        tracking_plugin=args.tracking_plugin,
+        profile_dir=profile_dir,
+    )
+    seconds = time.perf_counter() - start
+    result = {
+        "command": args.command,
+        "yaml": str(args.yaml),
+        "first": first,
+        "last": last,
+        "mode": args.mode,
+        "backend": args.backend,
+        "workers": args.workers,
+        "seconds": seconds,
+        "frames_per_second": (last - first + 1) / seconds if seconds > 0 else None,
+    }
+    if profile_dir is not None:
+        result.update(_profile_report(profile_dir))
+    if getattr(args, "score", False):
+        from pyptv.synthetic_sequence import score_tracking
+
+        result["score"] = score_tracking(args.yaml.parent / "res")
+    return result
+
+
+def cmd_calibrate(args) -> dict:
+    from pyptv.standalone_calibration import (
+        NAMES,
+        get_flags_from_yaml,
+        load_parameter_manager,
+        load_points_npz,
+        run_standalone_calibration,
+    )
+
+    if not args.npz.exists():
+        raise CLIError(f"Points file does not exist: {args.npz}")
+    pm = load_parameter_manager(args.yaml)
+    xyz, xy, pnr = load_points_npz(args.npz, num_cams=int(pm.num_cams))
+    if args.flags is None:
+        flags = get_flags_from_yaml(pm)
+    else:
+        unknown = [f for f in args.flags if f not in NAMES]
+        if unknown:
+            raise CLIError(f"Unknown flags: {unknown}. Allowed: {NAMES}")
+        flags = list(args.flags)
+
+    start = time.perf_counter()
+    with working_directory(args.yaml.parent):
+        cals = run_standalone_calibration(
+            args.yaml,
+            xyz,
+            xy,
+            pnr,
+            flags=flags,
+            init_external=None if args.no_init_external else "first4",
+            write=args.write,
+            n_workers=args.workers,
+        )
+    return {
+        "command": "calibrate",
+        "yaml": str(args.yaml),
+        "flags": flags,
+        "written": bool(args.write),
+        "seconds": time.perf_counter() - start,
+        "cameras": [
+            {
+                "cam": cam,
+                "pos": cal.get_pos().tolist(),
+                "angles": cal.get_angles().tolist(),
+                "primary_point": cal.get_primary_point().tolist(),
+            }
+            for cam, cal in enumerate(cals)
+        ],
+    }
+
+
+def _parse_override(text: str) -> tuple[tuple[str, str], list]:
+    """Parse ``section.key=v1,v2`` into ((section, key), [v1, v2])."""
+    import yaml
+
+    name, sep, values = text.partition("=")
+    section, dot, key = name.partition(".")
+    if not sep or not dot or not key or not values:
+        raise CLIError(f"Expected --set section.key=value[,value...], got {text!r}")
+    return (section, key), [yaml.safe_load(v) for v in values.split(",")]
+
+
+def _apply_override(parameters: dict, section: str, key: str, value) -> None:
+    if section not in parameters or key not in parameters[section]:
+        raise CLIError(f"Unknown parameter {section}.{key}")
+    current = parameters[section][key]
+    # a scalar applied to a per-camera list sets every camera
+    if isinstance(current, list) and not isinstance(value, list):
+        value = [value] * len(current)
+    parameters[section][key] = value
+
+
+def cmd_sweep(args) -> dict:
+    from pyptv.processing import load_parameters, start_processing
+    from pyptv.ptv import py_sequence_loop
+
+    overrides = [_parse_override(text) for text in args.set]
+    if not overrides:
+        raise CLIError("sweep needs at least one --set section.key=values")
+    first, last = _frame_range(args)
+    base = load_parameters(args.yaml)
+    names = [f"{section}.{key}" for (section, key), _ in overrides]
+
+    runs = []
+    with working_directory(args.yaml.parent):
+        Path("res").mkdir(exist_ok=True)
+        for combo in itertools.product(*(values for _, values in overrides)):
+            pm = load_parameters(args.yaml)
+            for ((section, key), _), value in zip(overrides, combo):
+                _apply_override(pm.parameters, section, key, value)
+            start = time.perf_counter()
+            py_sequence_loop(start_processing(pm, first, last))
+            counts = _count_particles(Path("res"), first, last)
+            runs.append(
+                {
+                    "overrides": dict(zip(names, combo)),
+                    "seconds": time.perf_counter() - start,
+                    "particles": counts,
+                    "mean_particles": sum(counts) / len(counts),
+                }
+            )
+    return {
+        "command": "sweep",
+        "yaml": str(args.yaml),
+        "first": first,
+        "last": last,
+        "num_cams": base.num_cams,
+        "runs": runs,
+    }
+
+
+def cmd_synth(args) -> dict:
+    from pyptv.synthetic_sequence import (
+        ParticleSequenceSpec,
+        TrackingDataSpec,
+        generate_tracking_data,
+        render_particle_sequence,
+    )
+
+    start = time.perf_counter()
+    if args.targets:
+        spec = TrackingDataSpec(
+            n_particles=args.particles,
+            first=args.first,
+            last=args.last,
+            flow=args.flow,
+            speed=args.speed,
+            noise_px=args.noise_px,
+            noise_mm=args.noise_mm,
+            dropout=args.dropout,
+            ghost_rate=args.ghosts,
+            seed=args.seed,
+        )
+        summary = generate_tracking_data(args.yaml, spec, out_root=args.out)
+    else:
+        spec = ParticleSequenceSpec(
+            n_particles=args.particles,
+            first=args.first,
+            last=args.last,
+            flow=args.flow,
+            speed=args.speed,
+            sigma_px=args.sigma,
+            noise_sigma=args.noise,
+            seed=args.seed,
+        )
+        summary = render_particle_sequence(args.yaml, spec, out_root=args.out)
+    return {"command": "synth", "yaml": str(args.yaml), **summary, "seconds": time.perf_counter() - start}
+
+
+def cmd_ingest(args) -> dict:
+    from pyptv.frame_source import DEFAULT_STORE_NAME, ingest_sequence
+    from pyptv.processing import load_parameters
+
+    pm = load_parameters(args.yaml)
+    first, last = _frame_range(args)
+    base_names = pm.get_parameter("sequence")["base_name"]
+    # a splitter experiment stores the composite images only
+    splitter = pm.get_parameter("ptv").get("splitter", False)
+    base_names = base_names[:1] if splitter else base_names[: pm.num_cams]
+    output = args.output or Path(base_names[0]).parent / DEFAULT_STORE_NAME
+
+    start = time.perf_counter()
+    with working_directory(args.yaml.parent):
+        summary = ingest_sequence(
+            base_names, range(first, last + 1), output,
+            complevel=args.complevel, complib=args.complib,
+        )
+    if args.write:
+        pm.parameters["sequence"]["frame_store"] = str(output)
+        pm.to_yaml(args.yaml)
+    return {
+        "command": "ingest",
+        "yaml": str(args.yaml),
+        "first": first,
+        "last": last,
+        **summary,
+        "written": bool(args.write),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def cmd_frames(args) -> dict:
+    from pyptv.frame_source import FileFrameSource, FrameIndex, frame_ranges, open_frame_source
+    from pyptv.processing import load_parameters
+
+    pm = load_parameters(args.yaml)
+    first, last = _frame_range(args)
+    seq = pm.get_parameter("sequence")
+    num_cams = 1 if pm.get_parameter("ptv").get("splitter", False) else pm.num_cams
+
+    start = time.perf_counter()
+    with working_directory(args.yaml.parent), open_frame_source(seq, num_cams) as source:
+        if isinstance(source, FileFrameSource):
+            source = FileFrameSource(
+                source.base_names, index=FrameIndex(source.base_names, sizes=args.sizes)
+            )
+        missing = source.missing_frames(first, last)
+        cameras = []
+        for cam in range(num_cams):
+            frames = missing.get(cam, [])
+            row = {
+                "cam": cam + 1,
+                "source": (
+                    source.base_names[cam]
+                    if isinstance(source, FileFrameSource)
+                    else source.name(cam, first)
+                ),
+                "found": last - first + 1 - len(frames),
+                "missing": len(frames),
+                "missing_frames": ", ".join(
+                    str(a) if a == b else f"{a}-{b}" for a, b in frame_ranges(frames)
+                ),
+            }
+            if args.sizes and isinstance(source, FileFrameSource):
+                sizes = [v for f, v in source.index.sizes[cam].items() if first <= f <= last]
+                row.update(
+                    bytes=sum(sizes),
+                    min_bytes=min(sizes, default=0),
+                    max_bytes=max(sizes, default=0),
+                )
+            cameras.append(row)
+    if missing and args.strict:
+        raise CLIError(
+            f"{sum(len(f) for f in missing.values())} images missing in {first}..{last}"
+        )
+    return {
+        "command": "frames",
+        "yaml": str(args.yaml),
+        "first": first,
+        "last": last,
+        "complete": not missing,
+        "seconds": time.perf_counter() - start,
+        "cameras": cameras,
+    }
+
+
+def cmd_background(args) -> dict:
+    from pyptv.background import build_backgrounds
+    from pyptv.processing import load_parameters
+
+    pm = load_parameters(args.yaml)
+    first, last = _frame_range(args)
+    start = time.perf_counter()
+    with working_directory(args.yaml.parent):
+        summary = build_backgrounds(
+            pm, first, last,
+            samples=args.samples,
+            percentile=args.percentile,
+            mask_base_name=args.output,
+            memory_mb=args.memory_mb,
+            workers=args.workers,
+        )
+    if args.write:
+        pm.parameters["masking"] = dict(
+            pm.get_parameter("masking") or {},
+            mask_flag=True,
+            mask_base_name=summary["mask_base_name"],
+        )
+        pm.to_yaml(args.yaml)
+    return {
+        "command": "background",
+        "yaml": str(args.yaml),
+        "first": first,
+        "last": last,
+        **summary,
+        "written": bool(args.write),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _experiment_case(args) -> tuple:
+    """The pipeline run of ``benchmark --experiment`` as a benchmark case.
+
+    Items are frames, so the items per second are frames per second.
+    """
+    from pyptv.benchmark import Case
+
+    args.yaml = args.experiment
+    first, last = _frame_range(args)
+    kwargs = {"mode": args.mode, "backend": args.backend, "workers": args.workers}
+    c = Case(
+        name=f"experiment.{args.experiment.parent.name}",
+        func=lambda _state, **kw: _run_pipeline(args.experiment, first, last, **kw),
+        params={key: [value] for key, value in kwargs.items()},
+        items=last - first + 1,
+    )
+    return (c, *c.variants()[0])
+
+
+def cmd_benchmark(args) -> dict:
+    from pyptv.benchmark import (
+        DEFAULT_SUITE,
+        compare,
+        format_results,
+        load_results,
+        load_suite,
+        run_cases,
+        save_results,
+        select,
+    )
+
+    if args.experiment is not None:
+        selected = [_experiment_case(args)]
+    else:
+        if args.suite is None and not DEFAULT_SUITE.is_dir():
+            raise CLIError(
+                "benchmarks/ ships with the pyptv source tree, not with the installed package: "
+                "pass --suite DIR, or --experiment YAML to time an experiment"
+            )
+        selected = select(load_suite(args.suite), args.select, args.quick)
+    if args.list:
+        return {"command": "benchmark", "benchmarks": [name for _c, name, _kw in selected]}
+
+    baseline = load_results(args.baseline) if args.baseline else None
+    # the tracker prints from C; keep stdout for the results table
+    with stdout_to_stderr():
+        results = run_cases(
+            selected,
+            quick=args.quick,
+            repeat=args.repeat,
+            warmup=args.warmup,
+            progress=lambda name, r: print(f"{name}: {r.get('median', r.get('error'))}"),
+        )
+    if args.output:
+        save_results(results, args.output)
+    comparison = compare(results, baseline, args.threshold) if baseline else None
+    if not args.json:
+        print(format_results(results, comparison))
+    result = {
+        "command": "benchmark",
+        "output": str(args.output) if args.output else None,
+        "failed": [name for name, r in results["results"].items() if "error" in r],
+        "results": results,
+    }
+    if comparison is not None:
+        if args.json:
+            # the text table above already shows the comparison
+            result["comparison"] = comparison
+        result["slower"] = [row["name"] for row in comparison if row["status"] == "slower"]
+        if args.fail_on_regression and result["slower"]:
+            raise CLIError(
+                f"{len(result['slower'])} benchmark(s) slower than the baseline: "
+                + ", ".join(result["slower"])
+            )
+    if result["failed"]:
+        # keep the results of the others, but exit with 1
+        result["ok"] = False
+        result["error"] = f"{len(result['failed'])} benchmark(s) failed: " + ", ".join(
+            result["failed"]
+        )
+    return result
+
+
+def cmd_profile(args) -> dict:
+    first, last = _frame_range(args)
+    profile_dir = _profile_dir(args)
+    start = time.perf_counter()
+    _run_pipeline(
+        args.yaml, first, last, args.mode, args.backend, args.workers, profile_dir=profile_dir
+    )
+    seconds = time.perf_counter() - start
+    return {
+        "command": "profile",
+        "yaml": str(args.yaml),
+        "first": first,
+        "last": last,
+        "mode": args.mode,
+        "backend": args.backend,
+        "workers": args.workers,
+        "seconds": seconds,
+        **_profile_report(profile_dir, args.sort, args.limit),
+    }
+
+
+def _instrumented(args) -> dict:
+    """Run the command with stage instrumentation if --metrics/--summary was given."""
+    from pyptv.instrumentation import JsonlSink, SummarySink, metrics
+
+    sinks = []
+    if getattr(args, "metrics", None):
+        sinks.append(JsonlSink(args.metrics.resolve()))
+    memory = getattr(args, "memory", False)
+    if getattr(args, "summary", False) or memory:
+        sinks.append(SummarySink())
+    if not sinks:
+        return args.func(args)
+
+    metrics.reset()
+    metrics.enable(*sinks, memory=memory)
+    try:
+        result = args.func(args)
+    finally:
+        metrics.disable()
+    result["metrics"] = metrics.summary()
+    return result
+
+
+def cmd_gui(args) -> dict:
+    from pyptv import pyptv_gui
+
+    sys.argv = ["pyptv"] + ([str(args.path)] if args.path else [])
+    pyptv_gui.main()
+    return {}
+
+
+def _add_frame_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("yaml", type=_yaml_path, help="parameters_*.yaml of the experiment")
+    parser.add_argument("--first", type=int, default=None, help="First frame (default: sequence.first)")
+    parser.add_argument("--last", type=int, default=None, help="Last frame (default: sequence.last)")
+    parser.add_argument("--json", action="store_true", help="Print a JSON result on stdout")
+    parser.add_argument("--metrics", type=Path, default=None, help="Append per-stage timing events to this JSON-lines file")
+    parser.add_argument("--summary", action="store_true", help="Print a per-stage timing table at the end")
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Track peak memory per stage and worker (tracemalloc + RSS); implies --summary",
+    )
+
+
+def _add_backend_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--backend", choices=BACKENDS, default="serial", help="serial (default) or process pool")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --backend process (default: CPU count)")
+
+
+def _add_profile_arg(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DIR",
+        help="Profile all processes with cProfile into DIR (default: res/profile/<command>_<timestamp>)",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from pyptv import __version__
+
+    parser = argparse.ArgumentParser(prog="pyptv", description="PyPTV command-line tools")
+    parser.add_argument("--version", action="version", version=f"pyptv {__version__}")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("run", help="Run sequence and/or tracking")
+    _add_frame_args(p)
+    p.add_argument("--mode", choices=MODES, default="both")
+    _add_backend_args(p)
+    p.add_argument("--sequence-plugin", default=None, help="Sequence plugin module from plugins/")
+    p.add_argument("--tracking-plugin", default=None, help="Tracking plugin module from plugins/")
+    _add_profile_arg(p)
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("track", help="Run tracking only")
+    _add_frame_args(p)
+    p.add_argument("--tracking-plugin", default=None, help="Tracking plugin module from plugins/")
+    p.add_argument("--score", action="store_true", help="Score the links against res/tracking_ground_truth.npz")
+    _add_profile_arg(p)
+    p.set_defaults(func=cmd_run, mode="tracking", backend="serial", workers=None, sequence_plugin=None)
+
+    p = sub.add_parser("calibrate", help="Calibrate cameras from known correspondences")
+    p.add_argument("yaml", type=_yaml_path, help="parameters_*.yaml of the experiment")
+    p.add_argument("npz", type=lambda v: Path(v).resolve(), help=".npz with xyz and xy arrays")
+    p.add_argument("--flags", nargs="*", default=None, help="Parameters to optimize (default: YAML orient flags)")
+    p.add_argument("--no-init-external", action="store_true", help="Skip the 4-point external_calibration start")
+    p.add_argument("--write", action="store_true", help="Write .ori/.addpar files")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes for per-camera solves (1 = serial)")
+    p.add_argument("--json", action="store_true", help="Print a JSON result on stdout")
+    p.set_defaults(func=cmd_calibrate)
+
+    p = sub.add_parser("sweep", help="Run the sequence step over a parameter grid")
+    _add_frame_args(p)
+    p.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="SECTION.KEY=V1[,V2...]",
+        help="Parameter values to sweep; repeat for a grid",
+    )
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("synth", help="Render a synthetic particle-image sequence with ground truth")
+    p.add_argument("yaml", type=_yaml_path, help="parameters_*.yaml of the experiment")
+    p.add_argument("--particles", type=int, default=1000, help="Particles per frame")
+    p.add_argument("--first", type=int, default=None, help="First frame (default: sequence.first)")
+    p.add_argument("--last", type=int, default=None, help="Last frame (default: sequence.last)")
+    p.add_argument("--flow", choices=("uniform", "vortex", "shear", "abc"), default="vortex")
+    p.add_argument("--speed", type=float, default=0.5, help="Largest displacement per frame, mm")
+    p.add_argument("--sigma", type=float, default=1.0, help="Particle image radius (Gaussian sigma), pixels")
+    p.add_argument("--noise", type=float, default=2.0, help="Image noise sigma, grey values")
+    p.add_argument("--targets", action="store_true", help="Write _targets and res/rt_is files instead of images")
+    p.add_argument("--noise-px", type=float, default=0.0, help="--targets: target position noise, pixels")
+    p.add_argument("--noise-mm", type=float, default=0.0, help="--targets: rt_is position noise, mm")
+    p.add_argument("--dropout", type=float, default=0.0, help="--targets: probability a target is missing per camera")
+    p.add_argument("--ghosts", type=float, default=0.0, help="--targets: ghost particles per reconstructed particle")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", type=Path, default=None, help="Write under this directory instead of the experiment")
+    p.add_argument("--json", action="store_true", help="Print a JSON result on stdout")
+    p.set_defaults(func=cmd_synth)
+
+    p = sub.add_parser("ingest", help="Pack the sequence images into an HDF5 frame store")
+    _add_frame_args(p)
+    p.add_argument(
+        "--output", type=Path, default=None,
+        help="Frame store, relative to the experiment (default: frames.h5 next to the first camera's images)",
+    )
+    p.add_argument("--complevel", type=int, default=5, help="Compression level, 0-9")
+    p.add_argument("--complib", default="blosc:lz4", help="PyTables compression library")
+    p.add_argument("--write", action="store_true", help="Set sequence.frame_store in the YAML file")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("frames", help="List missing images of the sequence, from one directory listing")
+    _add_frame_args(p)
+    p.add_argument("--sizes", action="store_true", help="Also report image file sizes (one stat per file)")
+    p.add_argument("--strict", action="store_true", help="Exit with 1 if any image is missing")
+    p.set_defaults(func=cmd_frames)
+
+    p = sub.add_parser("background", help="Build per-camera background images for masking from the sequence")
+    _add_frame_args(p)
+    p.add_argument("--samples", type=int, default=50, help="Frames sampled evenly over the range")
+    p.add_argument("--percentile", type=float, default=50.0, help="Per-pixel percentile (50 = median)")
+    p.add_argument(
+        "--output", default=None,
+        help="Background file names with %%d for the camera number (default: masking.mask_base_name, "
+        "or background_cam%%d.tif)",
+    )
+    p.add_argument("--memory-mb", type=float, default=512, help="Memory per camera; larger samples spill to disk")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes, one camera each (1 = serial)")
+    p.add_argument("--write", action="store_true", help="Set masking.mask_base_name and mask_flag in the YAML file")
+    p.set_defaults(func=cmd_background)
+
+    p = sub.add_parser(
+        "benchmark", help="Run the benchmark suite or time an experiment, and compare with a baseline"
+    )
+    p.add_argument("select", nargs="*", help="Only benchmarks matching these names or glob patterns")
+    p.add_argument(
+        "--suite", type=Path, default=None,
+        help="Directory with bench_*.py files (default: benchmarks/ of the source tree)",
+    )
+    p.add_argument(
+        "--experiment", type=_yaml_path, default=None, metavar="YAML",
+        help="Time the pipeline of this experiment instead of the suite",
+    )
+    p.add_argument("--first", type=int, default=None, help="--experiment: first frame (default: sequence.first)")
+    p.add_argument("--last", type=int, default=None, help="--experiment: last frame (default: sequence.last)")
+    p.add_argument("--mode", choices=MODES, default="sequence", help="--experiment: steps to run")
+    _add_backend_args(p)
+    p.add_argument("--quick", action="store_true", help="Only the smallest size of every parametrized benchmark")
+    p.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark")
+    p.add_argument("--warmup", type=int, default=1, help="Untimed repetitions per benchmark")
+    p.add_argument("--output", type=Path, default=None, help="Write the results to this JSON file")
+    p.add_argument("--baseline", type=Path, default=None, help="Compare with a results file saved by --output")
+    p.add_argument("--threshold", type=float, default=0.1, help="Relative change reported as slower/faster")
+    p.add_argument("--fail-on-regression", action="store_true", help="Exit with 1 if a benchmark got slower")
+    p.add_argument("--list", action="store_true", help="List the benchmarks without running them")
+    p.add_argument("--json", action="store_true", help="Print a JSON result on stdout")
+    p.set_defaults(func=cmd_benchmark)
+
+    p = sub.add_parser("profile", help="Profile one run with cProfile, including worker processes")
+    _add_frame_args(p)
+    p.add_argument("--mode", choices=MODES, default="both")
+    _add_backend_args(p)
+    p.add_argument(
+        "--output", dest="profile", default="", metavar="DIR",
+        help="Profile directory (default: res/profile/profile_<timestamp>)",
+    )
+    p.add_argument("--sort", default="cumulative", help="pstats sort key")
+    p.add_argument("--limit", type=int, default=25, help="Number of functions to report")
+    p.set_defaults(func=cmd_profile)
+
+    p = sub.add_parser("gui", help="Start the GUI")
+    p.add_argument("path", nargs="?", default=None, help="Experiment directory or YAML file")
+    p.set_defaults(func=cmd_gui, json=False)
+
+    return parser
+
+
+def _print_text(result: dict) -> None:
+    for key, value in result.items():
+        if isinstance(value, dict):
+            # nested reports (e.g. metrics) are only emitted with --json
+            continue
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            print(f"{key}:")
+            for row in value:
+                print("  " + ", ".join(f"{k}={v}" for k, v in row.items()))
+        elif isinstance(value, float):
+            print(f"{key}: {value:.4g}")
+        else:
+            print(f"{key}: {value}")
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point of ``python -m pyptv``; returns the process exit code."""
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        args = build_parser().parse_args(["gui"])
+
+    as_json = bool(getattr(args, "json", False))
+    try:
+        # keep stdout clean for the JSON document
+        with stdout_to_stderr() if as_json else contextlib.nullcontext():
+            result = _instrumented(args)
+    except Exception as exc:
+        if as_json:
+            print(json.dumps({"command": args.command, "ok": False, "error": str(exc)}))
+        else:
+            print(f"pyptv {args.command}: error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.command == "gui":
+        return 0
+    result = {"ok": True, **result}
+    if as_json:
+        print(json.dumps(result))
+    else:
+        _print_text(result)
+    return 0 if result["ok"] else 1
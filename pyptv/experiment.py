@@ -8,23 +8,73 @@ and experiment configuration for PyPTV.
 import copy
 import shutil
 from pathlib import Path
-from traits.api import HasTraits, Instance, List, Str, Bool, Any
+from traits.api import HasTraits, Instance, List, Str, Bool, Any, Property
 from pyptv.parameter_manager import ParameterManager
 
 
 class Paramset(HasTraits):
-    """A parameter set with a name and YAML file path"""
+    """A parameter set with a name and YAML file path
+
+    The YAML file is parsed on first access to ``parameters`` or
+    ``num_cams``. A set found only as a legacy ``parameters*`` directory
+    keeps that directory in ``legacy_dir`` and is converted to YAML when
+    it is first loaded.
+    """
     name = Str()
     yaml_path = Path()
-    parameters = Any()
-    num_cams = Any()
+    legacy_dir = Any()
+    parameters = Property()
+    num_cams = Property()
+    _parameters = Any()
+    _num_cams = Any()
     
-    def __init__(self, name: str, yaml_path: Path, **traits):
+    def __init__(self, name: str, yaml_path: Path, legacy_dir: Path = None, **traits):
         super().__init__(**traits)
         self.name = name
         self.yaml_path = yaml_path
-        self.parameters = {}
-        self.num_cams = None
+        self.legacy_dir = legacy_dir
+        self._parameters = None
+        self._num_cams = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._parameters is not None
+
+    def ensure_yaml(self):
+        """Convert the legacy directory to YAML if the YAML file is missing"""
+        if self.legacy_dir is not None and not self.yaml_path.exists():
+            print(f"Converting legacy directory {self.legacy_dir} to {self.yaml_path}")
+            pm = ParameterManager()
+            pm.from_directory(self.legacy_dir)
+            pm.to_yaml(self.yaml_path)
+
+    def load(self):
+        """Parse the YAML file of this set"""
+        try:
+            self.ensure_yaml()
+            pm = ParameterManager()
+            pm.from_yaml(self.yaml_path)
+            self._parameters = pm.parameters
+            self._num_cams = pm.num_cams
+        except Exception as e:
+            print(f"Warning: Failed to load parameters from {self.yaml_path}: {e}")
+            self._parameters = {}
+
+    def _get_parameters(self):
+        if self._parameters is None:
+            self.load()
+        return self._parameters
+
+    def _set_parameters(self, value):
+        self._parameters = value
+
+    def _get_num_cams(self):
+        if self._parameters is None:
+            self.load()
+        return self._num_cams
+
+    def _set_num_cams(self, value):
+        self._num_cams = value
 
 
 class Experiment(HasTraits):
@@ -72,6 +122,7 @@ class Experiment(HasTraits):
     def load_parameters_for_active(self):
         """Load parameters for the active parameter set"""
         try:
+            self.active_params.ensure_yaml()
             print(f"Loading parameters from YAML: {self.active_params.yaml_path}")
             self.pm.from_yaml(self.active_params.yaml_path)
             self.active_params.parameters = copy.deepcopy(self.pm.parameters)
@@ -134,6 +185,7 @@ class Experiment(HasTraits):
         if paramset_obj is None:
             raise ValueError(f"No parameter set found with name '{old_name}'")
 
+        paramset_obj.ensure_yaml()
         old_yaml = paramset_obj.yaml_path
         if not old_yaml.exists():
             raise FileNotFoundError(f"YAML file for parameter set '{old_name}' does not exist: {old_yaml}")
@@ -174,7 +226,12 @@ class Experiment(HasTraits):
         self.load_parameters_for_active()
 
     def _collect_yaml_files(self, exp_path: Path):
-        yaml_files = list(exp_path.glob("*parameters_*.yaml"))
+        """Return sorted (yaml_file, legacy_dir) pairs found in exp_path.
+
+        legacy_dir is None unless the YAML file has yet to be created from a
+        legacy ``parameters*`` directory; nothing is converted here.
+        """
+        yaml_files = {f: None for f in exp_path.glob("*parameters_*.yaml")}
 
         subdirs = [
             d for d in exp_path.iterdir()
@@ -185,15 +242,10 @@ class Experiment(HasTraits):
             run_name = subdir.name.replace("parameters", "") or "Run1"
             yaml_file = exp_path / f"parameters_{run_name}.yaml"
 
-            if not yaml_file.exists():
-                print(f"Converting legacy directory {subdir} to {yaml_file}")
-                pm = ParameterManager()
-                pm.from_directory(subdir)
-                pm.to_yaml(yaml_file)
+            if yaml_file not in yaml_files:
+                yaml_files[yaml_file] = None if yaml_file.exists() else subdir
 
-            yaml_files.append(yaml_file)
-
-        return sorted(set(yaml_files))
+        return sorted(yaml_files.items())
 
     def _run_name_from_yaml(self, yaml_file: Path):
         filename = yaml_file.stem
@@ -205,17 +257,12 @@ class Experiment(HasTraits):
             return filename.split("_parameters", 1)[0]
         return filename
 
-    def _load_paramset_from_yaml(self, yaml_file: Path):
+    def _load_paramset_from_yaml(self, yaml_file: Path, legacy_dir: Path = None):
+        """Register a parameter set; its YAML is parsed on first access"""
         run_name = self._run_name_from_yaml(yaml_file)
         print(f"Adding parameter set: {run_name} from {yaml_file}")
         paramset = self.addParamset(run_name, yaml_file)
-        try:
-            pm = ParameterManager()
-            pm.from_yaml(yaml_file)
-            paramset.parameters = copy.deepcopy(pm.parameters)
-            paramset.num_cams = pm.num_cams
-        except Exception as e:
-            print(f"Warning: Failed to load parameters from {yaml_file}: {e}")
+        paramset.legacy_dir = legacy_dir
         return paramset
 
     # def export_legacy_directory(self, output_dir: Path):
@@ -232,8 +279,8 @@ class Experiment(HasTraits):
 
         yaml_files = self._collect_yaml_files(exp_path)
 
-        for yaml_file in yaml_files:
-            self._load_paramset_from_yaml(yaml_file)
+        for yaml_file, legacy_dir in yaml_files:
+            self._load_paramset_from_yaml(yaml_file, legacy_dir)
         
         # Set the first parameter set as active if none is active
         if self.nParamsets() > 0 and self.active_params is None:
@@ -247,6 +294,7 @@ class Experiment(HasTraits):
         if paramset_obj is None:
             raise ValueError(f"No parameter set found with name '{run_name}'")
         
+        paramset_obj.ensure_yaml()
         src_yaml = paramset_obj.yaml_path
         if not src_yaml.exists():
             raise FileNotFoundError(f"YAML file for parameter set '{run_name}' does not exist: {src_yaml}")
@@ -0,0 +1,686 @@
+"""Frame sources: where the images of a sequence are read from.
+
+``py_sequence_loop``, the batch workers and the GUI ask a
+:class:`FrameSource` for the image of camera ``cam`` (0-based) at frame
+number ``frame`` instead of formatting ``sequence.base_name`` and opening
+one file per image themselves. :func:`open_frame_source` picks the source
+from the ``sequence`` parameters:
+
+- ``frame_store: img/frames.h5`` -- :class:`HDF5FrameSource`, a chunked,
+  compressed HDF5 container written by :func:`ingest_sequence`
+  (``python -m pyptv ingest``); one chunk read per image, no per-frame
+  file open
+- ``raw: {width, height, ...}`` -- :class:`RawFrameSource`, headerless
+  camera dumps with many frames per file, memory-mapped; ``base_name`` is
+  the dump file of each camera
+- ``tiff_stack: {...}`` -- :class:`TiffStackFrameSource`, one multi-page
+  TIFF per camera (``base_name``), one page per frame, read on demand
+- otherwise :class:`FileFrameSource`, one image file per camera and frame
+  named ``base_name % frame``
+
+With ``ptv.splitter`` the configured source holds one composite image per
+frame (``base_name[0]``) and :class:`SplitterFrameSource` hands out the four
+camera views of it.
+
+Sources open their files lazily and re-open them after a fork, so a source
+may be created in the parent process and used by the batch workers.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+import numpy as np
+from imageio.v3 import imread
+
+# quadrant per camera, as in ptv.image_split
+DEFAULT_SPLITTER_ORDER = (0, 1, 3, 2)
+STORE_VERSION = 1
+DEFAULT_STORE_NAME = "frames.h5"
+# base_name placeholders of unused cameras
+_NO_IMAGE = ("--", "---", "", None)
+
+
+def frame_path(base_name: str, frame: int) -> Path:
+    """``base_name % frame``, or ``base_name`` itself if it has no format field."""
+    return Path(base_name % frame if "%" in base_name else base_name)
+
+
+class FrameSource:
+    """Images of a sequence by camera and frame number."""
+
+    num_cams: int = 0
+
+    def read(self, cam: int, frame: int) -> np.ndarray:
+        """The image of camera ``cam`` at ``frame`` as stored (grey or RGB, any dtype).
+
+        Raises FileNotFoundError if the frame does not exist.
+        """
+        raise NotImplementedError
+
+    def has_frame(self, cam: int, frame: int) -> bool:
+        raise NotImplementedError
+
+    def unused(self, cam: int) -> bool:
+        """True for a camera whose base name is a placeholder ("--"); it is never checked."""
+        return False
+
+    def missing_frames(self, first: int, last: int) -> dict[int, list[int]]:
+        """Camera -> frames of first..last that have no image (cameras with none missing are left out)."""
+        return {
+            cam: missing
+            for cam in range(self.num_cams)
+            if not self.unused(cam)
+            and (missing := [f for f in range(first, last + 1) if not self.has_frame(cam, f)])
+        }
+
+    def check_frames(self, first: int, last: int) -> None:
+        """Raise FileNotFoundError listing every missing frame of first..last."""
+        missing = self.missing_frames(first, last)
+        if missing:
+            details = "; ".join(
+                f"cam{cam + 1}: "
+                + ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in frame_ranges(frames))
+                for cam, frames in missing.items()
+            )
+            cam, frames = next(iter(missing.items()))
+            raise FileNotFoundError(
+                f"Missing frames in {first}..{last}: {details} "
+                f"(first: {self.name(cam, frames[0])} does not exist)"
+            )
+
+    def name(self, cam: int, frame: int) -> str:
+        """Human-readable location of an image, for messages."""
+        return f"cam{cam + 1} frame {frame}"
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class FrameIndex:
+    """Frame number -> image file of every camera, from one listing per directory.
+
+    ``base_name`` patterns such as ``img/cam1.%d`` or ``img/C001_%05d.tif``
+    are matched against a single ``os.scandir`` of their directory (shared
+    by cameras in the same directory) instead of one ``stat`` per camera
+    and frame. With ``sizes=True`` the file sizes are recorded as well,
+    which costs one ``stat`` per file on most filesystems.
+
+    Base names without a format field name one image used for every frame.
+    """
+
+    def __init__(self, base_names: Sequence[str], sizes: bool = False):
+        self.base_names = list(base_names)
+        self.paths: list[dict[int, Path]] = []
+        self.sizes: Optional[list[dict[int, int]]] = [] if sizes else None
+        self._static: dict[int, Optional[Path]] = {}
+        listings: dict[Path, list[os.DirEntry]] = {}
+        for cam, base_name in enumerate(self.base_names):
+            paths: dict[int, Path] = {}
+            cam_sizes: dict[int, int] = {}
+            pattern = _frame_pattern(base_name)
+            if base_name in _NO_IMAGE:
+                pass
+            elif pattern is None:
+                path = Path(base_name)
+                self._static[cam] = path if path.exists() else None
+            else:
+                directory = Path(base_name).parent
+                if directory not in listings:
+                    try:
+                        with os.scandir(directory) as entries:
+                            listings[directory] = list(entries)
+                    except FileNotFoundError:
+                        listings[directory] = []
+                for entry in listings[directory]:
+                    match = pattern.fullmatch(entry.name)
+                    if match is None:
+                        continue
+                    frame = int(match.group(1))
+                    # "%d" also matches zero-padded names of other frames
+                    if Path(base_name % frame).name != entry.name:
+                        continue
+                    paths[frame] = directory / entry.name
+                    if sizes:
+                        cam_sizes[frame] = entry.stat().st_size
+            self.paths.append(paths)
+            if sizes:
+                self.sizes.append(cam_sizes)
+
+    def path(self, cam: int, frame: int) -> Optional[Path]:
+        """The image file of a camera and frame, None if there is none."""
+        if cam in self._static:
+            return self._static[cam]
+        return self.paths[cam].get(frame)
+
+    def frames(self, cam: int) -> list[int]:
+        return sorted(self.paths[cam])
+
+    def missing(self, cam: int, first: int, last: int) -> list[int]:
+        """Frames of first..last without an image; [] for unused cameras."""
+        if self.base_names[cam] in _NO_IMAGE:
+            return []
+        if cam in self._static:
+            return [] if self._static[cam] is not None else list(range(first, last + 1))
+        found = self.paths[cam]
+        return [frame for frame in range(first, last + 1) if frame not in found]
+
+
+def _frame_pattern(base_name) -> Optional[re.Pattern]:
+    """Regular expression for the file names of a base name with one %d field."""
+    if base_name in _NO_IMAGE:
+        return None
+    name = Path(base_name).name
+    fields = list(re.finditer(r"%0?\d*[di]", name))
+    if len(fields) != 1 or "%" in name.replace(fields[0].group(), "", 1):
+        return None
+    field = fields[0]
+    return re.compile(
+        re.escape(name[: field.start()]) + r"(\d+)" + re.escape(name[field.end():])
+    )
+
+
+def frame_ranges(frames: Sequence[int]) -> list[tuple[int, int]]:
+    """Consecutive runs of sorted frame numbers as (first, last) pairs."""
+    runs = []
+    for frame in frames:
+        if runs and frame == runs[-1][1] + 1:
+            runs[-1][1] = frame
+        else:
+            runs.append([frame, frame])
+    return [(a, b) for a, b in runs]
+
+
+class FileFrameSource(FrameSource):
+    """One image file per camera and frame, named by ``base_name % frame``.
+
+    The files are looked up in a :class:`FrameIndex` built on first use,
+    so checking for a frame does not touch the filesystem.
+    """
+
+    def __init__(
+        self,
+        base_names: Sequence[str],
+        reader: Callable = imread,
+        index: Optional[FrameIndex] = None,
+    ):
+        self.base_names = list(base_names)
+        self.num_cams = len(self.base_names)
+        self._reader = reader
+        self._index = index
+
+    @property
+    def index(self) -> FrameIndex:
+        if self._index is None:
+            self._index = FrameIndex(self.base_names)
+        return self._index
+
+    def path(self, cam: int, frame: int) -> Optional[Path]:
+        return self.index.path(cam, frame)
+
+    def has_frame(self, cam: int, frame: int) -> bool:
+        return self.index.path(cam, frame) is not None
+
+    def unused(self, cam: int) -> bool:
+        return self.base_names[cam] in _NO_IMAGE
+
+    def missing_frames(self, first: int, last: int) -> dict[int, list[int]]:
+        return {
+            cam: missing
+            for cam in range(self.num_cams)
+            if (missing := self.index.missing(cam, first, last))
+        }
+
+    def name(self, cam: int, frame: int) -> str:
+        base_name = self.base_names[cam]
+        return str(base_name) if base_name in _NO_IMAGE else str(frame_path(base_name, frame))
+
+    def read(self, cam: int, frame: int) -> np.ndarray:
+        path = self.index.path(cam, frame)
+        if path is None:
+            raise FileNotFoundError(f"{self.name(cam, frame)} does not exist")
+        return self._reader(path)
+
+
+class HDF5FrameSource(FrameSource):
+    """Images packed by :func:`ingest_sequence` into one HDF5 file.
+
+    Every camera is a group ``/cam<n>`` with an ``images`` array of shape
+    (frames, height, width), chunked one image per chunk, and the matching
+    ``frames`` numbers, so reading an image is one chunk read.
+    """
+
+    def __init__(self, path: Union[str, Path], num_cams: Optional[int] = None):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Frame store does not exist: {self.path}")
+        self._h5 = None
+        self._pid = None
+        self._images = {}
+        self._index = {}
+        h5 = self._file()
+        stored = int(h5.root._v_attrs.num_cams)
+        self.num_cams = stored if num_cams is None else int(num_cams)
+        # ingest_sequence stores the base names as str, None as "None"
+        base_names = list(getattr(h5.root._v_attrs, "base_names", []))
+        self._unused = {
+            cam for cam, name in enumerate(base_names) if name in _NO_IMAGE or name == "None"
+        }
+
+    def _file(self):
+        # HDF5 handles must not be shared across fork; re-open in the child
+        if self._h5 is None or self._pid != os.getpid():
+            import tables
+
+            self._h5 = tables.open_file(str(self.path), mode="r")
+            self._pid = os.getpid()
+            self._images.clear()
+            self._index.clear()
+        return self._h5
+
+    def _camera(self, cam: int):
+        h5 = self._file()
+        if cam not in self._index:
+            group = f"/cam{cam + 1}"
+            if group in h5:
+                node = h5.get_node(group)
+                frames = node.frames.read()
+                self._images[cam] = node.images
+                self._index[cam] = dict(zip(frames.tolist(), range(len(frames))))
+            else:
+                self._images[cam] = None
+                self._index[cam] = {}
+        return self._images[cam], self._index[cam]
+
+    def frames(self, cam: int) -> list[int]:
+        return sorted(self._camera(cam)[1])
+
+    def has_frame(self, cam: int, frame: int) -> bool:
+        return frame in self._camera(cam)[1]
+
+    def unused(self, cam: int) -> bool:
+        return cam in self._unused
+
+    def name(self, cam: int, frame: int) -> str:
+        return f"{self.path}:/cam{cam + 1} frame {frame}"
+
+    def read(self, cam: int, frame: int) -> np.ndarray:
+        images, index = self._camera(cam)
+        row = index.get(frame)
+        if row is None:
+            raise FileNotFoundError(f"{self.name(cam, frame)} does not exist")
+        return images[row]
+
+    def close(self) -> None:
+        if self._h5 is not None and self._pid == os.getpid():
+            self._h5.close()
+        self._h5 = None
+        self._images.clear()
+        self._index.clear()
+
+
+class RawFrameSource(FrameSource):
+    """Memory-mapped raw camera dumps: fixed-size frames, many per file.
+
+    Frame ``first_frame + k`` of a camera starts at byte
+    ``header + k * frame_stride`` of its file and holds ``height`` rows of
+    ``width`` pixels of ``dtype`` (a NumPy dtype string, e.g. ``uint8``,
+    ``<u2``, ``>u2``). ``frame_stride`` defaults to the frame size; larger
+    values skip per-frame trailers. :meth:`read` returns read-only views
+    into the mapping, so no pixel is copied before processing.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[Union[str, Path]],
+        width: int,
+        height: int,
+        dtype: str = "uint8",
+        header: int = 0,
+        frame_stride: Optional[int] = None,
+        first_frame: int = 0,
+    ):
+        self.paths = [None if p in _NO_IMAGE else Path(p) for p in paths]
+        self.num_cams = len(self.paths)
+        self.dtype = np.dtype(dtype)
+        self.shape = (int(height), int(width))
+        self.header = int(header)
+        frame_bytes = self.shape[0] * self.shape[1] * self.dtype.itemsize
+        self.frame_stride = int(frame_stride or frame_bytes)
+        if self.frame_stride < frame_bytes:
+            raise ValueError(
+                f"frame_stride ({self.frame_stride}) is smaller than a frame ({frame_bytes} bytes)"
+            )
+        self.first_frame = int(first_frame)
+        self._stacks = {}
+
+    def _stack(self, cam: int) -> Optional[np.ndarray]:
+        """(frames, height, width) view of a camera's file; None if it has none."""
+        if cam not in self._stacks:
+            path = self.paths[cam]
+            if path is None or not path.exists():
+                self._stacks[cam] = None
+                return None
+            size = path.stat().st_size
+            frame_bytes = self.shape[0] * self.shape[1] * self.dtype.itemsize
+            n_frames = max(0, (size - self.header - frame_bytes) // self.frame_stride + 1)
+            if n_frames == 0:
+                self._stacks[cam] = None
+                return None
+            mapped = np.memmap(path, dtype=np.uint8, mode="r")
+            self._stacks[cam] = np.ndarray(
+                (n_frames, *self.shape),
+                dtype=self.dtype,
+                buffer=mapped,
+                offset=self.header,
+                strides=(self.frame_stride, self.shape[1] * self.dtype.itemsize, self.dtype.itemsize),
+            )
+        return self._stacks[cam]
+
+    def frames(self, cam: int) -> range:
+        stack = self._stack(cam)
+        return range(self.first_frame, self.first_frame + (0 if stack is None else len(stack)))
+
+    def has_frame(self, cam: int, frame: int) -> bool:
+        return frame in self.frames(cam)
+
+    def unused(self, cam: int) -> bool:
+        return self.paths[cam] is None
+
+    def name(self, cam: int, frame: int) -> str:
+        return f"{self.paths[cam]} frame {frame}"
+
+    def read(self, cam: int, frame: int) -> np.ndarray:
+        if not self.has_frame(cam, frame):
+            raise FileNotFoundError(f"{self.name(cam, frame)} does not exist")
+        return self._stacks[cam][frame - self.first_frame]
+
+    def close(self) -> None:
+        self._stacks.clear()
+
+
+class TiffStackFrameSource(FrameSource):
+    """Multi-page TIFF stacks, one per camera; page ``k`` is frame ``first_frame + k``.
+
+    The page offsets of a stack are indexed once, when the camera is first
+    read. Uncompressed pages are then read with a single ``readinto`` at
+    their offset; compressed pages are decoded by tifffile. ``readahead``
+    asks the OS to prefetch that many following pages after every read.
+    Each process opens its own file handles.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[Union[str, Path]],
+        first_frame: int = 0,
+        readahead: int = 0,
+    ):
+        self.paths = [None if p in _NO_IMAGE else Path(p) for p in paths]
+        self.num_cams = len(self.paths)
+        self.first_frame = int(first_frame)
+        self.readahead = int(readahead)
+        self._pid = None
+        self._stacks = {}
+
+    def _stack(self, cam: int) -> Optional[dict]:
+        if self._pid != os.getpid():
+            # handles inherited through fork are not ours to use or close
+            self._stacks = {}
+            self._pid = os.getpid()
+        if cam not in self._stacks:
+            path = self.paths[cam]
+            self._stacks[cam] = None if path is None or not path.exists() else self._index(path)
+        return self._stacks[cam]
+
+    @staticmethod
+    def _index(path: Path) -> dict:
+        import tifffile
+
+        tif = tifffile.TiffFile(path)
+        pages = tif.pages
+        pages.cache = False
+        pages.useframes = True
+        key = pages.first
+        # a stack may also be written as one multi-sample or volumetric page
+        shape = tuple(key.shape[1:]) if key.axes[0] not in "YX" else tuple(key.shape)
+        dtype = np.dtype(key.dtype).newbyteorder(tif.byteorder)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        series = tif.series[0]
+        if series.dataoffset is not None and tuple(series.shape[-len(shape):]) == shape:
+            # one contiguous block of frames, as written by tifffile and
+            # ImageJ (whose large stacks have a single IFD)
+            n_frames = int(np.prod(series.shape[: -len(shape)]))
+            offsets = series.dataoffset + nbytes * np.arange(n_frames, dtype=np.int64)
+        elif shape != tuple(key.shape):
+            raise ValueError(f"{path}: compressed multi-frame TIFF pages are not supported")
+        else:
+            offsets = np.full(len(pages), -1, dtype=np.int64)
+            for i in range(len(pages) if key.compression == 1 and key.is_final else 0):
+                page = pages[i]
+                starts, counts = page.dataoffsets, page.databytecounts
+                if sum(counts) == nbytes and all(
+                    a + c == b for a, c, b in zip(starts, counts, starts[1:])
+                ):
+                    offsets[i] = starts[0]
+        return {
+            "tif": tif,
+            "raw": open(path, "rb", buffering=0),
+            "shape": shape,
+            "dtype": dtype,
+            "nbytes": nbytes,
+            "offsets": offsets,
+        }
+
+    def frames(self, cam: int) -> range:
+        stack = self._stack(cam)
+        n_pages = 0 if stack is None else len(stack["offsets"])
+        return range(self.first_frame, self.first_frame + n_pages)
+
+    def has_frame(self, cam: int, frame: int) -> bool:
+        return frame in self.frames(cam)
+
+    def unused(self, cam: int) -> bool:
+        return self.paths[cam] is None
+
+    def name(self, cam: int, frame: int) -> str:
+        return f"{self.paths[cam]} page {frame - self.first_frame}"
+
+    def read(self, cam: int, frame: int) -> np.ndarray:
+        if not self.has_frame(cam, frame):
+            raise FileNotFoundError(f"{self.name(cam, frame)} does not exist")
+        stack = self._stacks[cam]
+        page = frame - self.first_frame
+        offset = stack["offsets"][page]
+        if offset < 0:
+            return stack["tif"].pages[page].asarray()
+        img = np.empty(stack["shape"], dtype=stack["dtype"])
+        raw = stack["raw"]
+        raw.seek(offset)
+        raw.readinto(memoryview(img).cast("B"))
+        if self.readahead > 0 and hasattr(os, "posix_fadvise"):
+            ahead = stack["offsets"][page + 1 : page + 1 + self.readahead]
+            ahead = ahead[ahead >= 0]
+            if len(ahead):
+                start = int(ahead.min())
+                length = int(ahead.max()) - start + stack["nbytes"]
+                os.posix_fadvise(raw.fileno(), start, length, os.POSIX_FADV_WILLNEED)
+        return img
+
+    def close(self) -> None:
+        if self._pid == os.getpid():
+            for stack in self._stacks.values():
+                if stack is not None:
+                    stack["tif"].close()
+                    stack["raw"].close()
+        self._stacks = {}
+
+
+class SplitterFrameSource(FrameSource):
+    """Camera views of one composite image per frame, for image splitters.
+
+    The composite of a frame is read once from camera 0 of ``composite``
+    and split by ``ptv.image_split`` into quadrant views in ``order``; no
+    pixels are copied. The views are not C-contiguous, ``simple_highpass``
+    makes the one copy liboptv needs.
+    """
+
+    def __init__(
+        self,
+        composite: FrameSource,
+        num_cams: int = 4,
+        order: Sequence[int] = DEFAULT_SPLITTER_ORDER,
+    ):
+        if len(order) != 4 or sorted(order) != [0, 1, 2, 3]:
+            raise ValueError(f"splitter_order must be a permutation of 0..3, got {list(order)}")
+        if num_cams > 4:
+            raise ValueError(f"A splitter image has 4 views, not {num_cams}")
+        self.composite = composite
+        self.num_cams = num_cams
+        self.order = list(order)
+        self._frame = None
+        self._views = None
+
+    def _split(self, frame: int) -> list[np.ndarray]:
+        if self._frame != frame:
+            from pyptv.ptv import image_split
+
+            self._views = image_split(self.composite.read(0, frame), self.order)
+            self._frame = frame
+        return self._views
+
+    def read(self, cam: int, frame: int) -> np.ndarray:
+        return self._split(frame)[cam]
+
+    def has_frame(self, cam: int, frame: int) -> bool:
+        return self.composite.has_frame(0, frame)
+
+    def missing_frames(self, first: int, last: int) -> dict[int, list[int]]:
+        missing = self.composite.missing_frames(first, last).get(0)
+        return {0: missing} if missing else {}
+
+    def name(self, cam: int, frame: int) -> str:
+        return self.composite.name(0, frame)
+
+    def close(self) -> None:
+        self._frame = None
+        self._views = None
+        self.composite.close()
+
+
+def open_frame_source(
+    seq_params: dict, num_cams: int, ptv_params: Optional[dict] = None
+) -> FrameSource:
+    """The frame source configured in the ``sequence`` parameters.
+
+    With ``ptv_params`` of a splitter experiment (``splitter: true``), the
+    images of ``base_name[0]`` are split into ``num_cams`` views, in the
+    quadrant order ``splitter_order``.
+
+    Relative paths are resolved against the current directory, which is the
+    experiment directory during processing.
+    """
+    if ptv_params and ptv_params.get("splitter", False):
+        return SplitterFrameSource(
+            open_frame_source(seq_params, 1),
+            num_cams,
+            ptv_params.get("splitter_order", DEFAULT_SPLITTER_ORDER),
+        )
+    store = seq_params.get("frame_store")
+    if store:
+        return HDF5FrameSource(store, num_cams)
+    raw = seq_params.get("raw")
+    if raw:
+        raw = dict(raw)
+        raw.setdefault("first_frame", seq_params.get("first", 0))
+        return RawFrameSource(seq_params["base_name"][:num_cams], **raw)
+    stack = seq_params.get("tiff_stack")
+    if stack:
+        stack = dict(stack) if isinstance(stack, dict) else {}
+        stack.setdefault("first_frame", seq_params.get("first", 0))
+        return TiffStackFrameSource(seq_params["base_name"][:num_cams], **stack)
+    return FileFrameSource(seq_params["base_name"][:num_cams])
+
+
+def ingest_sequence(
+    base_names: Sequence[str],
+    frames: Sequence[int],
+    output: Union[str, Path],
+    complevel: int = 5,
+    complib: str = "blosc:lz4",
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """Pack per-camera image files into an HDF5 frame store.
+
+    Images are stored as read (dtype and channels unchanged), one chunk per
+    image. Frames missing on disk are skipped and simply absent from the
+    store. Cameras whose base name is a placeholder ("--") are not stored.
+
+    Returns a summary with the number of stored frames per camera and the
+    raw and compressed sizes.
+    """
+    import tables
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    filters = tables.Filters(complevel=complevel, complib=complib, shuffle=True)
+    source = FileFrameSource(base_names)
+    stored = []
+    raw_bytes = 0
+    with tables.open_file(str(tmp), mode="w", title="pyptv frame store") as h5:
+        h5.root._v_attrs.version = STORE_VERSION
+        h5.root._v_attrs.num_cams = len(base_names)
+        h5.root._v_attrs.base_names = [str(b) for b in base_names]
+        for cam in range(len(base_names)):
+            if base_names[cam] in _NO_IMAGE:
+                stored.append(0)
+                continue
+            group = h5.create_group("/", f"cam{cam + 1}")
+            images = None
+            numbers = []
+            for frame in frames:
+                if not source.has_frame(cam, frame):
+                    continue
+                img = np.ascontiguousarray(source.read(cam, frame))
+                if images is None:
+                    images = h5.create_earray(
+                        group,
+                        "images",
+                        atom=tables.Atom.from_dtype(img.dtype),
+                        shape=(0, *img.shape),
+                        filters=filters,
+                        chunkshape=(1, *img.shape),
+                        expectedrows=len(frames),
+                    )
+                elif img.shape != images.shape[1:]:
+                    raise ValueError(
+                        f"{source.name(cam, frame)} has shape {img.shape}, "
+                        f"expected {images.shape[1:]}"
+                    )
+                images.append(img[np.newaxis])
+                numbers.append(frame)
+                raw_bytes += img.nbytes
+                if progress is not None:
+                    progress(cam, frame)
+            if images is None:
+                raise FileNotFoundError(
+                    f"No images found for camera {cam + 1} ({base_names[cam]})"
+                )
+            h5.create_array(group, "frames", np.asarray(numbers, dtype=np.int64))
+            stored.append(len(numbers))
+    os.replace(tmp, output)
+    return {
+        "output": str(output),
+        "frames_per_camera": stored,
+        "raw_bytes": raw_bytes,
+        "file_bytes": output.stat().st_size,
+    }
@@ -0,0 +1,184 @@
+"""Highpass preprocessing of particle images with NumPy, in row bands on threads.
+
+:func:`box_highpass` computes the same image as liboptv
+``preprocess_image(img, 0, cpar, filter_size)``, the highpass of
+``simple_highpass``: the image minus its box-filtered (moving average)
+version, clipped at 0. The box is ``2 * filter_size + 1`` pixels wide and
+is evaluated separably with integer running sums, so the result is
+bit-identical to liboptv, including its edge handling:
+
+- near an edge the window shrinks symmetrically to the pixels in the image
+- the row sums near the left and right edges are rescaled to a full row
+  (``sum * n // count``)
+- within ``filter_size`` rows of the bottom edge liboptv divides the column
+  sum by two more rows than it holds; this is reproduced, not fixed
+
+The image is split into bands of rows which are filtered on a thread pool;
+NumPy releases the GIL in the cumulative sums and arithmetic, so large
+images (tens of megapixels) use several cores. Each band reads
+``filter_size`` extra rows above and below it. In the workers of the
+parallel batch the default thread count is the worker's share of the CPUs.
+
+The backend is chosen by ``ptv.highpass_backend`` (``optv`` or ``numpy``),
+see ``ptv.simple_highpass``.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+BACKENDS = ("optv", "numpy")
+# rows per band and worker thread when not given
+DEFAULT_BAND_ROWS = 256
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_key: Optional[tuple] = None
+# processes sharing the CPUs, see share_cpus
+_processes = 1
+
+
+def share_cpus(processes: int) -> None:
+    """Divide the CPUs among ``processes`` processes for :func:`default_workers`.
+
+    Every worker of the parallel batch calls this, so N workers do not start
+    a thread per CPU each.
+    """
+    global _processes
+    _processes = max(1, int(processes))
+
+
+def default_workers() -> int:
+    """Threads for the highpass: this process' share of the usable CPUs, at most 8."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus // _processes, 8))
+
+
+def _pool(workers: int) -> ThreadPoolExecutor:
+    """A shared thread pool; a forked batch worker gets a new one."""
+    global _executor, _executor_key
+    key = (os.getpid(), workers)
+    if _executor_key != key:
+        # the threads of a pool inherited over fork do not exist here
+        if _executor is not None and _executor_key[0] == key[0]:
+            _executor.shutdown(wait=False)
+        _executor = ThreadPoolExecutor(workers, thread_name_prefix="highpass")
+        _executor_key = key
+    return _executor
+
+
+def _row_sums(block: np.ndarray, span: int) -> np.ndarray:
+    """Row-wise box sums of ``block``, rescaled to ``2 * span + 1`` pixels at the edges."""
+    h, w = block.shape
+    n = 2 * span + 1
+    # running sums wrap around; differences of them are exact while a window
+    # sum fits the type
+    dtype = np.uint16 if 255 * n < 2**16 else np.uint32
+    csum = np.zeros((h, w + 1), dtype)
+    np.cumsum(block, axis=1, dtype=dtype, out=csum[:, 1:])
+    sums = np.empty((h, w), dtype)
+    np.subtract(csum[:, n:], csum[:, : w + 1 - n], out=sums[:, span : w - span])
+    if span:
+        size = 2 * np.arange(span) + 1
+        left = (csum[:, size] - csum[:, :1]).astype(np.uint32)
+        right = (csum[:, [w]] - csum[:, w - size]).astype(np.uint32)
+        sums[:, :span] = left * n // size
+        sums[:, w - span :] = (right * n // size)[:, ::-1]
+    return sums
+
+
+def _band(img: np.ndarray, out: np.ndarray, y0: int, y1: int, span: int) -> None:
+    """Highpass of rows ``y0:y1`` of ``img`` into ``out``."""
+    h, w = img.shape
+    n = 2 * span + 1
+    lo, hi = max(y0 - span, 0), min(y1 + span, h)
+    rows = _row_sums(img[lo:hi], span)
+    # column running sums row by row: np.cumsum along axis 0 is far slower
+    csum = np.empty((hi - lo + 1, w), np.uint32)
+    csum[0] = 0
+    for i, row in enumerate(rows):
+        np.add(csum[i], row, out=csum[i + 1])
+
+    # symmetric window of half-width `half` around each row y
+    y = np.arange(y0, y1)
+    half = np.minimum(np.minimum(y, h - 1 - y), span)
+    sums = np.empty((y1 - y0, w), np.uint32)
+    full = np.flatnonzero(half == span)
+    if len(full):
+        a, b = full[0], full[-1] + 1
+        np.subtract(
+            csum[y0 + a + span + 1 - lo : y0 + b + span + 1 - lo],
+            csum[y0 + a - span - lo : y0 + b - span - lo],
+            out=sums[a:b],
+        )
+        sums[a:b] //= np.uint32(n * n)
+    edge = np.flatnonzero(half < span)
+    if len(edge):
+        ye, he = y[edge], half[edge]
+        size = 2 * he + 1
+        # liboptv divides the column sums near the bottom edge by two rows too many
+        size = np.where(h - 1 - ye < span, size + 2, size)
+        sums[edge] = (csum[ye + he + 1 - lo] - csum[ye - he - lo]) // (n * size)[:, None].astype(
+            np.uint32
+        )
+    # the mean never exceeds 255; max(img, mean) - mean is img - mean clipped at 0
+    mean = sums.astype(np.uint8)
+    np.maximum(img[y0:y1], mean, out=out[y0:y1])
+    out[y0:y1] -= mean
+
+
+def box_highpass(
+    img: np.ndarray,
+    filter_size: int = 25,
+    workers: Optional[int] = None,
+    band_rows: Optional[int] = None,
+) -> np.ndarray:
+    """The liboptv highpass of an 8-bit grey image, computed with NumPy.
+
+    Args:
+        img: 2D uint8 image, any memory layout
+        filter_size: half-width of the box filter (liboptv ``lowpass_dim``)
+        workers: threads to filter the row bands on; by default
+            :func:`default_workers`. 1 filters in the calling thread.
+        band_rows: rows per band; by default ``DEFAULT_BAND_ROWS``, fewer
+            if the image has fewer bands than workers
+
+    Returns:
+        The highpass image, uint8, same shape as ``img``
+
+    Raises:
+        ValueError: if the image is not 2D uint8 or smaller than the filter
+            window in either direction
+    """
+    if img.ndim != 2 or img.dtype != np.uint8:
+        raise ValueError(f"Expected a 2D uint8 image, got {img.ndim}D {img.dtype}")
+    span = int(filter_size)
+    if span < 0:
+        raise ValueError(f"filter_size must be >= 0, got {filter_size}")
+    h, w = img.shape
+    n = 2 * span + 1
+    if h < n or w < n:
+        raise ValueError(
+            f"Image of {w}x{h} pixels is smaller than the {n}x{n} highpass window"
+        )
+    workers = default_workers() if workers is None else max(1, int(workers))
+    if band_rows is None:
+        band_rows = max(min(DEFAULT_BAND_ROWS, -(-h // workers)), 2 * span + 1)
+    band_rows = max(1, int(band_rows))
+
+    out = np.empty((h, w), np.uint8)
+    bands = [(y0, min(y0 + band_rows, h)) for y0 in range(0, h, band_rows)]
+    if workers == 1 or len(bands) == 1:
+        for y0, y1 in bands:
+            _band(img, out, y0, y1, span)
+    else:
+        pool = _pool(workers)
+        for future in [pool.submit(_band, img, out, y0, y1, span) for y0, y1 in bands]:
+            future.result()
+    return out
@@ -0,0 +1,451 @@
+"""Lightweight timing spans and counters for the processing pipeline.
+
+The module-level :data:`metrics` registry is disabled by default; in that
+state ``metrics.span()`` returns a shared no-op context manager and
+``metrics.count()`` returns immediately, so the calls can stay in the hot
+loops of ``py_sequence_loop`` and the tracker.
+
+When enabled, every span and counter is aggregated in memory (per-stage
+duration samples with log2 histograms, per-frame counter values) and passed
+to the attached sinks:
+
+- :class:`JsonlSink` appends one JSON object per event to a file
+- :class:`MemorySink` keeps the events in a list, mainly for tests
+- :class:`SummarySink` prints :meth:`Metrics.format_summary` when closed
+
+With ``memory=True`` every span also records the peak of Python/NumPy
+allocations above the level at its start (tracemalloc, ``mem_peak``), the
+net change (``mem_net``) and the resident set size at its end (``rss``).
+Memory allocated inside optv's C code is not seen by tracemalloc and only
+shows up in ``rss``, which is sampled only when a span exits. The summary
+then reports the peak per stage and per megapixel of camera image, the peak
+and largest end-of-span RSS per ``chunk`` tag (one frame range of a parallel
+run, ``main`` otherwise), and how many processes of the largest of those RSS
+samples fit in the currently available memory.
+
+Example::
+
+    from pyptv.instrumentation import metrics, JsonlSink, SummarySink
+
+    metrics.enable(JsonlSink("res/metrics.jsonl"), SummarySink(), memory=True)
+    py_sequence_loop(exp)
+    metrics.disable()   # closes the sinks, prints the summary
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import defaultdict
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterable, Optional
+
+_NULL_SPAN = nullcontext()
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None if it cannot be read."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Memory available for new processes without swapping, or None if unknown."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available
+
+
+class StageStats:
+    """Duration samples of one named span, in seconds."""
+
+    __slots__ = ("samples",)
+
+    def __init__(self):
+        self.samples = array("d")
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    @property
+    def total(self) -> float:
+        return math.fsum(self.samples)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return math.nan
+        idx = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+        return ordered[idx]
+
+    def histogram(self) -> dict[float, int]:
+        """Counts per power-of-two bucket; keys are bucket upper edges in seconds."""
+        buckets: dict[float, int] = defaultdict(int)
+        for seconds in self.samples:
+            exponent = math.frexp(seconds)[1] if seconds > 0 else -1074
+            buckets[math.ldexp(1.0, exponent)] += 1
+        return dict(sorted(buckets.items()))
+
+
+class MemoryStats:
+    """Memory samples of one named span, in bytes."""
+
+    __slots__ = ("peak", "net", "rss")
+
+    def __init__(self):
+        self.peak = array("q")
+        self.net = array("q")
+        self.rss = array("q")
+
+    def add(self, peak: int, net: int, rss: Optional[int]) -> None:
+        self.peak.append(peak)
+        self.net.append(net)
+        if rss is not None:
+            self.rss.append(rss)
+
+
+class _Span:
+    __slots__ = ("_metrics", "_name", "_tags", "_start", "_traced")
+
+    def __init__(self, metrics: "Metrics", name: str, tags: dict):
+        self._metrics = metrics
+        self._name = name
+        self._tags = tags
+
+    def __enter__(self):
+        if self._metrics.memory:
+            self._traced = self._metrics._memory_enter()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        event = {"type": "span", "name": self._name, "seconds": seconds, **self._tags}
+        if self._metrics.memory:
+            event.update(self._metrics._memory_exit(self._traced))
+        self._metrics._record(event)
+        return False
+
+
+class Metrics:
+    """Registry of spans and counters with pluggable sinks."""
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.frame: Optional[int] = None
+        self.tags: dict = {}
+        self.sinks: list = []
+        self._started_tracemalloc = False
+        self._peak_stack: list[int] = []
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all aggregated data (sinks stay attached)."""
+        self.stages: dict[str, StageStats] = defaultdict(StageStats)
+        self.counters: dict[str, dict] = defaultdict(lambda: defaultdict(int))
+        self.memory_stages: dict[str, MemoryStats] = defaultdict(MemoryStats)
+        self.chunk_memory: dict[str, dict] = defaultdict(lambda: {"mem_peak": 0, "rss": 0})
+        self.image_pixels = 0
+
+    def enable(self, *sinks, memory: bool = False, **tags) -> "Metrics":
+        """Start recording; ``tags`` are added to every event.
+
+        ``memory=True`` adds tracemalloc and RSS figures to every span.
+        """
+        self.sinks.extend(sinks)
+        self.tags = tags
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.enabled = True
+        return self
+
+    def _stop_memory(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.memory = False
+        self._peak_stack = []
+
+    def disable(self) -> None:
+        """Stop recording and close the sinks."""
+        self.enabled = False
+        self._stop_memory()
+        for sink in self.sinks:
+            sink.close(self)
+        self.sinks = []
+        self.tags = {}
+        self.frame = None
+
+    def detach(self) -> None:
+        """Forget sinks and data without closing the sinks.
+
+        Used in forked worker processes, which inherit the parent's sinks.
+        """
+        self.enabled = False
+        self._stop_memory()
+        self.sinks = []
+        self.tags = {}
+        self.frame = None
+        self.reset()
+
+    def _memory_enter(self) -> int:
+        # tracemalloc has a single peak; fold the enclosing span's peak so far
+        # into its stack slot before resetting it for this span
+        current, peak = tracemalloc.get_traced_memory()
+        if self._peak_stack:
+            self._peak_stack[-1] = max(self._peak_stack[-1], peak)
+        self._peak_stack.append(current)
+        tracemalloc.reset_peak()
+        return current
+
+    def _memory_exit(self, start: int) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self._peak_stack.pop() if self._peak_stack else 0)
+        if self._peak_stack:
+            self._peak_stack[-1] = max(self._peak_stack[-1], peak)
+        return {"mem_peak": peak - start, "mem_net": current - start, "rss": rss_bytes()}
+
+    def span(self, name: str, **tags):
+        """Context manager timing the enclosed block as stage ``name``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, tags)
+
+    def count(self, name: str, value: int = 1, **tags) -> None:
+        """Add ``value`` to counter ``name`` for the current frame."""
+        if not self.enabled:
+            return
+        self._record({"type": "count", "name": name, "value": value, **tags})
+
+    def _record(self, event: dict) -> None:
+        if self.frame is not None:
+            event.setdefault("frame", self.frame)
+        if self.tags:
+            for key, value in self.tags.items():
+                event.setdefault(key, value)
+        self._aggregate(event)
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def _aggregate(self, event: dict) -> None:
+        if event["type"] == "span":
+            self.stages[event["name"]].add(event["seconds"])
+            if "mem_peak" in event:
+                rss = event.get("rss")
+                self.memory_stages[event["name"]].add(event["mem_peak"], event["mem_net"], rss)
+                chunk = self.chunk_memory[str(event.get("chunk", "main"))]
+                chunk["mem_peak"] = max(chunk["mem_peak"], event["mem_peak"])
+                chunk["rss"] = max(chunk["rss"], rss or 0)
+        elif event["type"] == "count":
+            self.counters[event["name"]][event.get("frame")] += event["value"]
+            if event["name"] == "pixels":
+                self.image_pixels = max(self.image_pixels, event["value"])
+
+    def ingest(self, events: Iterable[dict]) -> None:
+        """Record events collected elsewhere, e.g. by worker processes."""
+        for event in events:
+            self._aggregate(event)
+            for sink in self.sinks:
+                sink.emit(event)
+
+    def summary(self) -> dict:
+        """Per-stage timing statistics and per-counter totals."""
+        stages = {
+            name: {
+                "count": stats.count,
+                "total": stats.total,
+                "mean": stats.total / stats.count,
+                "p50": stats.percentile(50),
+                "p95": stats.percentile(95),
+                "max": max(stats.samples),
+            }
+            for name, stats in self.stages.items()
+            if stats.count
+        }
+        counters = {
+            name: {
+                "frames": len(per_frame),
+                "total": sum(per_frame.values()),
+                "mean_per_frame": sum(per_frame.values()) / len(per_frame),
+            }
+            for name, per_frame in self.counters.items()
+            if per_frame
+        }
+        summary = {"stages": stages, "counters": counters}
+        if self.memory_stages:
+            summary["memory"] = self.memory_summary()
+        return summary
+
+    def memory_summary(self) -> dict:
+        """Peak allocations per stage and per chunk, in bytes.
+
+        ``peak_per_mpixel`` scales the stage peak by the largest camera image
+        seen (``pixels`` counter), to extrapolate to other sensor sizes.
+        ``chunks`` is keyed by the ``chunk`` tag of the events; its ``rss`` is
+        the largest RSS sampled at the end of a span, so short spikes inside a
+        span are missed. ``chunks_fit`` is how many processes of that RSS fit
+        into the memory available now.
+        """
+        mpixels = self.image_pixels / 1e6
+        stages = {
+            name: {
+                "peak": max(stats.peak),
+                "mean_peak": sum(stats.peak) / len(stats.peak),
+                "net": sum(stats.net),
+                "rss_max": max(stats.rss) if stats.rss else None,
+                "peak_per_mpixel": max(stats.peak) / mpixels if mpixels else None,
+            }
+            for name, stats in self.memory_stages.items()
+            if stats.peak
+        }
+        chunks = {name: dict(values) for name, values in self.chunk_memory.items()}
+        rss_max = max((c["rss"] for c in chunks.values()), default=0)
+        available = available_memory_bytes()
+        return {
+            "image_pixels": self.image_pixels,
+            "stages": stages,
+            "chunks": chunks,
+            "available": available,
+            "chunks_fit": available // rss_max if available and rss_max else None,
+        }
+
+    def format_summary(self) -> str:
+        """Summary as a plain-text table."""
+        summary = self.summary()
+        lines = [
+            f"{'stage':<24}{'count':>8}{'total s':>10}{'mean ms':>10}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+        ]
+        for name, s in sorted(summary["stages"].items(), key=lambda kv: -kv[1]["total"]):
+            lines.append(
+                f"{name:<24}{s['count']:>8}{s['total']:>10.3f}{1e3 * s['mean']:>10.2f}"
+                f"{1e3 * s['p50']:>10.2f}{1e3 * s['p95']:>10.2f}{1e3 * s['max']:>10.2f}"
+            )
+        if summary["counters"]:
+            lines.append("")
+            lines.append(f"{'counter':<24}{'frames':>8}{'total':>10}{'per frame':>10}")
+            for name, c in sorted(summary["counters"].items()):
+                lines.append(
+                    f"{name:<24}{c['frames']:>8}{c['total']:>10}{c['mean_per_frame']:>10.1f}"
+                )
+        if "memory" in summary:
+            lines.extend(["", *self._format_memory(summary["memory"])])
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_memory(memory: dict) -> list[str]:
+        mib = 1024 * 1024
+        lines = [
+            f"{'memory':<24}{'peak MiB':>10}{'mean MiB':>10}{'net MiB':>10}"
+            f"{'rss MiB':>10}{'MiB/Mpx':>10}"
+        ]
+        for name, m in sorted(memory["stages"].items(), key=lambda kv: -kv[1]["peak"]):
+            rss = f"{m['rss_max'] / mib:>10.1f}" if m["rss_max"] is not None else f"{'-':>10}"
+            per_mpx = (
+                f"{m['peak_per_mpixel'] / mib:>10.2f}"
+                if m["peak_per_mpixel"] is not None
+                else f"{'-':>10}"
+            )
+            lines.append(
+                f"{name:<24}{m['peak'] / mib:>10.2f}{m['mean_peak'] / mib:>10.2f}"
+                f"{m['net'] / mib:>10.2f}{rss}{per_mpx}"
+            )
+        lines.append("")
+        lines.append(f"{'chunk':<24}{'peak MiB':>10}{'rss MiB':>10}")
+        for name, c in sorted(memory["chunks"].items()):
+            lines.append(f"{name:<24}{c['mem_peak'] / mib:>10.2f}{c['rss'] / mib:>10.1f}")
+        if memory["chunks_fit"] is not None:
+            lines.append(
+                f"{memory['available'] / mib:.0f} MiB available: "
+                f"room for {memory['chunks_fit']} process(es) of the largest end-of-span RSS"
+            )
+        return lines
+
+
+class MemorySink:
+    """Keeps all events in ``self.events``."""
+
+    def __init__(self):
+        self.events: list[dict] = []
+
+    def emit(self, event: dict) -> None:
+        self.events.append(event)
+
+    def close(self, metrics: Metrics) -> None:
+        pass
+
+
+class JsonlSink:
+    """Appends events to a JSON-lines file.
+
+    The file is opened in append mode and line buffered, so a forked
+    worker never inherits unwritten events.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    def emit(self, event: dict) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", buffering=1, encoding="utf8")
+        self._file.write(json.dumps(event) + "\n")
+
+    def close(self, metrics: Metrics) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SummarySink:
+    """Prints the summary table of the registry when closed."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def emit(self, event: dict) -> None:
+        pass
+
+    def close(self, metrics: Metrics) -> None:
+        print(metrics.format_summary(), file=self.stream or sys.stdout)
+
+
+def read_jsonl(path) -> list[dict]:
+    """Events written by a JsonlSink."""
+    with Path(path).open(encoding="utf8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+metrics = Metrics()
@@ -4,7 +4,6 @@ from __future__ import absolute_import
 
 from pathlib import Path
 import shutil
-from tqdm import tqdm
 import collections.abc
 from typing import Optional
 
@@ -145,6 +144,8 @@ def copy_params_dir(src: Path, dest: Path):
 
     print(f"Copying now file by file from {src} to {dest}: \n")
 
+    from tqdm import tqdm
+
     for f in tqdm(files):
         shutil.copyfile(
             f,
@@ -0,0 +1,138 @@
+"""Compiled parameter cache.
+
+Parsing a parameters YAML with the pure-Python loader dominates the start-up
+of every batch worker and every GUI reload. This module keeps, per process,
+the parsed content of each YAML keyed by a hash of the file bytes, and
+turns a parameter set into a validated, picklable ParameterBundle that can be
+handed to worker processes instead of a file name.
+
+The optv parameter objects built from a parameter set are kept as well, so
+``ptv.py_start_proc_c`` and the detection helpers build them once per
+content instead of field by field on every call.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+
+# libyaml's loader is ~10x faster; fall back to the pure-Python one
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# sha256 of YAML bytes -> pickled parameter dict
+_parsed: dict[str, bytes] = {}
+# sha256 of YAML bytes -> validated ParameterBundle
+_bundles: dict[str, "ParameterBundle"] = {}
+# (builder, sha256 of YAML bytes or None, builder args) -> (section copy, optv object)
+_optv_objects: dict[tuple, tuple] = {}
+
+
+def yaml_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_yaml(file_path) -> tuple[str, dict]:
+    """Return (digest, parameters) for a YAML file.
+
+    The file is always read, but parsed only if its content has not been
+    seen before in this process. The returned dict is a private copy.
+    """
+    raw = Path(file_path).read_bytes()
+    digest = yaml_digest(raw)
+
+    cached = _parsed.get(digest)
+    if cached is None:
+        data = yaml.load(raw, Loader=YamlLoader)
+        cached = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        _parsed[digest] = cached
+    return digest, pickle.loads(cached)
+
+
+def clear_parameter_cache() -> None:
+    """Forget all parsed YAML files and compiled bundles."""
+    _parsed.clear()
+    _bundles.clear()
+    _optv_objects.clear()
+
+
+def cached_optv_object(build, section: dict, *args, digest: str | None = None):
+    """Return ``build(section, *args)``, reusing the object of an equal section.
+
+    One object is kept per builder, YAML digest and arguments; it is rebuilt
+    when the section differs from the one it was built from, e.g. after an
+    edit in memory. The objects are shared, so callers must not modify them.
+    """
+    key = (build, digest, args)
+    cached = _optv_objects.get(key)
+    if cached is not None and cached[0] == section:
+        return cached[1]
+    obj = build(section, *args)
+    _optv_objects[key] = (pickle.loads(pickle.dumps(section)), obj)
+    return obj
+
+
+@dataclass(frozen=True)
+class ParameterBundle:
+    """Validated, picklable snapshot of one parameter set.
+
+    Has the ``parameters`` and ``num_cams`` attributes that
+    ``ptv.py_start_proc_c`` reads, so it can be passed there directly.
+    """
+
+    yaml_path: str
+    digest: str
+    num_cams: int
+    parameters: dict
+
+    def to_manager(self):
+        """Return a ParameterManager holding a private copy of the parameters."""
+        from pyptv.parameter_manager import ParameterManager
+
+        pm = ParameterManager()
+        pm.parameters = pickle.loads(pickle.dumps(self.parameters))
+        pm.num_cams = self.num_cams
+        pm.yaml_path = Path(self.yaml_path)
+        pm.yaml_digest = self.digest
+        return pm
+
+
+def validate_parameters(parameters: dict, num_cams: int, digest: str | None = None) -> None:
+    """Build every optv parameter object once; raises ValueError/KeyError.
+
+    The objects are kept for ``ptv.py_start_proc_c`` with the same content.
+    """
+    from pyptv import ptv
+
+    if not num_cams:
+        raise ValueError("num_cams is missing or zero")
+    ptv._populate_spar(parameters["sequence"], num_cams)
+    ptv.optv_parameters(parameters, num_cams, digest)
+
+
+def compile_parameters(yaml_path) -> ParameterBundle:
+    """Return the validated ParameterBundle for a YAML file.
+
+    Bundles are cached by content hash, so recompiling an unchanged file
+    costs one file read.
+    """
+    yaml_path = Path(yaml_path).resolve()
+    digest, parameters = load_yaml(yaml_path)
+
+    bundle = _bundles.get(digest)
+    if bundle is not None and bundle.yaml_path == str(yaml_path):
+        return bundle
+
+    num_cams = parameters.get("num_cams")
+    validate_parameters(parameters, num_cams, digest)
+    bundle = ParameterBundle(
+        yaml_path=str(yaml_path),
+        digest=digest,
+        num_cams=num_cams,
+        parameters=parameters,
+    )
+    _bundles[digest] = bundle
+    return bundle
@@ -206,7 +206,9 @@ class CalHandler(Handler):
                 'shaking_first_frame': calib_params.shaking_first_frame,
                 'shaking_last_frame': calib_params.shaking_last_frame,
                 'shaking_max_num_points': calib_params.shaking_max_num_points,
-                'shaking_max_num_frames': calib_params.shaking_max_num_frames
+                'shaking_max_num_frames': calib_params.shaking_max_num_frames,
+                'shaking_bundle_adjustment': calib_params.shaking_bundle_adjustment,
+                'shaking_ba_max_points': calib_params.shaking_ba_max_points
             })
 
             # Update dumbbell.par
@@ -219,7 +221,12 @@ class CalHandler(Handler):
                 'dumbbell_penalty_weight': calib_params.dumbbell_penalty_weight,
                 'dumbbell_step': calib_params.dumbbell_step,
                 'dumbbell_niter': calib_params.dumbbell_niter,
-                'dumbbell_fixed_camera': calib_params.dumbbell_fixed_camera
+                'dumbbell_fixed_camera': calib_params.dumbbell_fixed_camera,
+                'dumbbell_frame_budget': calib_params.dumbbell_frame_budget,
+                'dumbbell_refine_all': calib_params.dumbbell_refine_all,
+                'dumbbell_starts': calib_params.dumbbell_starts,
+                'dumbbell_workers': calib_params.dumbbell_workers,
+                'dumbbell_start_time_budget': calib_params.dumbbell_start_time_budget
             })
 
             # Save all changes to the YAML file through the experiment
@@ -906,6 +913,11 @@ class Calib_Params(HasTraits):
     dumbbell_step = Int(label="step size through sequence")
     dumbbell_niter = Int(label="number of iterations per click")
     dumbbell_fixed_camera = Int(label="fixed camera (0=auto)")
+    dumbbell_frame_budget = Int(label="frame budget (0=all)")
+    dumbbell_refine_all = Bool(label="refine on all frames")
+    dumbbell_starts = Int(label="number of parallel starts")
+    dumbbell_workers = Int(label="worker processes (0=auto)")
+    dumbbell_start_time_budget = Float(label="time budget per start [s] (0=none)")
 
     Group5 = HGroup(
         VGroup(
@@ -916,6 +928,11 @@ class Calib_Params(HasTraits):
             Item(name="dumbbell_step"),
             Item(name="dumbbell_niter"),
             Item(name="dumbbell_fixed_camera"),
+            Item(name="dumbbell_frame_budget"),
+            Item(name="dumbbell_refine_all"),
+            Item(name="dumbbell_starts"),
+            Item(name="dumbbell_workers"),
+            Item(name="dumbbell_start_time_budget"),
         ),
         spring,
         label="Dumbbell calibration parameters",
@@ -926,6 +943,8 @@ class Calib_Params(HasTraits):
     shaking_last_frame = Int(label="shaking last frame")
     shaking_max_num_points = Int(label="shaking max num points")
     shaking_max_num_frames = Int(label="shaking max num frames")
+    shaking_bundle_adjustment = Bool(label="joint bundle adjustment")
+    shaking_ba_max_points = Int(label="bundle adjustment max points (0=all)")
 
     Group6 = HGroup(
         VGroup(
@@ -935,6 +954,8 @@ class Calib_Params(HasTraits):
             Item(name="shaking_last_frame"),
             Item(name="shaking_max_num_points"),
             Item(name="shaking_max_num_frames"),
+            Item(name="shaking_bundle_adjustment"),
+            Item(name="shaking_ba_max_points"),
         ),
         spring,
         label="Shaking calibration parameters",
@@ -1044,12 +1065,19 @@ class Calib_Params(HasTraits):
         self.dumbbell_step = dumbbell_params['dumbbell_step']
         self.dumbbell_niter = dumbbell_params['dumbbell_niter']
         self.dumbbell_fixed_camera = dumbbell_params.get('dumbbell_fixed_camera', 0)
+        self.dumbbell_frame_budget = dumbbell_params.get('dumbbell_frame_budget', 0)
+        self.dumbbell_refine_all = bool(dumbbell_params.get('dumbbell_refine_all', False))
+        self.dumbbell_starts = dumbbell_params.get('dumbbell_starts', 1)
+        self.dumbbell_workers = dumbbell_params.get('dumbbell_workers', 0)
+        self.dumbbell_start_time_budget = dumbbell_params.get('dumbbell_start_time_budget', 0.0)
 
         shaking_params = params['shaking']
         self.shaking_first_frame = shaking_params['shaking_first_frame']
         self.shaking_last_frame = shaking_params['shaking_last_frame']
         self.shaking_max_num_points = shaking_params['shaking_max_num_points']
         self.shaking_max_num_frames = shaking_params['shaking_max_num_frames']
+        self.shaking_bundle_adjustment = bool(shaking_params.get('shaking_bundle_adjustment', False))
+        self.shaking_ba_max_points = shaking_params.get('shaking_ba_max_points', 0)
 
     def __init__(self, experiment: Experiment):
         HasTraits.__init__(self)
@@ -1,6 +1,7 @@
 import yaml
 from pathlib import Path
 from pyptv import legacy_parameters as legacy_params
+from pyptv.parameter_cache import load_yaml
 
 # Minimal ParameterManager for converting between .par directories and YAML files.
 
@@ -23,10 +24,15 @@ class ParameterManager:
             return [Path(bn).parent / f'cam{i+1}' for i, bn in enumerate(base_names)]
         
     
+    # .par filename -> legacy parameter class, the same for every manager
+    _shared_class_map = None
+
     def __init__(self):
         self.parameters = {}
         self.num_cams = 0
-        self._class_map = self._get_class_map()
+        if ParameterManager._shared_class_map is None:
+            ParameterManager._shared_class_map = self._get_class_map()
+        self._class_map = ParameterManager._shared_class_map
         self.plugins_info = {}  # Initialize plugins_info
 
     def _get_class_map(self):
@@ -232,12 +238,12 @@ class ParameterManager:
         """Load parameters from a YAML file."""
 
         file_path = Path(file_path)
-        with file_path.open('r') as f:
-            data = yaml.safe_load(f)
+        digest, data = load_yaml(file_path)
 
         self.num_cams = data.get('num_cams')
         self.parameters = data
         self.yaml_path = file_path  # Store the path for later reference
+        self.yaml_digest = digest
 
 
     def to_directory(self, dir_path):
@@ -0,0 +1,74 @@
+"""Shared start-up path for headless sequence and tracking runs.
+
+The batch runners, the parallel workers and the ``python -m pyptv`` command
+line all turn a parameter source into the same lightweight processing
+object that the ``ptv.py`` loop functions expect.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional, Union
+
+from pyptv.parameter_cache import ParameterBundle
+from pyptv.parameter_manager import ParameterManager
+from pyptv.ptv import py_start_proc_c
+
+
+class ProcessingExperiment:
+    """Parameters and optv objects needed by py_sequence_loop and the tracker."""
+
+    def __init__(self, pm, cpar, spar, vpar, track_par, tpar, cals, epar):
+        self.pm = pm
+        self.cpar = cpar
+        self.spar = spar
+        self.vpar = vpar
+        self.track_par = track_par
+        self.tpar = tpar
+        self.cals = cals
+        self.epar = epar
+        self.num_cams = pm.num_cams  # Global number of cameras
+        yaml_path = getattr(pm, "yaml_path", None)
+        exp_path = Path(yaml_path).parent if yaml_path is not None else Path.cwd()
+        self.exp_path = str(exp_path.absolute())
+        # Centralized: get target_filenames from ParameterManager
+        self.target_filenames = pm.get_target_filenames()
+        # Initialize attributes that may be set during processing
+        self.detections = []
+        self.corrected = []
+
+
+def load_parameters(
+    source: Union[str, Path, ParameterBundle, ParameterManager],
+) -> ParameterManager:
+    """Return a ParameterManager for a YAML path, bundle or manager.
+
+    YAML files go through the content-hash cache of ParameterManager.from_yaml,
+    bundles are unpacked without parsing and managers are used as they are.
+    """
+    if isinstance(source, ParameterManager):
+        return source
+    if isinstance(source, ParameterBundle):
+        return source.to_manager()
+    pm = ParameterManager()
+    pm.from_yaml(Path(source))
+    return pm
+
+
+def start_processing(
+    source: Union[str, Path, ParameterBundle, ParameterManager],
+    seq_first: Optional[int] = None,
+    seq_last: Optional[int] = None,
+) -> ProcessingExperiment:
+    """Build a ProcessingExperiment, optionally limited to a frame range.
+
+    Calibration files are resolved relative to the current directory, so
+    callers change to the experiment directory first.
+    """
+    pm = load_parameters(source)
+    cpar, spar, vpar, track_par, tpar, cals, epar = py_start_proc_c(pm)
+    if seq_first is not None:
+        spar.set_first(int(seq_first))
+    if seq_last is not None:
+        spar.set_last(int(seq_last))
+    return ProcessingExperiment(pm, cpar, spar, vpar, track_par, tpar, cals, epar)
@@ -0,0 +1,178 @@
+"""cProfile support for batch runs, including parallel workers.
+
+Each process of a run writes its own ``.pstats`` file into one profile
+directory; :func:`merge_profile_dir` combines them into ``profile.pstats``
+and a flame-graph compatible ``profile.collapsed`` file.
+
+cProfile does not see calls into Cython functions of optv, so their time is
+normally charged to the calling Python function. While profiling, the optv
+functions used by :mod:`pyptv.ptv` are replaced by thin Python trampolines,
+one per function, which show up as separate entries such as
+``optv/correspondences.pyx:0(correspondences)``.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Optional
+
+MERGED_PSTATS = "profile.pstats"
+MERGED_COLLAPSED = "profile.collapsed"
+TRACKER_METHODS = ("restart", "step_forward", "finalize", "full_forward", "full_backward")
+
+
+def _boundary(func, name: str, filename: str):
+    """Python trampoline for ``func`` that cProfile reports as ``filename:0(name)``."""
+
+    def call(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    call.__code__ = call.__code__.replace(co_name=name, co_filename=filename, co_firstlineno=1)
+    call.__name__ = name
+    call.__wrapped__ = func
+    return call
+
+
+def _pyx_filename(obj) -> str:
+    return obj.__module__.replace(".", "/") + ".pyx"
+
+
+@contextmanager
+def optv_call_boundaries(module=None):
+    """Make the optv calls of ``module`` (default: pyptv.ptv) visible to cProfile."""
+    if module is None:
+        from pyptv import ptv as module
+
+    patched = {}
+    for name, obj in list(vars(module).items()):
+        if not str(getattr(obj, "__module__", "")).startswith("optv."):
+            continue
+        if isinstance(obj, type):
+            if name != "Tracker":
+                continue
+            methods = {
+                method: _boundary(getattr(obj, method), f"Tracker.{method}", _pyx_filename(obj))
+                for method in TRACKER_METHODS
+                if hasattr(obj, method)
+            }
+            # the trampolines receive self as their first argument
+            replacement = type(name, (obj,), methods)
+        elif callable(obj):
+            replacement = _boundary(obj, name, _pyx_filename(obj))
+        else:
+            continue
+        patched[name] = obj
+        setattr(module, name, replacement)
+    try:
+        yield
+    finally:
+        for name, obj in patched.items():
+            setattr(module, name, obj)
+
+
+@contextmanager
+def profiled(output: Optional[Path]):
+    """Profile the enclosed block into ``output``; no-op if output is None."""
+    if output is None:
+        yield None
+        return
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    with optv_call_boundaries():
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            profiler.dump_stats(output)
+
+
+def _label(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name.replace(";", ",")
+    return f"{name} ({Path(filename).name}:{line})".replace(";", ",")
+
+
+def collapsed_stacks(stats: pstats.Stats, max_depth: int = 64, min_share: float = 1e-4) -> dict:
+    """Approximate call stacks with their own time in microseconds.
+
+    pstats keeps only caller -> callee edges, so the own time of a function
+    is spread over its callers in proportion to the cumulative time of each
+    edge, recursively up to a root. The result has the format of
+    ``stackcollapse`` output and can be fed to flamegraph.pl or speedscope.
+    """
+    table = stats.stats
+    stacks: dict[str, float] = defaultdict(float)
+
+    def walk(func, path, share, depth):
+        callers = table[func][4] if func in table else {}
+        weights = {c: edge[3] for c, edge in callers.items() if c not in path}
+        total = sum(weights.values())
+        if not weights or depth >= max_depth:
+            yield path, share
+            return
+        if total <= 0:
+            weights = {c: 1.0 for c in weights}
+            total = float(len(weights))
+        for caller, weight in weights.items():
+            part = share * weight / total
+            if part >= min_share:
+                yield from walk(caller, path + (caller,), part, depth + 1)
+
+    for func, (_cc, _nc, tottime, _ct, _callers) in table.items():
+        if tottime <= 0:
+            continue
+        for path, share in walk(func, (func,), 1.0, 0):
+            stacks[";".join(_label(f) for f in reversed(path))] += tottime * share * 1e6
+    return {stack: int(round(us)) for stack, us in stacks.items() if us >= 0.5}
+
+
+def write_collapsed(stats: pstats.Stats, path: Path) -> Path:
+    path = Path(path)
+    with path.open("w", encoding="utf8") as f:
+        for stack, us in sorted(collapsed_stacks(stats).items()):
+            f.write(f"{stack} {us}\n")
+    return path
+
+
+def merge_profiles(paths: Iterable[Path], output_dir: Path) -> pstats.Stats:
+    """Merge pstats files into output_dir/profile.pstats and profile.collapsed."""
+    paths = [str(p) for p in paths]
+    if not paths:
+        raise ValueError("No profile files to merge")
+    output_dir = Path(output_dir)
+    stats = pstats.Stats(*paths)
+    stats.dump_stats(output_dir / MERGED_PSTATS)
+    write_collapsed(stats, output_dir / MERGED_COLLAPSED)
+    return stats
+
+
+def merge_profile_dir(profile_dir: Path) -> pstats.Stats:
+    """Merge every per-process profile written into ``profile_dir``."""
+    profile_dir = Path(profile_dir)
+    paths = sorted(p for p in profile_dir.glob("*.pstats") if p.name != MERGED_PSTATS)
+    return merge_profiles(paths, profile_dir)
+
+
+def top_functions(stats: pstats.Stats, sort: str = "cumulative", limit: int = 25) -> list[dict]:
+    """The first ``limit`` entries of ``stats`` in ``sort`` order."""
+    stats.sort_stats(sort)
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        _cc, ncalls, tottime, cumtime, _callers = stats.stats[func]
+        filename, line, name = func
+        rows.append(
+            {
+                "function": name if filename == "~" else f"{filename}:{line}({name})",
+                "ncalls": ncalls,
+                "tottime": tottime,
+                "cumtime": cumtime,
+            }
+        )
+    return rows
@@ -9,16 +9,18 @@ import importlib
 import os
 import sys
 import re
+import time
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 # Third-party imports
 import numpy as np
-from scipy.optimize import least_squares, minimize
-from scipy import sparse
 from imageio.v3 import imread
-from skimage.util import img_as_ubyte
-from skimage.color import rgb2gray
+
+# scipy and skimage are only needed for calibration and colour input, and
+# are imported where used to keep headless sequence/tracking workers light.
+if TYPE_CHECKING:
+    from scipy import sparse
 
 # OptV imports
 from optv.calibration import Calibration
@@ -53,6 +55,11 @@ example from Tracker documentation:
 
 # PyPTV imports
 from pyptv.parameter_manager import ParameterManager
+from pyptv.parameter_cache import cached_optv_object
+from pyptv.background import background_path, rolling_backgrounds, subtract_background
+from pyptv.frame_source import open_frame_source
+from pyptv.highpass import BACKENDS, box_highpass
+from pyptv.instrumentation import metrics
 
 # Constants
 NAMES = ["cc", "xh", "yh", "k1", "k2", "k3", "p1", "p2", "scale", "shear"]
@@ -81,10 +88,57 @@ def negative(img: np.ndarray) -> np.ndarray:
     return 255 - img
 
 
-def simple_highpass(img: np.ndarray, cpar: ControlParams) -> np.ndarray:
+def simple_highpass(
+    img: np.ndarray,
+    cpar: ControlParams,
+    filter_size: Optional[int] = None,
+    backend: str = "optv",
+    workers: Optional[int] = None,
+) -> np.ndarray:
     """Apply a simple highpass filter to an image using liboptv preprocess_image.
+
+    With backend "numpy" the same image is computed by
+    pyptv.highpass.box_highpass, in row bands on ``workers`` threads.
+    liboptv reads the pixel buffer row by row, so strided views (e.g. the
+    quadrants of image_split) are copied to a contiguous array first.
     """
-    return preprocess_image(img, DEFAULT_NO_FILTER, cpar, DEFAULT_HIGHPASS_FILTER_SIZE)
+    if filter_size is None:
+        filter_size = DEFAULT_HIGHPASS_FILTER_SIZE
+    if backend == "numpy":
+        return box_highpass(img, filter_size, workers)
+    if backend != "optv":
+        raise ValueError(f"Unknown highpass backend {backend!r}, expected one of {BACKENDS}")
+    img = np.ascontiguousarray(img)
+    return preprocess_image(img, DEFAULT_NO_FILTER, cpar, filter_size)
+
+
+def highpass_options(ptv_params: dict) -> dict:
+    """simple_highpass keyword arguments from the ``ptv`` parameters."""
+    return {
+        "filter_size": int(ptv_params.get("highpass_filter_size", DEFAULT_HIGHPASS_FILTER_SIZE)),
+        "backend": ptv_params.get("highpass_backend", "optv"),
+        "workers": ptv_params.get("highpass_workers"),
+    }
+
+
+def optv_parameters(
+    params: dict, num_cams: int, digest: Optional[str] = None
+) -> Tuple[ControlParams, VolumeParams, TrackingParams, TargetParams]:
+    """The optv parameter objects of a parameter set, built once per content.
+
+    ``digest`` is the hash of the YAML the parameters were read from, if
+    any. The objects are shared by all callers with equal parameters and
+    must not be modified; build a private copy with the _populate_*
+    functions instead.
+    """
+    cpar = cached_optv_object(_populate_cpar, params['ptv'], num_cams, digest=digest)
+    vpar = cached_optv_object(_populate_vpar, params['criteria'], digest=digest)
+    track_par = cached_optv_object(_populate_track_par, params['track'], digest=digest)
+    # Use targ_rec instead of detect_plate to match manual GUI operations
+    tpar = cached_optv_object(
+        _populate_tpar, {'targ_rec': params['targ_rec']}, num_cams, digest=digest
+    )
+    return cpar, vpar, track_par, tpar
 
 
 def _populate_cpar(ptv_params: dict, num_cams: int) -> ControlParams:
@@ -236,6 +290,53 @@ def _populate_tpar(targ_params: dict, num_cams: int) -> TargetParams:
         raise ValueError("Target parameters must contain either 'targ_rec' or 'detect_plate' section.")
     return tpar
 
+# Parsed .ori/.addpar pairs: (abs ori, abs addpar) -> (fingerprint, state).
+# A changed size or mtime of either file makes the entry stale.
+_calibration_cache: dict = {}
+
+
+def _calibration_fingerprint(ori_file, addpar_file) -> tuple:
+    ori_stat = os.stat(ori_file)
+    addpar_stat = os.stat(addpar_file)
+    return (
+        ori_stat.st_size, ori_stat.st_mtime_ns,
+        addpar_stat.st_size, addpar_stat.st_mtime_ns,
+    )
+
+
+def read_calibration(ori_file, addpar_file) -> Calibration:
+    """Return a Calibration for an .ori/.addpar pair, parsing only on change.
+
+    Parsed files are kept in a process-wide cache keyed by path, size and
+    modification time; every call returns a fresh copy that the caller
+    may modify. Raises OSError if either file is missing.
+    """
+    key = (os.path.abspath(ori_file), os.path.abspath(addpar_file))
+    fingerprint = _calibration_fingerprint(ori_file, addpar_file)
+
+    cached = _calibration_cache.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return calibration_from_dict(cached[1])
+
+    cal = Calibration()
+    cal.from_file(os.fspath(ori_file), os.fspath(addpar_file))
+    _calibration_cache[key] = (fingerprint, calibration_to_dict(cal))
+    return cal
+
+
+def write_calibration(cal: Calibration, ori_file, addpar_file) -> None:
+    """Write cal to an .ori/.addpar pair and drop the cached copy."""
+    cal.write(os.fsencode(ori_file), os.fsencode(addpar_file))
+    _calibration_cache.pop(
+        (os.path.abspath(ori_file), os.path.abspath(addpar_file)), None
+    )
+
+
+def clear_calibration_cache() -> None:
+    """Forget all cached calibrations."""
+    _calibration_cache.clear()
+
+
 def _read_calibrations(cpar: ControlParams, num_cams: int) -> List[Calibration]:
     """Read calibration files for all cameras.
     
@@ -244,20 +345,16 @@ def _read_calibrations(cpar: ControlParams, num_cams: int) -> List[Calibration]:
     """
     cals = []
     for i_cam in range(num_cams):
-        cal = Calibration()
         base_name = cpar.get_cal_img_base_name(i_cam)
         ori_file = base_name + ".ori"
         addpar_file = base_name + ".addpar"
 
-        # Check if calibration files exist and are readable
-        ori_exists = os.path.isfile(ori_file) and os.access(ori_file, os.R_OK)
-        addpar_exists = os.path.isfile(addpar_file) and os.access(addpar_file, os.R_OK)
-        
-        if ori_exists and addpar_exists:
-            # Both files exist, load them
-            cal.from_file(ori_file, addpar_file)
-            print(f"Loaded calibration for camera {i_cam + 1} from {ori_file}")
-        else:
+        try:
+            cal = read_calibration(ori_file, addpar_file)
+        except OSError:
+            cal = Calibration()
+            ori_exists = os.path.isfile(ori_file)
+            addpar_exists = os.path.isfile(addpar_file)
             # Files don't exist yet - this is normal for calibration GUI
             # Create default/empty calibration
             print(f"Calibration files not found for camera {i_cam + 1} - using defaults")
@@ -279,20 +376,20 @@ def py_start_proc_c(
     List[Calibration],
     dict,
 ]:
-    """Read all parameters needed for processing using ParameterManager."""
+    """Read all parameters needed for processing using ParameterManager.
+
+    ControlParams, VolumeParams, TrackingParams and TargetParams come from
+    the per-process cache of optv_parameters and are shared between calls
+    with the same parameters; SequenceParams are new on every call.
+    """
     try:
         params = pm.parameters
         num_cams = pm.num_cams
 
-        cpar = _populate_cpar(params['ptv'], num_cams)
         spar = _populate_spar(params['sequence'], num_cams)
-        vpar = _populate_vpar(params['criteria'])
-        track_par = _populate_track_par(params['track'])
-
-        # Create a dict that contains targ_rec for _populate_tpar
-        # Use targ_rec instead of detect_plate to match manual GUI operations
-        target_params_dict = {'targ_rec': params['targ_rec']}
-        tpar = _populate_tpar(target_params_dict, num_cams)
+        cpar, vpar, track_par, tpar = optv_parameters(
+            params, num_cams, getattr(pm, 'yaml_digest', None)
+        )
 
         epar = params.get('examine')
         
@@ -312,11 +409,13 @@ def py_pre_processing_c(
     """Apply pre-processing to a list of images.
     """
     # num_cams = len(list_of_images)
-    cpar = _populate_cpar(ptv_params, num_cams)
+    cpar = cached_optv_object(_populate_cpar, ptv_params, num_cams)
+    options = highpass_options(ptv_params)
     processed_images = []
     for i, img in enumerate(list_of_images):
-        img_lp = img.copy() 
-        processed_images.append(simple_highpass(img_lp, cpar))
+        with metrics.span("highpass", cam=i):
+            img_lp = img.copy()
+            processed_images.append(simple_highpass(img_lp, cpar, **options))
 
     return processed_images
 
@@ -334,11 +433,11 @@ def py_detection_proc_c(
     if len(list_of_images) != num_cams:
         raise ValueError(f"Number of images ({len(list_of_images)}) must match number of cameras ({num_cams})")
 
-    cpar = _populate_cpar(ptv_params, num_cams)
+    cpar = cached_optv_object(_populate_cpar, ptv_params, num_cams)
     
     # Create a dict that contains targ_rec for _populate_tpar
     # target_params_dict = {'targ_rec': target_params}
-    tpar = _populate_tpar(target_params, num_cams)
+    tpar = cached_optv_object(_populate_tpar, target_params, num_cams)
     
     cals = _read_calibrations(cpar, num_cams)
 
@@ -349,13 +448,15 @@ def py_detection_proc_c(
         if existing_target:
             raise NotImplementedError("Existing targets are not implemented")
         else:
-            im = img.copy()
-            targs = target_recognition(im, tpar, i_cam, cpar)
+            with metrics.span("target_recognition", cam=i_cam):
+                im = img.copy()
+                targs = target_recognition(im, tpar, i_cam, cpar)
 
         targs.sort_y()
         # print(f"Camera {i_cam} detected {len(targs)} targets.")
         detections.append(targs)
-        mc = MatchedCoords(targs, cpar, cals[i_cam])
+        with metrics.span("matched_coords", cam=i_cam):
+            mc = MatchedCoords(targs, cpar, cals[i_cam])
         corrected.append(mc)
 
     return detections, corrected
@@ -508,79 +609,114 @@ def py_sequence_loop(exp) -> None:
     if hasattr(exp, 'pm'):
         # Traditional experiment object
         pm = exp.pm
-        num_cams = pm.num_cams
-        cpar = exp.cpar
-        spar = exp.spar
-        vpar = exp.vpar
-        tpar = exp.tpar
-        cals = exp.cals
     elif hasattr(exp, 'exp1') and hasattr(exp.exp1, 'pm'):
         # MainGUI object - ensure parameter objects are initialized
         pm = exp.exp1.pm
-        num_cams = exp.num_cams
-        cpar = exp.cpar
-        spar = exp.spar
-        vpar = exp.vpar
-        tpar = exp.tpar
-        cals = exp.cals
     else:
         raise ValueError("Object must have either pm or exp1.pm attribute")
 
+    num_cams = exp.num_cams
+    spar = exp.spar
+    seq_params = dict(pm.get_parameter('sequence'))
+    seq_params['base_name'] = [spar.get_img_base_name(i) for i in range(num_cams)]
+    with open_frame_source(seq_params, num_cams, pm.get_parameter('ptv')) as source:
+        if not pm.get_parameter('pft_version').get('Existing_Target', False):
+            # report every missing image before processing the first frame,
+            # including the frames a rolling background warms up with
+            check_first = spar.get_first()
+            rolling = rolling_backgrounds(pm, num_cams)
+            if rolling is not None:
+                check_first = (rolling[0].warm_up_frames(check_first) or [check_first])[0]
+            with metrics.span("check_frames"):
+                source.check_frames(check_first, spar.get_last())
+        _sequence_frames(exp, pm, source, spar.get_first(), spar.get_last())
+    metrics.frame = None
+
+
+def _read_image(pm, source, i_cam: int, frame: int) -> np.ndarray:
+    """The 8-bit image of a camera and frame with the negative and static mask applied."""
+    with metrics.span("read", cam=i_cam):
+        img = source.read(i_cam, frame)
+    if img.ndim > 2:
+        from skimage.color import rgb2gray
+
+        with metrics.span("rgb2gray", cam=i_cam):
+            img = rgb2gray(img)
+    if img.dtype != np.uint8:
+        from skimage.util import img_as_ubyte
+
+        with metrics.span("img_as_ubyte", cam=i_cam):
+            img = img_as_ubyte(img)
+    metrics.count("pixels", img.size, cam=i_cam)
+    if pm.get_parameter('ptv').get('negative', False):
+        print("Negative image")
+        with metrics.span("negative", cam=i_cam):
+            img = negative(img)
+    masking_params = pm.get_parameter('masking')
+    if masking_params and masking_params.get('mask_flag', False):
+        try:
+            with metrics.span("mask", cam=i_cam):
+                background_name = background_path(
+                    masking_params['mask_base_name'], i_cam
+                )
+                background = imread(background_name)
+                img = subtract_background(img, background)
+        except (ValueError, FileNotFoundError):
+            print("failed to read the mask")
+    return img
+
+
+def _sequence_frames(exp, pm, source, first_frame: int, last_frame: int) -> None:
+    """Detection, correspondences and determination of each frame, read from source."""
+    num_cams = exp.num_cams
+    cpar, vpar, tpar, cals = exp.cpar, exp.vpar, exp.tpar, exp.cals
     existing_target = pm.get_parameter('pft_version').get('Existing_Target', False)
-
-    first_frame = spar.get_first()
-    last_frame = spar.get_last()
+    highpass = highpass_options(pm.get_parameter('ptv'))
+    rolling = None if existing_target else rolling_backgrounds(pm, num_cams)
     # Generate short_file_bases once per experiment
-    img_base_names = [spar.get_img_base_name(i) for i in range(num_cams)]
     short_file_bases = exp.target_filenames
 
     for frame in range(first_frame, last_frame + 1):
+        metrics.frame = frame
         detections = []
         corrected = []
         for i_cam in range(num_cams):
             if existing_target:
-                targs = read_targets(short_file_bases[i_cam], frame)
+                with metrics.span("read_targets", cam=i_cam):
+                    targs = read_targets(short_file_bases[i_cam], frame)
             else:
-                imname = Path(img_base_names[i_cam] % frame)
-                if not imname.exists():
-                    raise FileNotFoundError(f"{imname} does not exist")
-                else:
-                    img = imread(imname)
-                    if img.ndim > 2:
-                        img = rgb2gray(img)
-                    if img.dtype != np.uint8:
-                        img = img_as_ubyte(img)
-                if pm.get_parameter('ptv').get('negative', False):
-                    print("Negative image")
-                    img = negative(img)
-                masking_params = pm.get_parameter('masking')
-                if masking_params and masking_params.get('mask_flag', False):
-                    try:
-                        background_name = (
-                            masking_params['mask_base_name']
-                            % (i_cam + 1)
-                        )
-                        background = imread(background_name)
-                        img = np.clip(img - background, 0, 255).astype(np.uint8)
-                    except (ValueError, FileNotFoundError):
-                        print("failed to read the mask")
-                high_pass = simple_highpass(img, cpar)
-                targs = target_recognition(high_pass, tpar, i_cam, cpar)
+                img = _read_image(pm, source, i_cam, frame)
+                if rolling is not None:
+                    if frame == first_frame:
+                        # the window of a later start holds the frames before it
+                        with metrics.span("rolling_warm_up", cam=i_cam):
+                            for earlier in rolling[i_cam].warm_up_frames(frame):
+                                rolling[i_cam].push(_read_image(pm, source, i_cam, earlier))
+                    with metrics.span("rolling_background", cam=i_cam):
+                        img = rolling[i_cam].subtract(frame, img)
+                with metrics.span("highpass", cam=i_cam):
+                    high_pass = simple_highpass(img, cpar, **highpass)
+                with metrics.span("target_recognition", cam=i_cam):
+                    targs = target_recognition(high_pass, tpar, i_cam, cpar)
 
             if len(targs) > 0:
                 targs.sort_y()
+            metrics.count("targets", len(targs), cam=i_cam)
 
             detections.append(targs)
-            matched_coords = MatchedCoords(targs, cpar, cals[i_cam])
-            pos, _ = matched_coords.as_arrays()
+            with metrics.span("matched_coords", cam=i_cam):
+                matched_coords = MatchedCoords(targs, cpar, cals[i_cam])
+                pos, _ = matched_coords.as_arrays()
             corrected.append(matched_coords)
 
         # AFter we finished all targs, we can move to correspondences    
-        sorted_pos, sorted_corresp, _ = correspondences(
-            detections, corrected, cals, vpar, cpar
-        )
-        for i_cam in range(num_cams):
-            write_targets(detections[i_cam], short_file_bases[i_cam], frame)
+        with metrics.span("correspondences"):
+            sorted_pos, sorted_corresp, _ = correspondences(
+                detections, corrected, cals, vpar, cpar
+            )
+        with metrics.span("write_targets"):
+            for i_cam in range(num_cams):
+                write_targets(detections[i_cam], short_file_bases[i_cam], frame)
         print(
             "Frame "
             + str(frame)
@@ -590,10 +726,12 @@ def py_sequence_loop(exp) -> None:
         )
         sorted_pos = np.concatenate(sorted_pos, axis=1)
         sorted_corresp = np.concatenate(sorted_corresp, axis=1)
-        flat = np.array(
-            [corr.get_by_pnrs(corresp) for corr, corresp in zip(corrected, sorted_corresp)]
-        )
-        pos, _ = point_positions(flat.transpose(1, 0, 2), exp.cpar, exp.cals, exp.vpar)
+        with metrics.span("point_positions"):
+            flat = np.array(
+                [corr.get_by_pnrs(corresp) for corr, corresp in zip(corrected, sorted_corresp)]
+            )
+            pos, _ = point_positions(flat.transpose(1, 0, 2), exp.cpar, exp.cals, exp.vpar)
+        metrics.count("particles", pos.shape[0])
         if len(exp.cals) < 4:
             print_corresp = -1 * np.ones((4, sorted_corresp.shape[1]))
             print_corresp[: len(exp.cals), :] = sorted_corresp
@@ -602,7 +740,7 @@ def py_sequence_loop(exp) -> None:
 
         rt_is_filename = default_naming["corres"].decode()
         rt_is_filename = f"{rt_is_filename}.{frame}"
-        with open(rt_is_filename, "w", encoding="utf8") as rt_is:
+        with metrics.span("write_rt_is"), open(rt_is_filename, "w", encoding="utf8") as rt_is:
             rt_is.write(f"{pos.shape[0]}\n")
             for pix, pt in enumerate(pos):
                 pt_args = (pix + 1,) + tuple(pt) + tuple(print_corresp[:, pix])
@@ -635,6 +773,29 @@ def py_trackcorr_init(exp):
 
     return tracker
 
+
+def run_tracker(tracker) -> None:
+    """Run a full forward tracking pass.
+
+    Equivalent to ``tracker.full_forward()``; with instrumentation enabled the
+    pass is stepped from Python so that every frame gets its own span.
+    """
+    if not metrics.enabled:
+        tracker.full_forward()
+        return
+
+    with metrics.span("track.restart"):
+        tracker.restart()
+    while True:
+        metrics.frame = tracker.current_step()
+        with metrics.span("track.step"):
+            more = tracker.step_forward()
+        if not more:
+            break
+    metrics.frame = None
+    with metrics.span("track.finalize"):
+        tracker.finalize()
+
 # ------- Utilities ----------#
 
 
@@ -874,104 +1035,268 @@ def read_rt_is_file(filename) -> List[List[float]]:
         raise e
 
 
-def full_scipy_calibration(
-    cal: Calibration, XYZ: np.ndarray, targs: TargetArray, cpar: ControlParams, flags=[]
-):
-    """Full calibration using scipy.optimize"""
+# Where each orient flag lives inside a Calibration: (getter, setter, index)
+_FLAG_FIELDS = {
+    "cc": ("get_primary_point", "set_primary_point", 2),
+    "xh": ("get_primary_point", "set_primary_point", 0),
+    "yh": ("get_primary_point", "set_primary_point", 1),
+    "k1": ("get_radial_distortion", "set_radial_distortion", 0),
+    "k2": ("get_radial_distortion", "set_radial_distortion", 1),
+    "k3": ("get_radial_distortion", "set_radial_distortion", 2),
+    "p1": ("get_decentering", "set_decentering", 0),
+    "p2": ("get_decentering", "set_decentering", 1),
+    "scale": ("get_affine", "set_affine_trans", 0),
+    "shear": ("get_affine", "set_affine_trans", 1),
+}
+
+
+def get_calibration_flags(cal: Calibration, flags) -> np.ndarray:
+    """Return the values of the flagged intrinsic parameters (NAMES order)."""
+    return np.array(
+        [getattr(cal, _FLAG_FIELDS[name][0])()[_FLAG_FIELDS[name][2]] for name in flags],
+        dtype=float,
+    )
+
+
+def set_calibration_flags(cal: Calibration, flags, values) -> None:
+    """Write values for the flagged intrinsic parameters into cal."""
+    fields = {}
+    for name, value in zip(flags, values):
+        getter, setter, idx = _FLAG_FIELDS[name]
+        if setter not in fields:
+            fields[setter] = np.array(getattr(cal, getter)(), dtype=float)
+        fields[setter][idx] = value
+    for setter, field in fields.items():
+        getattr(cal, setter)(field)
+
+
+def target_array_positions(targs: TargetArray) -> np.ndarray:
+    """Return (len(targs), 2) pixel positions, NaN for unmatched targets."""
+    xy = np.full((len(targs), 2), np.nan)
+    for tix, targ in enumerate(targs):
+        if targ.pnr() != -999:
+            xy[tix] = targ.pos()
+    return xy
+
+
+def _calibration_vector(cal: Calibration, flags, extrinsics: bool) -> np.ndarray:
+    """Pack extrinsics (optional) and flagged intrinsics of cal."""
+    parts = []
+    if extrinsics:
+        parts.extend([cal.get_pos(), cal.get_angles()])
+    parts.append(get_calibration_flags(cal, flags))
+    return np.concatenate(parts).astype(float)
+
+
+def calibration_residuals(x, cal, XYZ, xy, cpar, flags=(), extrinsics=True):
+    """Pixel residual vector of one camera for least_squares.
+
+    x packs position and angles (if extrinsics) followed by the flagged
+    intrinsics. XYZ are (N, 3) known points and xy the matching (N, 2)
+    detections, without gaps.
+    """
     from optv.transforms import convert_arr_metric_to_pixel
     from optv.imgcoord import image_coordinates
 
-    def _residuals_k(x, cal, XYZ, xy, cpar):
-        cal.set_radial_distortion(x)
-        targets = convert_arr_metric_to_pixel(
-            image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
-        )
-        xyt = np.array([t.pos() if t.pnr() != -999 else [np.nan, np.nan] for t in xy])
-        residuals = np.nan_to_num(xyt - targets)
-        return np.sum(residuals**2)
-
-    def _residuals_p(x, cal, XYZ, xy, cpar):
-        cal.set_decentering(x)
-        targets = convert_arr_metric_to_pixel(
-            image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
-        )
-        xyt = np.array([t.pos() if t.pnr() != -999 else [np.nan, np.nan] for t in xy])
-        residuals = np.nan_to_num(xyt - targets)
-        return np.sum(residuals**2)
-
-    def _residuals_s(x, cal, XYZ, xy, cpar):
-        cal.set_affine_trans(x)
-        targets = convert_arr_metric_to_pixel(
-            image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
-        )
-        xyt = np.array([t.pos() if t.pnr() != -999 else [np.nan, np.nan] for t in xy])
-        residuals = np.nan_to_num(xyt - targets)
-        return np.sum(residuals**2)
+    if extrinsics:
+        cal.set_pos(x[:3])
+        cal.set_angles(x[3:6])
+        x = x[6:]
+    if len(flags):
+        set_calibration_flags(cal, flags, x)
 
-    def _residuals_combined(x, cal, XYZ, xy, cpar):
-        cal.set_radial_distortion(x[:3])
-        cal.set_decentering(x[3:5])
-        cal.set_affine_trans(x[5:])
+    projected = convert_arr_metric_to_pixel(
+        image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
+    )
+    residuals = (projected - xy).ravel()
+    return np.nan_to_num(residuals, nan=1e6, posinf=1e6, neginf=-1e6)
 
-        targets = convert_arr_metric_to_pixel(
-            image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
-        )
-        xyt = np.array([t.pos() if t.pnr() != -999 else [np.nan, np.nan] for t in xy])
-        residuals = np.nan_to_num(xyt - targets)
-        return residuals
-
-    if any(flag in flags for flag in ["k1", "k2", "k3"]):
-        sol = minimize(
-            _residuals_k,
-            cal.get_radial_distortion(),
-            args=(cal, XYZ, targs, cpar),
-            method="Nelder-Mead",
-            tol=1e-11,
-            options={"disp": True},
-        )
-        radial = sol.x
-        cal.set_radial_distortion(radial)
-    else:
-        radial = cal.get_radial_distortion()
-
-    if any(flag in flags for flag in ["p1", "p2"]):
-        sol = minimize(
-            _residuals_p,
-            cal.get_decentering(),
-            args=(cal, XYZ, targs, cpar),
-            method="Nelder-Mead",
-            tol=1e-11,
-            options={"disp": True},
+
+def full_scipy_calibration(
+    cal: Calibration,
+    XYZ: np.ndarray,
+    targs: TargetArray,
+    cpar: ControlParams,
+    flags=[],
+    extrinsics: bool = False,
+    max_nfev: int = 200,
+    loss: str = "linear",
+):
+    """Full calibration using scipy.optimize.least_squares.
+
+    Solves all parameters named in flags (see NAMES), and with
+    extrinsics=True the exterior orientation jointly with them. The
+    detections are read out of targs once; each evaluation projects all
+    points in one call.
+
+    Returns:
+    (len(targs), 2) array of detection - projection residuals, scaled by
+    1/100 as before; unmatched targets give zero rows.
+    """
+    flags = [name for name in NAMES if name in flags]
+    XYZ = np.ascontiguousarray(np.atleast_2d(XYZ), dtype=float)
+    xy = target_array_positions(targs)
+
+    used = np.all(np.isfinite(xy), axis=1) & np.all(np.isfinite(XYZ), axis=1)
+    n_params = (6 if extrinsics else 0) + len(flags)
+    if n_params and 2 * int(np.sum(used)) >= n_params:
+        args = (cal, XYZ[used], xy[used], cpar, flags, extrinsics)
+        x0 = _calibration_vector(cal, flags, extrinsics)
+        from scipy.optimize import least_squares
+
+        sol = least_squares(
+            calibration_residuals,
+            x0,
+            args=args,
+            method="trf",
+            x_scale="jac",
+            loss=loss,
+            max_nfev=max_nfev,
         )
-        decentering = sol.x
-        cal.set_decentering(decentering)
-    else:
-        decentering = cal.get_decentering()
-
-    if any(flag in flags for flag in ["scale", "shear"]):
-        sol = minimize(
-            _residuals_s,
-            cal.get_affine(),
-            args=(cal, XYZ, targs, cpar),
-            method="Nelder-Mead",
-            tol=1e-11,
-            options={"disp": True},
+        # leave cal at the solution, not at the last trial point
+        calibration_residuals(sol.x, *args)
+        print(
+            f"least_squares calibration: cost {sol.cost:.6g}, "
+            f"{sol.nfev} evaluations, {sol.message}"
         )
-        affine = sol.x
-        cal.set_affine_trans(affine)
+    elif n_params:
+        print("Too few matched targets for calibration, parameters unchanged")
 
-    else:
-        affine = cal.get_affine()
+    from optv.transforms import convert_arr_metric_to_pixel
+    from optv.imgcoord import image_coordinates
 
-    residuals = _residuals_combined(
-        np.r_[radial, decentering, affine], cal, XYZ, targs, cpar
+    projected = convert_arr_metric_to_pixel(
+        image_coordinates(XYZ, cal, cpar.get_multimedia_params()), cpar
     )
+    residuals = np.nan_to_num(xy - projected)
 
     residuals /= 100
 
     return residuals
 
 
+def targets_from_positions(xy: np.ndarray, pnr: np.ndarray) -> TargetArray:
+    """Build a TargetArray from (N, 2) pixel positions and point numbers."""
+    targs = TargetArray(len(xy))
+    for tix, (pos, num) in enumerate(zip(xy, pnr)):
+        targ = targs[tix]
+        targ.set_pnr(int(num))
+        targ.set_pos([float(pos[0]), float(pos[1])])
+    return targs
+
+
+def update_calibration_from_dict(cal: Calibration, state: dict) -> None:
+    """Copy the output of calibration_to_dict into an existing Calibration."""
+    cal.set_pos(state["pos"])
+    cal.set_angles(state["angs"])
+    cal.set_primary_point(state["prim_point"])
+    cal.set_radial_distortion(state["rad_dist"])
+    cal.set_decentering(state["decent"])
+    cal.set_affine_trans(state["affine"])
+    cal.set_glass_vec(state["glass"])
+
+
+def _orient_camera_worker(task: dict) -> dict:
+    """Run one camera's orientation step; executed in a worker process.
+
+    task["mode"] selects the step:
+    - "sortgrid": match_detection_to_ref of task["xy"] against task["xyz"]
+    - "raw": external_calibration on four points
+    - "fine": full_calibration, with full_scipy_calibration as fallback
+    """
+    from optv.orientation import (
+        external_calibration,
+        full_calibration,
+        match_detection_to_ref,
+    )
+
+    cpar = _populate_cpar(task["ptv_params"], task["num_cams"])
+    cal = calibration_from_dict(task["cal"])
+    xyz = np.asarray(task["xyz"], dtype=float)
+    mode = task["mode"]
+    if mode not in ("sortgrid", "raw", "fine"):
+        raise ValueError(f"Unknown orientation mode: {mode}")
+    result = {"cam": task["cam"], "mode": mode, "success": True}
+    if mode == "fine":
+        # also set when the initial external_calibration fails
+        result.update(residuals=np.empty((0, 2)), targ_ix=[], fallback=False)
+
+    if mode == "sortgrid":
+        detections = targets_from_positions(task["xy"], np.arange(len(task["xy"])))
+        targs = match_detection_to_ref(cal, xyz, detections, cpar)
+        result["xy"] = np.array([t.pos() for t in targs], dtype=float).reshape(-1, 2)
+        result["pnr"] = np.array([t.pnr() for t in targs], dtype=int)
+        return result
+
+    if mode == "raw" or task.get("init_xyz") is not None:
+        ok = external_calibration(
+            cal,
+            np.asarray(task["init_xyz"], dtype=float),
+            np.asarray(task["init_xy"], dtype=float),
+            cpar,
+        )
+        result["success"] = ok is not False
+
+    if mode == "fine" and result["success"]:
+        targs = targets_from_positions(task["xy"], task["pnr"])
+        flags = list(task.get("flags", []))
+        try:
+            residuals, targ_ix, _err_est = full_calibration(cal, xyz, targs, cpar, flags)
+        except Exception:
+            if not task.get("scipy_fallback", False):
+                raise
+            residuals = full_scipy_calibration(
+                cal, xyz, targs, cpar, flags=flags, extrinsics=True
+            )
+            targ_ix = [t.pnr() for t in targs if t.pnr() != -999]
+            result["fallback"] = True
+        result["residuals"] = np.asarray(residuals, dtype=float)
+        result["targ_ix"] = [int(t) for t in targ_ix]
+
+    result["cal"] = calibration_to_dict(cal)
+    return result
+
+
+def orient_cameras(tasks, ptv_params: dict, num_cams: int, n_workers=None):
+    """Run independent per-camera orientation steps in a worker pool.
+
+    tasks is a list of dicts accepted by _orient_camera_worker, with
+    "cal" given as a Calibration. Results are yielded in the order the
+    cameras finish, so callers can update plots and write files while the
+    other cameras are still running. n_workers=1 runs in-process.
+
+    Workers are spawned, not forked: forking the multithreaded Qt process
+    of the calibration GUI is unsafe. A spawned worker imports numpy, scipy
+    and optv again, which takes longer than the millisecond "sortgrid" and
+    "raw" steps, so by default only "fine" tasks go to a pool.
+    """
+    tasks = [
+        dict(task, cal=calibration_to_dict(task["cal"]),
+             ptv_params=ptv_params, num_cams=num_cams)
+        for task in tasks
+    ]
+    if n_workers is None or n_workers < 1:
+        if all(task["mode"] != "fine" for task in tasks):
+            n_workers = 1
+        else:
+            n_workers = min(len(tasks), os.cpu_count() or 1)
+
+    if n_workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _orient_camera_worker(task)
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [executor.submit(_orient_camera_worker, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
 """
 Perform dumbbell calibration from existing target files, using a subset of
 the camera set, assuming some cameras are known to have moved and some to have
@@ -1163,8 +1488,10 @@ def dumbbell_ba_jac_sparsity(
     targets: np.ndarray,
     active_cams: np.ndarray,
     db_weight: float,
-) -> sparse.csr_matrix:
+) -> "sparse.csr_matrix":
     """Return Jacobian sparsity pattern for dumbbell bundle adjustment."""
+    from scipy import sparse
+
     num_cams, num_frames, num_pts, _ = targets.shape
     if num_pts != 2:
         raise ValueError("Targets must contain exactly 2 points per frame")
@@ -1212,6 +1539,385 @@ def dumbbell_ba_jac_sparsity(
     return pattern.tocsr()
 
 
+def dumbbell_triangulate_endpoints(
+    metric_targets: np.ndarray,
+    cpar: ControlParams,
+    cals: List[Calibration],
+) -> np.ndarray:
+    """Triangulate both dumbbell endpoints of every frame in one call.
+
+    metric_targets is shaped (num_cams, num_frames, 2, 2) in metric coordinates.
+    Returns a (num_frames, 2, 3) array of 3D endpoints.
+    """
+    from optv.orientation import multi_cam_point_positions
+
+    num_cams, num_frames, num_pts, _ = metric_targets.shape
+    per_point = np.ascontiguousarray(
+        metric_targets.transpose(1, 2, 0, 3).reshape(num_frames * num_pts, num_cams, 2),
+        dtype=float,
+    )
+    xyz, _rcm = multi_cam_point_positions(per_point, cpar, cals)
+    return np.asarray(xyz, dtype=float).reshape(num_frames, num_pts, 3)
+
+
+def select_dumbbell_frames(
+    points: np.ndarray,
+    budget: int,
+    voxels_per_axis: int = 4,
+    polar_bins: int = 3,
+    azimuth_bins: int = 6,
+) -> Tuple[np.ndarray, dict]:
+    """Pick a budgeted subset of dumbbell frames covering the measurement volume.
+
+    points holds initial endpoint triangulations shaped (num_frames, 2, 3).
+    Dumbbell centres are binned into a voxel grid spanning their bounding box,
+    and the (sign-free) dumbbell axis into polar/azimuth bins. Frames are picked
+    greedily, preferring an unseen voxel first and an unseen voxel/orientation
+    cell second. Once every occupied cell has been visited the coverage is
+    reset, so further picks are spread over the volume again.
+
+    Returns the sorted selected frame indices and a report dict.
+    """
+    points = np.asarray(points, dtype=float)
+    num_frames = points.shape[0]
+    valid = np.isfinite(points).all(axis=(1, 2))
+
+    centers = points.mean(axis=1)
+    lo = np.nanmin(centers[valid], axis=0) if np.any(valid) else np.zeros(3)
+    hi = np.nanmax(centers[valid], axis=0) if np.any(valid) else np.ones(3)
+    extent = np.maximum(hi - lo, 1e-9)
+    vox = np.floor((np.nan_to_num(centers) - lo) / extent * voxels_per_axis)
+    vox = np.clip(vox, 0, voxels_per_axis - 1).astype(int)
+    voxel_ids = np.ravel_multi_index(vox.T, (voxels_per_axis,) * 3)
+
+    axis = np.nan_to_num(points[:, 1] - points[:, 0])
+    axis /= np.maximum(np.linalg.norm(axis, axis=1, keepdims=True), 1e-12)
+    axis[axis[:, 2] < 0] *= -1
+    polar = np.arccos(np.clip(axis[:, 2], 0.0, 1.0))
+    azimuth = np.arctan2(axis[:, 1], axis[:, 0])
+    polar_ids = np.minimum((polar / (np.pi / 2) * polar_bins).astype(int), polar_bins - 1)
+    azimuth_ids = np.minimum(
+        ((azimuth + np.pi) / (2 * np.pi) * azimuth_bins).astype(int), azimuth_bins - 1
+    )
+    num_orient = polar_bins * azimuth_bins
+    cell_ids = voxel_ids * num_orient + polar_ids * azimuth_bins + azimuth_ids
+
+    if budget <= 0 or budget >= num_frames:
+        selected = np.arange(num_frames)
+    else:
+        voxel_seen = np.zeros(voxels_per_axis**3, dtype=bool)
+        cell_seen = np.zeros(voxels_per_axis**3 * num_orient, dtype=bool)
+        available = valid.copy()
+        chosen = []
+        for _ in range(min(budget, int(np.sum(available)))):
+            score = 2 * ~voxel_seen[voxel_ids] + ~cell_seen[cell_ids]
+            score = np.where(available, score, -1)
+            best = int(np.argmax(score))
+            if score[best] == 0:
+                voxel_seen[:] = False
+                cell_seen[:] = False
+            chosen.append(best)
+            available[best] = False
+            voxel_seen[voxel_ids[best]] = True
+            cell_seen[cell_ids[best]] = True
+        selected = np.sort(np.asarray(chosen, dtype=int))
+
+    used = selected[valid[selected]]
+    report = {
+        "n_candidates": int(num_frames),
+        "n_selected": int(len(selected)),
+        "voxels_occupied": int(len(np.unique(voxel_ids[valid]))),
+        "voxels_covered": int(len(np.unique(voxel_ids[used]))),
+        "cells_occupied": int(len(np.unique(cell_ids[valid]))),
+        "cells_covered": int(len(np.unique(cell_ids[used]))),
+    }
+    return selected, report
+
+
+def set_active_extrinsics(calib_vec, cals, active_cams, pos_scale=1.0) -> None:
+    """Pour packed (pos, angles) rows of the active cameras into cals."""
+    calib_pars = np.asarray(calib_vec, dtype=float).reshape(-1, 2, 3)
+    ptr = 0
+    for cam, cal in enumerate(cals):
+        if not active_cams[cam]:
+            continue
+        cal.set_pos(calib_pars[ptr, 0] * pos_scale)
+        cal.set_angles(calib_pars[ptr, 1])
+        ptr += 1
+
+
+def dumbbell_adaptive_solve(
+    x0,
+    per_frame_metric,
+    cpar,
+    cals,
+    active_cams,
+    db_length,
+    db_weight,
+    pos_scale=1.0,
+    nfev_per_round=200,
+    max_rounds=3,
+    verbose=2,
+    deadline=None,
+):
+    """Run the adaptive-tolerance least_squares chain of dumbbell BA.
+
+    Returns (res, best_x, best_fun), best_fun being the sum of squared
+    residuals after the last round. If ``deadline`` (a ``time.monotonic()``
+    value) passes mid-round, the best vector evaluated so far is returned
+    and ``res`` is the last completed round (None if none completed).
+    """
+    method = "trf"
+    loss = "soft_l1"
+    if verbose:
+        print(f"Using least_squares method={method} loss={loss}")
+    tol_steps = [
+        (1e-6, 1e-6, 1e-5),
+        (1e-5, 1e-5, 1e-4),
+        (1e-4, 1e-4, 1e-3),
+    ]
+    min_improvement = 1e-3
+    args = (per_frame_metric, cpar, cals, active_cams, db_length, db_weight, pos_scale)
+
+    best_x = x0
+    best_fun = float(np.sum(dumbbell_ba_residuals(x0, *args) ** 2))
+    res = None
+
+    jac_sparsity = dumbbell_ba_jac_sparsity(per_frame_metric, active_cams, db_weight)
+
+    fun = dumbbell_ba_residuals
+    if deadline is not None:
+        seen = {"x": best_x, "fun": best_fun}
+
+        def fun(x, *fargs):
+            if time.monotonic() > deadline:
+                raise _DumbbellTimeout
+            residuals = dumbbell_ba_residuals(x, *fargs)
+            value = float(np.sum(residuals**2))
+            if value < seen["fun"]:
+                seen["x"], seen["fun"] = np.array(x, copy=True), value
+            return residuals
+
+    from scipy.optimize import least_squares
+
+    for idx in range(max_rounds):
+        xtol, ftol, gtol = tol_steps[min(idx, len(tol_steps) - 1)]
+        try:
+            round_res = least_squares(
+                fun,
+                best_x,
+                args=args,
+                xtol=xtol,
+                ftol=ftol,
+                gtol=gtol,
+                jac_sparsity=jac_sparsity,
+                x_scale="jac",
+                max_nfev=nfev_per_round,
+                loss=loss,
+                f_scale=1.0,
+                verbose=verbose,
+                method=method,
+            )
+        except _DumbbellTimeout:
+            if seen["fun"] < best_fun:
+                best_x, best_fun = seen["x"], seen["fun"]
+            return res, best_x, best_fun
+        res = round_res
+        new_fun = float(np.sum(res.fun**2))
+        improvement = (best_fun - new_fun) / max(best_fun, 1e-12)
+        if verbose:
+            print(
+                f"Adaptive round {idx + 1}: fun={new_fun:.6g} improvement={improvement:.3g} "
+                f"xtol={xtol} ftol={ftol} gtol={gtol}"
+            )
+        best_x = res.x
+        best_fun = new_fun
+        if improvement < min_improvement:
+            break
+
+    if res is None:
+        raise RuntimeError("Adaptive least_squares did not run")
+
+    return res, best_x, best_fun
+
+
+class _DumbbellTimeout(Exception):
+    """Raised inside the residual function when a start exceeds its budget."""
+
+
+def calibration_to_dict(cal: Calibration) -> dict:
+    """Return the fields of a Calibration as plain arrays (picklable)."""
+    return {
+        "pos": np.array(cal.get_pos()),
+        "angs": np.array(cal.get_angles()),
+        "prim_point": np.array(cal.get_primary_point()),
+        "rad_dist": np.array(cal.get_radial_distortion()),
+        "decent": np.array(cal.get_decentering()),
+        "affine": np.array(cal.get_affine()),
+        "glass": np.array(cal.get_glass_vec()),
+    }
+
+
+def calibration_from_dict(state: dict) -> Calibration:
+    """Build a Calibration from the output of calibration_to_dict."""
+    return Calibration(**state)
+
+
+def _soft_l1_cost(residuals: np.ndarray) -> float:
+    """Robust cost matching least_squares(loss="soft_l1", f_scale=1)."""
+    return float(np.sum(2.0 * (np.sqrt(1.0 + residuals**2) - 1.0)))
+
+
+def _dumbbell_start_worker(task: dict) -> dict:
+    """Run one dumbbell BA start; executed in a worker process."""
+    started = time.monotonic()
+    num_cams = len(task["cal_states"])
+    cpar = _populate_cpar(task["ptv_params"], num_cams)
+    cals = [calibration_from_dict(state) for state in task["cal_states"]]
+    active = task["active_cams"]
+    pos_scale = task["pos_scale"]
+    per_frame_metric = task["per_frame_metric"]
+
+    set_active_extrinsics(task["calib_vec"], cals, active, pos_scale)
+    points = dumbbell_triangulate_endpoints(per_frame_metric, cpar, cals)
+    x0 = np.concatenate([task["calib_vec"], points.reshape(-1)])
+
+    budget = task["time_budget"]
+    deadline = started + budget if budget else None
+    res, best_x, _best_fun = dumbbell_adaptive_solve(
+        x0,
+        per_frame_metric,
+        cpar,
+        cals,
+        active,
+        task["db_length"],
+        task["db_weight"],
+        pos_scale,
+        nfev_per_round=task["nfev_per_round"],
+        verbose=0,
+        deadline=deadline,
+    )
+    timed_out = deadline is not None and time.monotonic() > deadline
+    residuals = dumbbell_ba_residuals(
+        best_x, per_frame_metric, cpar, cals, active,
+        task["db_length"], task["db_weight"], pos_scale,
+    )
+    return {
+        "start": task["start"],
+        "x": best_x,
+        "cost": _soft_l1_cost(residuals),
+        "success": bool(res.success) if res is not None else False,
+        "message": str(res.message) if res is not None else "time budget exhausted",
+        "timed_out": timed_out,
+        "elapsed": time.monotonic() - started,
+    }
+
+
+def dumbbell_multistart(
+    calib_vec,
+    per_frame_metric,
+    ptv_params,
+    cals,
+    active_cams,
+    db_length,
+    db_weight,
+    pos_scale=1.0,
+    n_starts=4,
+    n_workers=None,
+    time_budget=None,
+    pos_sigma=5.0,
+    angle_sigma=0.02,
+    seed=0,
+    nfev_per_round=200,
+) -> Tuple[dict, dict]:
+    """Run dumbbell BA from several perturbed starting extrinsics.
+
+    Start 0 uses calib_vec as given; the others add Gaussian noise of
+    pos_sigma (mm) and angle_sigma (rad) to every active camera. Each start
+    re-triangulates the endpoints with its own extrinsics and runs the
+    adaptive least_squares chain in a worker process, for at most
+    time_budget seconds (None for no limit).
+
+    Returns the best start by soft-L1 cost (a dict with x, cost, success,
+    message, ...) and a report of the spread between starts.
+    """
+    if n_starts < 1:
+        raise ValueError(f"n_starts must be >= 1, got {n_starts}")
+
+    calib_vec = np.asarray(calib_vec, dtype=float).reshape(-1)
+    rng = np.random.default_rng(seed)
+    cal_states = [calibration_to_dict(cal) for cal in cals]
+
+    tasks = []
+    for start in range(n_starts):
+        start_vec = calib_vec.copy()
+        if start > 0:
+            rows = start_vec.reshape(-1, 2, 3)
+            rows[:, 0] += rng.normal(0.0, pos_sigma, size=rows[:, 0].shape) / pos_scale
+            rows[:, 1] += rng.normal(0.0, angle_sigma, size=rows[:, 1].shape)
+        tasks.append(
+            {
+                "start": start,
+                "calib_vec": start_vec,
+                "per_frame_metric": per_frame_metric,
+                "ptv_params": ptv_params,
+                "cal_states": cal_states,
+                "active_cams": np.asarray(active_cams, dtype=bool),
+                "db_length": float(db_length),
+                "db_weight": float(db_weight),
+                "pos_scale": pos_scale,
+                "nfev_per_round": nfev_per_round,
+                "time_budget": time_budget,
+            }
+        )
+
+    if n_workers is None or n_workers < 1:
+        n_workers = min(n_starts, os.cpu_count() or 1)
+
+    if n_workers == 1:
+        results = [_dumbbell_start_worker(task) for task in tasks]
+    else:
+        # spawned like orient_cameras: the calibration GUI can get here
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results = list(executor.map(_dumbbell_start_worker, tasks))
+
+    costs = np.array([r["cost"] for r in results])
+    best = results[int(np.argmin(costs))]
+
+    cam_len = calib_vec.shape[0]
+    cams = np.array([r["x"][:cam_len] for r in results]).reshape(n_starts, -1, 2, 3)
+    cams[:, :, 0] *= pos_scale
+    report = {
+        "n_starts": n_starts,
+        "n_workers": n_workers,
+        "best_start": best["start"],
+        "costs": costs.tolist(),
+        "cost_spread": float(costs.max() - costs.min()),
+        "pos_spread": float(np.max(np.std(cams[:, :, 0], axis=0))),
+        "angle_spread": float(np.max(np.std(cams[:, :, 1], axis=0))),
+        "n_timed_out": int(sum(r["timed_out"] for r in results)),
+        "elapsed": [r["elapsed"] for r in results],
+    }
+    return best, report
+
+
+def print_multistart_report(report: dict) -> None:
+    """Print the summary returned by dumbbell_multistart."""
+    print(
+        f"Multi-start: best start {report['best_start']} of {report['n_starts']} "
+        f"({report['n_workers']} worker(s)), robust costs {np.round(report['costs'], 6).tolist()}"
+    )
+    print(
+        f"Spread between starts: cost {report['cost_spread']:.6g}, "
+        f"position {report['pos_spread']:.4g} mm, angle {report['angle_spread']:.4g} rad, "
+        f"{report['n_timed_out']} start(s) hit the time budget"
+    )
+
 
 def calib_convergence(calib_vec, targets, calibs, active_cams, cpar,
     db_length, db_weight, pos_scale=1.0):
@@ -1389,6 +2095,21 @@ def calib_dumbbell(cal_gui)-> None:
         rms = np.sqrt(sums / np.maximum(counts, 1))
         print(f"{label} per-camera RMS (metric): {rms.tolist()}")
 
+    all_frames_metric = metric_by_cam
+    frame_budget = int(dumbbell_params.get('dumbbell_frame_budget') or 0)
+    refine_all = bool(dumbbell_params.get('dumbbell_refine_all', False))
+    if 0 < frame_budget < num_frames:
+        selected, report = select_dumbbell_frames(
+            dumbbell_triangulate_endpoints(metric_by_cam, cpar, cals), frame_budget
+        )
+        print(
+            f"Selected {report['n_selected']} of {report['n_candidates']} frame(s) "
+            f"covering {report['voxels_covered']}/{report['voxels_occupied']} voxels and "
+            f"{report['cells_covered']}/{report['cells_occupied']} voxel/orientation cells"
+        )
+        metric_by_cam = metric_by_cam[:, selected, :, :]
+        num_frames = metric_by_cam.shape[1]
+
     print(f"Using {num_frames} frame(s) for dumbbell calibration")
     per_frame_metric = metric_by_cam
     
@@ -1424,26 +2145,7 @@ def calib_dumbbell(cal_gui)-> None:
         # place.
     calib_vec = calib_vec.flatten()
 
-    def _init_dumbbell_points(metric_targets: np.ndarray) -> np.ndarray:
-        from optv.orientation import multi_cam_point_positions
-
-        num_cams_local, num_frames_local, _, _ = metric_targets.shape
-        points = np.zeros((num_frames_local, 2, 3), dtype=float)
-
-        for frame_idx in range(num_frames_local):
-            frame_targets = metric_targets[:, frame_idx, :, :]
-            xyz1, _err1 = multi_cam_point_positions(
-                frame_targets[:, 0, :][np.newaxis], cpar, cals
-            )
-            xyz2, _err2 = multi_cam_point_positions(
-                frame_targets[:, 1, :][np.newaxis], cpar, cals
-            )
-            points[frame_idx, 0] = xyz1[0]
-            points[frame_idx, 1] = xyz2[0]
-
-        return points
-
-    points_init = _init_dumbbell_points(per_frame_metric)
+    points_init = dumbbell_triangulate_endpoints(per_frame_metric, cpar, cals)
     x0 = np.concatenate([calib_vec, points_init.reshape(-1)])
     
     # Test optimizer-ready target function:
@@ -1457,59 +2159,40 @@ def calib_dumbbell(cal_gui)-> None:
     _print_camera_residuals("Initial", per_frame_metric)
     
     # Optimization:
-    method = "trf"
-    loss = "soft_l1"
-    print(f"Using least_squares method={method} loss={loss}")
-    tol_steps = [
-        (1e-6, 1e-6, 1e-5),
-        (1e-5, 1e-5, 1e-4),
-        (1e-4, 1e-4, 1e-3),
-    ]
-    max_rounds = 3
-    nfev_per_round = 200
-    min_improvement = 1e-3
-
-    best_x = x0
-    best_fun = float(np.sum(init_residuals**2))
-    res = None
-
-    jac_sparsity = dumbbell_ba_jac_sparsity(per_frame_metric, active, db_weight)
-
-    for idx in range(max_rounds):
-        xtol, ftol, gtol = tol_steps[min(idx, len(tol_steps) - 1)]
-        res = least_squares(
-            dumbbell_ba_residuals,
-            best_x,
-            args=(per_frame_metric, cpar, cals, active, db_length, db_weight, pos_scale),
-            xtol=xtol,
-            ftol=ftol,
-            gtol=gtol,
-            jac_sparsity=jac_sparsity,
-            x_scale="jac",
-            max_nfev=nfev_per_round,
-            loss=loss,
-            f_scale=1.0,
-            verbose=2,
-            method=method,
+    n_starts = int(dumbbell_params.get('dumbbell_starts') or 1)
+    if n_starts > 1:
+        best, report = dumbbell_multistart(
+            calib_vec, per_frame_metric, pm.get_parameter('ptv'), cals, active,
+            db_length, db_weight, pos_scale,
+            n_starts=n_starts,
+            n_workers=int(dumbbell_params.get('dumbbell_workers') or 0),
+            time_budget=float(dumbbell_params.get('dumbbell_start_time_budget') or 0) or None,
         )
-        new_fun = float(np.sum(res.fun**2))
-        improvement = (best_fun - new_fun) / max(best_fun, 1e-12)
-        print(
-            f"Adaptive round {idx + 1}: fun={new_fun:.6g} improvement={improvement:.3g} "
-            f"xtol={xtol} ftol={ftol} gtol={gtol}"
+        print_multistart_report(report)
+        best_x = best["x"]
+        success, message = best["success"], best["message"]
+    else:
+        res, best_x, best_fun = dumbbell_adaptive_solve(
+            x0, per_frame_metric, cpar, cals, active, db_length, db_weight, pos_scale
         )
-        best_x = res.x
-        best_fun = new_fun
-        if improvement < min_improvement:
-            break
+        success, message = res.success, res.message
 
-    if res is None:
-        raise RuntimeError("Adaptive least_squares did not run")
+    cam_params_len = num_active * 6
+    if refine_all and all_frames_metric.shape[1] > per_frame_metric.shape[1]:
+        # Final refinement on every valid frame, starting from the subset solution
+        set_active_extrinsics(best_x[:cam_params_len], cals, active, pos_scale)
+        per_frame_metric = all_frames_metric
+        points_all = dumbbell_triangulate_endpoints(per_frame_metric, cpar, cals)
+        print(f"Refining on all {per_frame_metric.shape[1]} frame(s)")
+        res, best_x, best_fun = dumbbell_adaptive_solve(
+            np.concatenate([best_x[:cam_params_len], points_all.reshape(-1)]),
+            per_frame_metric, cpar, cals, active, db_length, db_weight, pos_scale,
+        )
+        success, message = res.success, res.message
         
     print("Result of dumbbell calibration")
-    cam_params_len = num_active * 6
     print(best_x[:cam_params_len].reshape(num_active, -1))
-    print("Success:", res.success, res.message)
+    print("Success:", success, message)
     print("Final target function (sum of squared residuals):", end=' ')
     final_residuals = dumbbell_ba_residuals(
         best_x, per_frame_metric, cpar, cals, active, db_length, db_weight, pos_scale
@@ -1518,29 +2201,293 @@ def calib_dumbbell(cal_gui)-> None:
 
 
     # convert calib_vec back to Calibration objects:
-    cam_params_len = num_active * 6
-    calib_pars = best_x[:cam_params_len].reshape(-1, 2, 3)
-    
+    set_active_extrinsics(best_x[:cam_params_len], cals, active, pos_scale)
+    _print_camera_residuals("Final", per_frame_metric)
+
     for cam, cal in enumerate(cals):
         if not active[cam]:
             continue
-        
-        # Pop a parameters line:
-        pars = calib_pars[0]
-        calib_pars = calib_pars[1:]
-        
-        cal.set_pos(pars[0] * pos_scale)
-        cal.set_angles(pars[1])
-
-        _print_camera_residuals("Final", per_frame_metric)
-
 
         # Write the calibration results to files:
         ori_filename = cpar.get_cal_img_base_name(cam)
         addpar_filename = ori_filename + ".addpar"
         ori_filename = ori_filename + ".ori"
-        cal.write(ori_filename.encode('utf-8'), addpar_filename.encode('utf-8'))
+        write_calibration(cal, ori_filename, addpar_filename)
+
+
+def _particles_ba_layout(num_cams: int, fixed_cam: int, n_flags: int):
+    """Offsets and sizes of the per-camera blocks in the BA parameter vector."""
+    sizes = np.array(
+        [(0 if cam == fixed_cam else 6) + n_flags for cam in range(num_cams)],
+        dtype=int,
+    )
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    return offsets, sizes, int(np.sum(sizes))
+
+
+def particles_ba_residuals(
+    x,
+    detections,
+    observed,
+    cpar,
+    cals,
+    flags,
+    fixed_cam=0,
+    ref_distance=None,
+    gauge_weight=100.0,
+):
+    """Pixel reprojection residuals for joint bundle adjustment of particles.
+
+    x packs, camera by camera, 6 extrinsics (skipped for fixed_cam) and the
+    flagged intrinsics, followed by the 3D positions of all points.
+    detections is (num_cams, num_points, 2) in pixels, observed a boolean
+    (num_cams, num_points) mask. When ref_distance is given, one extra residual
+    keeps the mean distance of the free cameras from the fixed camera at that
+    value, which fixes the scale of the solution.
+    """
+    from optv.imgcoord import image_coordinates
+    from optv.transforms import convert_arr_metric_to_pixel
+
+    num_cams, num_points, _ = detections.shape
+    offsets, sizes, cam_len = _particles_ba_layout(num_cams, fixed_cam, len(flags))
+
+    for cam, cal in enumerate(cals):
+        block = x[offsets[cam]:offsets[cam] + sizes[cam]]
+        if cam != fixed_cam:
+            cal.set_pos(block[:3])
+            cal.set_angles(block[3:6])
+            block = block[6:]
+        if len(flags):
+            set_calibration_flags(cal, flags, block)
+
+    points = x[cam_len:].reshape(num_points, 3)
+    mm_params = cpar.get_multimedia_params()
+
+    residuals = []
+    for cam in range(num_cams):
+        idx = np.flatnonzero(observed[cam])
+        if idx.size == 0:
+            continue
+        proj = convert_arr_metric_to_pixel(
+            image_coordinates(np.ascontiguousarray(points[idx]), cals[cam], mm_params),
+            cpar,
+        )
+        residuals.append((proj - detections[cam, idx]).ravel())
+
+    if ref_distance is not None:
+        ref_pos = np.asarray(cals[fixed_cam].get_pos())
+        dist = np.mean(
+            [
+                np.linalg.norm(np.asarray(cal.get_pos()) - ref_pos)
+                for cam, cal in enumerate(cals)
+                if cam != fixed_cam
+            ]
+        )
+        residuals.append([gauge_weight * (dist - ref_distance) / ref_distance])
+
+    residuals = np.concatenate(residuals).astype(float)
+    return np.nan_to_num(residuals, nan=1e6, posinf=1e6, neginf=-1e6)
+
+
+def particles_ba_jac_sparsity(
+    observed: np.ndarray,
+    fixed_cam: int,
+    n_flags: int,
+    gauge: bool = True,
+) -> "sparse.csr_matrix":
+    """Return the Jacobian sparsity pattern matching particles_ba_residuals."""
+    from scipy import sparse
+
+    num_cams, num_points = observed.shape
+    offsets, sizes, cam_len = _particles_ba_layout(num_cams, fixed_cam, n_flags)
+
+    rows, cols = [], []
+    row0 = 0
+    for cam in range(num_cams):
+        idx = np.flatnonzero(observed[cam])
+        if idx.size == 0:
+            continue
+        n_rows = 2 * idx.size
+        cam_rows = row0 + np.arange(n_rows)
+
+        # every residual of this camera depends on its own camera block
+        cam_cols = offsets[cam] + np.arange(sizes[cam])
+        rows.append(np.repeat(cam_rows, cam_cols.size))
+        cols.append(np.tile(cam_cols, n_rows))
+
+        # and on the three coordinates of its point
+        point_cols = cam_len + 3 * np.repeat(idx, 2)
+        rows.append(np.repeat(cam_rows, 3))
+        cols.append((point_cols[:, None] + np.arange(3)).ravel())
+        row0 += n_rows
+
+    if gauge:
+        free_cols = np.concatenate(
+            [offsets[cam] + np.arange(3) for cam in range(num_cams) if cam != fixed_cam]
+        )
+        rows.append(np.full(free_cols.size, row0))
+        cols.append(free_cols)
+        row0 += 1
+
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    pattern = sparse.coo_matrix(
+        (np.ones(rows.size, dtype=bool), (rows, cols)),
+        shape=(row0, cam_len + 3 * num_points),
+    )
+    return pattern.tocsr()
+
+
+def particles_bundle_adjustment(
+    points: np.ndarray,
+    detections: np.ndarray,
+    cpar: ControlParams,
+    cals: List[Calibration],
+    flags=(),
+    fixed_cam: int = 0,
+    max_points: int = 0,
+    max_nfev: int = 200,
+    loss: str = "soft_l1",
+    f_scale: float = 1.0,
+    gauge_weight: float = 0.0,
+    verbose: int = 0,
+    seed: int = 0,
+):
+    """Jointly refine all cameras and the particle positions.
+
+    Arguments:
+    points - (num_points, 3) initial positions, e.g. from rt_is files.
+    detections - (num_cams, num_points, 2) pixel positions, NaN where a
+        camera did not see the point.
+    cals - Calibration objects, updated in place.
+    flags - orient flags (see NAMES) solved for every camera.
+    fixed_cam - camera whose extrinsics define the coordinate frame.
+    max_points - use at most this many points (0 = all), preferring points
+        seen by more cameras.
+    gauge_weight - if positive, softly keep the mean distance of the free
+        cameras from the fixed one at its initial value. Through refraction
+        the scale is normally fixed by the data; use this only when the
+        multimedia geometry is weak (e.g. air-only setups).
+
+    Returns:
+    (points, mask, report): the refined positions of the points used, the
+    boolean mask of the input points they correspond to, and a dict with
+    the solver summary (cost_initial, cost_final, rms_initial, rms_final,
+    per-camera rms, number of points and observations).
+    """
+    points = np.asarray(points, dtype=float)
+    detections = np.asarray(detections, dtype=float)
+    num_cams = len(cals)
+    if detections.shape != (num_cams, points.shape[0], 2):
+        raise ValueError(
+            f"Detections must be shaped ({num_cams}, {points.shape[0]}, 2), "
+            f"got {detections.shape}"
+        )
+    if not 0 <= fixed_cam < num_cams:
+        raise ValueError(f"Fixed camera {fixed_cam} out of range")
+    flags = [name for name in NAMES if name in flags]
+
+    observed = np.all(np.isfinite(detections), axis=2)
+    n_obs = np.sum(observed, axis=0)
+    usable = (n_obs >= 2) & np.all(np.isfinite(points), axis=1)
+
+    candidates = np.flatnonzero(usable)
+    if max_points > 0 and candidates.size > max_points:
+        rng = np.random.default_rng(seed)
+        candidates = rng.permutation(candidates)
+        candidates = candidates[np.argsort(-n_obs[candidates], kind="stable")]
+        candidates = np.sort(candidates[:max_points])
+    if candidates.size < 4:
+        raise ValueError(
+            f"Need at least 4 points seen by two or more cameras, got {candidates.size}"
+        )
+
+    mask = np.zeros(points.shape[0], dtype=bool)
+    mask[candidates] = True
+    detections = detections[:, mask]
+    observed = observed[:, mask]
+
+    x0 = []
+    for cam, cal in enumerate(cals):
+        if cam != fixed_cam:
+            x0.extend(cal.get_pos())
+            x0.extend(cal.get_angles())
+        x0.extend(get_calibration_flags(cal, flags))
+    x0 = np.concatenate([np.asarray(x0, dtype=float), points[mask].ravel()])
+
+    ref_pos = np.asarray(cals[fixed_cam].get_pos())
+    ref_distance = None
+    if gauge_weight > 0 and num_cams > 1:
+        ref_distance = float(
+            np.mean(
+                [
+                    np.linalg.norm(np.asarray(cal.get_pos()) - ref_pos)
+                    for cam, cal in enumerate(cals)
+                    if cam != fixed_cam
+                ]
+            )
+        )
+        if ref_distance <= 0:
+            ref_distance = None
+
+    args = (detections, observed, cpar, cals, flags, fixed_cam, ref_distance, gauge_weight)
+    n_residuals = 2 * int(np.sum(observed))
+
+    def _rms(x):
+        res = particles_ba_residuals(x, *args)[:n_residuals]
+        return float(np.sqrt(np.mean(res**2)))
 
+    rms_initial = _rms(x0)
+    jac_sparsity = particles_ba_jac_sparsity(
+        observed, fixed_cam, len(flags), gauge=ref_distance is not None
+    )
+
+    from scipy.optimize import least_squares
+
+    started = time.monotonic()
+    res = least_squares(
+        particles_ba_residuals,
+        x0,
+        args=args,
+        jac_sparsity=jac_sparsity,
+        method="trf",
+        x_scale="jac",
+        loss=loss,
+        f_scale=f_scale,
+        max_nfev=max_nfev,
+        verbose=verbose,
+    )
+    elapsed = time.monotonic() - started
+
+    # leave the Calibration objects at the solution
+    final = particles_ba_residuals(res.x, *args)[:n_residuals].reshape(-1, 2)
+    cam_len = _particles_ba_layout(num_cams, fixed_cam, len(flags))[2]
+    refined = res.x[cam_len:].reshape(-1, 3)
+
+    rms_per_cam = []
+    row = 0
+    for cam in range(num_cams):
+        n = int(np.sum(observed[cam]))
+        cam_res = final[row:row + n]
+        rms_per_cam.append(float(np.sqrt(np.mean(cam_res**2))) if n else float("nan"))
+        row += n
+
+    report = {
+        "n_points": int(mask.sum()),
+        "n_observations": int(np.sum(observed)),
+        "n_params": int(res.x.size),
+        "fixed_cam": fixed_cam,
+        "flags": flags,
+        "rms_initial": rms_initial,
+        "rms_final": float(np.sqrt(np.mean(final**2))),
+        "rms_per_cam": rms_per_cam,
+        "cost_final": float(res.cost),
+        "nfev": int(res.nfev),
+        "success": bool(res.success),
+        "message": res.message,
+        "elapsed": elapsed,
+    }
+    return refined, mask, report
 
 
 def calib_particles(exp):
@@ -1600,6 +2547,12 @@ def calib_particles(exp):
 
     all_known = np.vstack(all_known)
 
+    if shaking_params.get('shaking_bundle_adjustment', False):
+        return _calib_particles_joint(
+            all_known, all_detected, cpar, calibs, flags,
+            max_points=shaking_params.get('shaking_ba_max_points', 0),
+        )
+
     targ_ix_all = []
     residuals_all = []
     targs_all = []
@@ -1630,7 +2583,7 @@ def calib_particles(exp):
         ori_filename = exp.cpar.get_cal_img_base_name(cam)
         addpar_filename = ori_filename + ".addpar"
         ori_filename = ori_filename + ".ori"
-        calibs[cam].write(ori_filename.encode('utf-8'), addpar_filename.encode('utf-8'))
+        write_calibration(calibs[cam], ori_filename, addpar_filename)
 
         targ_ix = [t.pnr() for t in targs if t.pnr() != -999]
 
@@ -1639,4 +2592,64 @@ def calib_particles(exp):
         residuals_all.append(residuals)
 
     print("End calibration with particles")
-    return targs_all, targ_ix_all, residuals_all
\ No newline at end of file
+    return targs_all, targ_ix_all, residuals_all
+
+
+def _calib_particles_joint(all_known, all_detected, cpar, calibs, flags, max_points=0):
+    """Joint bundle adjustment branch of calib_particles."""
+    num_cams = len(calibs)
+    detections = np.stack([np.vstack(all_detected[cam]) for cam in range(num_cams)])
+
+    points, mask, report = particles_bundle_adjustment(
+        all_known, detections, cpar, calibs,
+        flags=flags, max_points=max_points, verbose=1,
+    )
+    print(
+        f"Bundle adjustment: {report['n_points']} points, "
+        f"{report['n_observations']} observations, "
+        f"rms {report['rms_initial']:.3f} -> {report['rms_final']:.3f} pix "
+        f"({report['elapsed']:.1f} s)"
+    )
+
+    from optv.imgcoord import image_coordinates
+    from optv.transforms import convert_arr_metric_to_pixel
+
+    targ_ix_all = []
+    residuals_all = []
+    targs_all = []
+    for cam in range(num_cams):
+        print(f"Camera {cam + 1}, rms {report['rms_per_cam'][cam]:.3f} pix")
+        print((calibs[cam].get_pos()))
+        print((calibs[cam].get_angles()))
+
+        ori_filename = cpar.get_cal_img_base_name(cam)
+        addpar_filename = ori_filename + ".addpar"
+        ori_filename = ori_filename + ".ori"
+        write_calibration(calibs[cam], ori_filename, addpar_filename)
+
+        detects = detections[cam, mask]
+        seen = np.isfinite(detects[:, 0])
+        used_detects = detects[seen]
+
+        targs = TargetArray(len(used_detects))
+        for tix, detect in enumerate(used_detects):
+            targ = targs[tix]
+            targ.set_pnr(tix)
+            targ.set_pos(detect)
+
+        projected = convert_arr_metric_to_pixel(
+            image_coordinates(
+                np.ascontiguousarray(points[seen]), calibs[cam],
+                cpar.get_multimedia_params(),
+            ),
+            cpar,
+        )
+        # same sign and scale as full_scipy_calibration
+        residuals = (used_detects - projected) / 100
+
+        targs_all.append(targs)
+        targ_ix_all.append(list(range(len(used_detects))))
+        residuals_all.append(residuals)
+
+    print("End calibration with particles")
+    return targs_all, targ_ix_all, residuals_all
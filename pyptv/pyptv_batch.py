@@ -27,8 +27,9 @@ import sys
 import time
 from typing import Union
 
-from pyptv.ptv import py_start_proc_c, py_trackcorr_init, py_sequence_loop, generate_short_file_bases
-from pyptv.experiment import Experiment
+from pyptv.ptv import py_trackcorr_init, py_sequence_loop, run_tracker
+from pyptv.parameter_manager import ParameterManager
+from pyptv.processing import start_processing
 
 
 
@@ -106,40 +107,10 @@ def run_batch(yaml_file: Path, seq_first: int, seq_last: int, mode: str = "both"
         # Change to experiment directory
         os.chdir(exp_path)
 
-        # Create experiment and load YAML parameters
-        experiment = Experiment()
-
         # Load parameters from YAML file
         print(f"Loading parameters from: {yaml_file}")
-        experiment.pm.from_yaml(yaml_file)
-
-        print(f"Initializing processing with num_cams = {experiment.pm.num_cams}")
-        cpar, spar, vpar, track_par, tpar, cals, epar = py_start_proc_c(experiment.pm)
-
-        # Set sequence parameters
-        spar.set_first(seq_first)
-        spar.set_last(seq_last)
-
-        # Create a simple object to hold processing parameters for ptv.py functions
-        class ProcessingExperiment:
-            def __init__(self, experiment, cpar, spar, vpar, track_par, tpar, cals, epar):
-                self.pm = experiment.pm
-                self.cpar = cpar
-                self.spar = spar
-                self.vpar = vpar
-                self.track_par = track_par
-                self.tpar = tpar
-                self.cals = cals
-                self.epar = epar
-                self.num_cams = experiment.pm.num_cams  # Global number of cameras
-                # Initialize attributes that may be set during processing
-                self.detections = []
-                self.corrected = []
-
-        proc_exp = ProcessingExperiment(experiment, cpar, spar, vpar, track_par, tpar, cals, epar)
-
-        # Centralized: get target_filenames from ParameterManager
-        proc_exp.target_filenames = experiment.pm.get_target_filenames()
+        proc_exp = start_processing(yaml_file, seq_first, seq_last)
+        print(f"Initialized processing with num_cams = {proc_exp.num_cams}")
 
         # Run processing according to mode
         if mode == "both":
@@ -148,7 +119,7 @@ def run_batch(yaml_file: Path, seq_first: int, seq_last: int, mode: str = "both"
             print("Initializing tracker...")
             tracker = py_trackcorr_init(proc_exp)
             print("Running tracking...")
-            tracker.full_forward()
+            run_tracker(tracker)
         elif mode == "sequence":
             print("Running sequence loop only...")
             py_sequence_loop(proc_exp)
@@ -156,7 +127,7 @@ def run_batch(yaml_file: Path, seq_first: int, seq_last: int, mode: str = "both"
             print("Initializing tracker only (skipping sequence)...")
             tracker = py_trackcorr_init(proc_exp)
             print("Running tracking only...")
-            tracker.full_forward()
+            run_tracker(tracker)
         else:
             raise ProcessingError(f"Unknown mode: {mode}. Use 'both', 'sequence', or 'tracking'.")
 
@@ -254,7 +225,6 @@ def parse_command_line_args() -> tuple[Path, int, int]:
     args = parser.parse_args()
 
     yaml_file = Path(args.yaml_file).resolve()
-    from pyptv.parameter_manager import ParameterManager
     pm = ParameterManager()
     pm.from_yaml(yaml_file)
 
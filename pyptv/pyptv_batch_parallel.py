@@ -28,11 +28,16 @@ import os
 import sys
 import time
 import multiprocessing
+import tempfile
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Union, List, Tuple
 
-from pyptv.ptv import py_start_proc_c, py_sequence_loop, generate_short_file_bases
-from pyptv.experiment import Experiment
+from pyptv.highpass import share_cpus
+from pyptv.instrumentation import JsonlSink, metrics, read_jsonl
+from pyptv.profiling import profiled
+from pyptv.ptv import py_sequence_loop
+from pyptv.parameter_cache import ParameterBundle, compile_parameters
+from pyptv.processing import start_processing
 
 # Configure logging
 logging.basicConfig(
@@ -49,13 +54,29 @@ class ProcessingError(Exception):
 
 # AttrDict removed - using direct dictionary access with Experiment object
 
-def run_sequence_chunk(yaml_file: Union[str, Path], seq_first: int, seq_last: int) -> Tuple[int, int]:
+def run_sequence_chunk(
+    yaml_file: Union[str, Path],
+    seq_first: int,
+    seq_last: int,
+    bundle: ParameterBundle = None,
+    metrics_path: Union[str, Path, None] = None,
+    profile_path: Union[str, Path, None] = None,
+    track_memory: bool = False,
+) -> Tuple[int, int]:
     """Run sequence processing for a chunk of frames in a separate process.
     
     Args:
         yaml_file: Path to the YAML parameter file
         seq_first: First frame number in the chunk
         seq_last: Last frame number in the chunk
+        bundle: Pre-compiled parameters from the parent process; when given,
+            the YAML file is not parsed again in the worker
+        metrics_path: If given, stage timings of this chunk are written to
+            this JSON-lines file
+        profile_path: If given, the chunk is run under cProfile and the
+            statistics are written to this .pstats file
+        track_memory: Add peak memory and RSS figures to the stage timings
+            of this chunk (only with metrics_path)
         
     Returns:
         Tuple of (seq_first, seq_last) indicating the processed range
@@ -64,7 +85,14 @@ def run_sequence_chunk(yaml_file: Union[str, Path], seq_first: int, seq_last: in
         ProcessingError: If processing fails
     """
     logger.info(f"Worker process starting: frames {seq_first} to {seq_last}")
-    
+
+    # a forked worker inherits the parent's metrics sinks; never write to them
+    metrics.detach()
+    if metrics_path is not None:
+        metrics.enable(
+            JsonlSink(metrics_path), memory=track_memory, chunk=f"{seq_first}-{seq_last}"
+        )
+
     try:
         yaml_file = Path(yaml_file).resolve()
         exp_path = yaml_file.parent
@@ -75,42 +103,14 @@ def run_sequence_chunk(yaml_file: Union[str, Path], seq_first: int, seq_last: in
         # Change to experiment directory
         os.chdir(exp_path)
         
-        # Create experiment and load YAML parameters
-        experiment = Experiment()
-        
-        # Load parameters from YAML file
-        experiment.pm.from_yaml(yaml_file)
-        
-        # Initialize processing parameters using the experiment
-        cpar, spar, vpar, track_par, tpar, cals, epar = py_start_proc_c(experiment.pm)
-        
-        # Set sequence parameters
-        spar.set_first(seq_first)
-        spar.set_last(seq_last)
-        
-        # Create a simple object to hold processing parameters for ptv.py functions
-        class ProcessingExperiment:
-            def __init__(self, experiment, cpar, spar, vpar, track_par, tpar, cals, epar):
-                self.pm = experiment.pm
-                self.cpar = cpar
-                self.spar = spar
-                self.vpar = vpar
-                self.track_par = track_par
-                self.tpar = tpar
-                self.cals = cals
-                self.epar = epar
-                self.num_cams = experiment.pm.num_cams
-                self.detections = []
-                self.corrected = []
-        
-        proc_exp = ProcessingExperiment(experiment, cpar, spar, vpar, track_par, tpar, cals, epar)
-        
-        
-        # Centralized: get target_filenames from ParameterManager
-        proc_exp.target_filenames = experiment.pm.get_target_filenames()
+        # Initialize processing parameters; the bundle skips YAML parsing
+        with profiled(profile_path):
+            proc_exp = start_processing(
+                bundle if bundle is not None else yaml_file, seq_first, seq_last
+            )
 
-        # Run sequence processing
-        py_sequence_loop(proc_exp)
+            # Run sequence processing
+            py_sequence_loop(proc_exp)
         
         # Only run sequence processing in parallel batch
         logger.info(f"Worker process completed: frames {seq_first} to {seq_last}")
@@ -121,6 +121,7 @@ def run_sequence_chunk(yaml_file: Union[str, Path], seq_first: int, seq_last: in
         logger.error(error_msg)
         raise ProcessingError(error_msg)
     finally:
+        metrics.disable()
         # Restore original working directory
         if 'original_cwd' in locals():
             os.chdir(original_cwd)
@@ -250,7 +251,8 @@ def main(
     first: Union[str, int],
     last: Union[str, int],
     n_processes: int = 2,
-    mode: str = "both"
+    mode: str = "both",
+    profile_dir: Union[str, Path, None] = None,
 ) -> None:
     """Run PyPTV parallel batch processing with modular mode support.
     
@@ -260,6 +262,8 @@ def main(
         last: Last frame number in the sequence
         n_processes: Number of parallel processes to use
         mode: Which steps to run: 'both', 'sequence', or 'tracking'
+        profile_dir: If given, every worker and the tracking step write a
+            .pstats file into this directory
     Raises:
         ProcessingError: If processing fails
         ValueError: If parameters are invalid
@@ -307,10 +311,27 @@ def main(
             logger.info(f"Frame chunks: {ranges}")
             successful_chunks = 0
             failed_chunks = 0
-            with ProcessPoolExecutor(max_workers=n_processes) as executor:
+            # Parse and validate the parameters once; workers get the bundle
+            bundle = compile_parameters(yaml_file)
+            # Workers record stage timings to their own files when the
+            # parent has instrumentation enabled; they are merged below
+            metrics_dir = tempfile.TemporaryDirectory() if metrics.enabled else None
+            chunk_metrics = [
+                Path(metrics_dir.name) / f"chunk_{chunk_first}.jsonl" if metrics_dir else None
+                for chunk_first, _ in ranges
+            ]
+            # the workers split the CPUs for their highpass threads
+            with ProcessPoolExecutor(
+                max_workers=n_processes, initializer=share_cpus, initargs=(n_processes,)
+            ) as executor:
                 future_to_range = {
-                    executor.submit(run_sequence_chunk, yaml_file, chunk_first, chunk_last): (chunk_first, chunk_last)
-                    for chunk_first, chunk_last in ranges
+                    executor.submit(
+                        run_sequence_chunk, yaml_file, chunk_first, chunk_last, bundle, chunk_path,
+                        Path(profile_dir) / f"worker_{chunk_first}-{chunk_last}.pstats"
+                        if profile_dir else None,
+                        metrics.memory,
+                    ): (chunk_first, chunk_last)
+                    for (chunk_first, chunk_last), chunk_path in zip(ranges, chunk_metrics)
                 }
                 for future in as_completed(future_to_range):
                     chunk_range = future_to_range[future]
@@ -321,6 +342,11 @@ def main(
                     except Exception as e:
                         logger.error(f"✗ Failed chunk: frames {chunk_range[0]} to {chunk_range[1]} - {e}")
                         failed_chunks += 1
+            if metrics_dir is not None:
+                for path in chunk_metrics:
+                    if path.exists():
+                        metrics.ingest(read_jsonl(path))
+                metrics_dir.cleanup()
             total_chunks = len(ranges)
             elapsed_time = time.time() - start_time
             logger.info("Parallel sequence processing completed:")
@@ -335,7 +361,8 @@ def main(
             logger.info("Starting tracking step (serial, not parallelized)")
             try:
                 from pyptv.pyptv_batch import run_batch
-                run_batch(yaml_file, seq_first, seq_last, mode="tracking")
+                with profiled(Path(profile_dir) / "tracking.pstats" if profile_dir else None):
+                    run_batch(yaml_file, seq_first, seq_last, mode="tracking")
                 logger.info("Tracking step completed successfully.")
             except Exception as e:
                 logger.error(f"Tracking step failed: {e}")
@@ -13,17 +13,16 @@ import sys
 import json
 import importlib
 
-from pyptv.ptv import generate_short_file_bases, py_start_proc_c
-from pyptv.experiment import Experiment
+from pyptv.parameter_manager import ParameterManager
+from pyptv.processing import start_processing
 
 
 def load_plugins_config(exp_path: Path):
     """Load available plugins from experiment parameters (YAML) with fallback to plugins.json"""
-    from pyptv.experiment import Experiment
     try:
-        experiment = Experiment()
-        experiment.pm.from_yaml(exp_path)  # Corrected to use exp_path
-        plugins_params = experiment.pm.parameters.get('plugins', None)
+        pm = ParameterManager()
+        pm.from_yaml(exp_path)  # Corrected to use exp_path
+        plugins_params = pm.parameters.get('plugins', None)
         if plugins_params is not None:
             return {
                 "tracking": plugins_params.get('available_tracking', ['default']),
@@ -45,32 +44,10 @@ def run_batch(yaml_file: Path, seq_first: int, seq_last: int,
     original_cwd = Path.cwd()
     exp_path = yaml_file.parent
     os.chdir(exp_path)
-    experiment = Experiment()
-    experiment.pm.from_yaml(yaml_file)
-    print(f"Processing frames {seq_first}-{seq_last} with {experiment.pm.num_cams} cameras")
+    exp_config = start_processing(yaml_file, seq_first, seq_last)
+    print(f"Processing frames {seq_first}-{seq_last} with {exp_config.num_cams} cameras")
     print(f"Using plugins: tracking={tracking_plugin}, sequence={sequence_plugin}")
     print(f"Mode: {mode}")
-    cpar, spar, vpar, track_par, tpar, cals, epar = py_start_proc_c(experiment.pm)
-    spar.set_first(seq_first)
-    spar.set_last(seq_last)
-    class ProcessingExperiment:
-        def __init__(self, experiment, cpar, spar, vpar, track_par, tpar, cals, epar):
-            self.pm = experiment.pm
-            self.cpar = cpar
-            self.spar = spar
-            self.vpar = vpar
-            self.track_par = track_par
-            self.tpar = tpar
-            self.cals = cals
-            self.epar = epar
-            self.num_cams = experiment.pm.num_cams
-            self.exp_path = str(exp_path.absolute())
-            self.detections = []
-            self.corrected = []
-    exp_config = ProcessingExperiment(experiment, cpar, spar, vpar, track_par, tpar, cals, epar)
-
-    # Centralized: get target_filenames from ParameterManager
-    exp_config.target_filenames = experiment.pm.get_target_filenames()
 
     plugins_dir = Path.cwd() / "plugins"
     print(f"[DEBUG] Plugins directory: {plugins_dir}")
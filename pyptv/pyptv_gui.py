@@ -18,6 +18,8 @@ from skimage.util import img_as_ubyte
 from skimage.io import imread
 from skimage.color import rgb2gray
 from pyptv.experiment import Experiment, Paramset
+from pyptv.background import background_path, subtract_background
+from pyptv.frame_source import DEFAULT_SPLITTER_ORDER, open_frame_source
 from pyptv.quiverplot import QuiverPlot
 from pyptv.detection_gui import DetectionGUI
 from pyptv.mask_gui import MaskGUI
@@ -629,12 +631,12 @@ class TreeMenuHandler(Handler):
             print("Subtracting mask")
             try:
                 for i, im in enumerate(mainGui.orig_images):
-                    background_name = masking_params['mask_base_name'].replace("#", str(i))
+                    background_name = background_path(masking_params['mask_base_name'], i)
                     print(f"Subtracting {background_name}")
                     background = imread(background_name)
-                    mainGui.orig_images[i] = np.clip(
-                        mainGui.orig_images[i] - background, 0, 255
-                    ).astype(np.uint8)
+                    mainGui.orig_images[i] = subtract_background(
+                        mainGui.orig_images[i], background
+                    )
             except ValueError as exc:
                 raise ValueError("Failed subtracting mask") from exc
 
@@ -1367,37 +1369,33 @@ class MainGUI(HasTraits):
         ptv_params = self.get_parameter('ptv')
         h_img = ptv_params['imx'] # type: ignore
         v_img = ptv_params['imy'] # type: ignore
+        seq_params = dict(self.get_parameter('sequence'), base_name=base_names)
 
-        if ptv_params.get('splitter', False):
-            temp_img = img_as_ubyte(np.zeros((v_img*2, h_img*2)))
-            for seq in range(seq_first, seq_last):
-                imname = Path(base_names[0] % seq) # type: ignore
-                if imname.exists():
-                    _ = imread(imname)
-                    if _.ndim > 2:
-                        _ = rgb2gray(_)
-                    temp_img = np.max([temp_img, _], axis=0)
-
-            list_of_images = ptv.image_split(temp_img)
-            for cam_id in range(self.num_cams):
-                self.camera_list[cam_id].update_image(img_as_ubyte(list_of_images[cam_id])) # type: ignore
-        else: 
-            for cam_id in range(self.num_cams):
-                temp_img = img_as_ubyte(np.zeros((v_img, h_img)))
+        with open_frame_source(seq_params, len(base_names)) as source:
+            if ptv_params.get('splitter', False):
+                temp_img = img_as_ubyte(np.zeros((v_img*2, h_img*2)))
                 for seq in range(seq_first, seq_last):
-                    base_name = base_names[cam_id]
-                    if base_name in ("--", "---", None):
-                        continue
-                    if "%" in base_name:
-                        imname = Path(base_name % seq)
-                    else:
-                        imname = Path(base_name)
-                    if imname.exists():
-                        _ = imread(imname)
+                    if source.has_frame(0, seq):
+                        _ = source.read(0, seq)
                         if _.ndim > 2:
                             _ = rgb2gray(_)
                         temp_img = np.max([temp_img, _], axis=0)
-                self.camera_list[cam_id].update_image(temp_img) # type: ignore
+
+                list_of_images = ptv.image_split(
+                    temp_img, ptv_params.get('splitter_order', DEFAULT_SPLITTER_ORDER)
+                )
+                for cam_id in range(self.num_cams):
+                    self.camera_list[cam_id].update_image(img_as_ubyte(list_of_images[cam_id])) # type: ignore
+            else:
+                for cam_id in range(self.num_cams):
+                    temp_img = img_as_ubyte(np.zeros((v_img, h_img)))
+                    for seq in range(seq_first, seq_last):
+                        if source.has_frame(cam_id, seq):
+                            _ = source.read(cam_id, seq)
+                            if _.ndim > 2:
+                                _ = rgb2gray(_)
+                            temp_img = np.max([temp_img, _], axis=0)
+                    self.camera_list[cam_id].update_image(temp_img) # type: ignore
 
     def load_disp_image(self, img_name: str, j: int, display_only: bool = False):
         """Load and display single image"""
@@ -1423,26 +1421,21 @@ class MainGUI(HasTraits):
             print("No sequence parameters found")
             return
             
-        base_names = seq_params['base_name']
         ptv_params = self.get_parameter('ptv')
-        
-        if ptv_params.get('splitter', False):
-            # Splitter mode - load one image and split it
-            imname = base_names[0] % seq_num
-            if Path(imname).exists():
-                temp_img = imread(imname)
-                if temp_img.ndim > 2:
-                    temp_img = rgb2gray(temp_img)
-                splitted_images = ptv.image_split(temp_img)
-                for i in range(self.num_cams):
-                    self.camera_list[i].update_image(img_as_ubyte(splitted_images[i]))
-            else:
-                print(f"Image {imname} does not exist")
-        else:
-            # Normal mode - load separate images for each camera
+        # in splitter mode the source hands out the views of the composite image
+        with open_frame_source(seq_params, self.num_cams, ptv_params) as source:
             for i in range(self.num_cams):
-                imname = base_names[i] % seq_num
-                self.load_disp_image(imname, i, display_only)
+                try:
+                    temp_img = source.read(i, seq_num)
+                    if temp_img.ndim > 2:
+                        temp_img = rgb2gray(temp_img)
+                    temp_img = img_as_ubyte(temp_img)
+                except IOError:
+                    print(f"Error reading {source.name(i, seq_num)}, setting zero image")
+                    temp_img = img_as_ubyte(
+                        np.zeros((ptv_params['imy'], ptv_params['imx']))
+                    )
+                self.camera_list[i].update_image(temp_img)
 
     def save_parameters(self):
         """Save current parameters to YAML"""
@@ -12,7 +12,6 @@ from typing import Sequence
 import numpy as np
 
 from optv.calibration import Calibration
-from optv.orientation import external_calibration, full_calibration
 from optv.tracking_framebuf import TargetArray
 
 from pyptv.parameter_manager import ParameterManager
@@ -142,7 +141,7 @@ def _load_or_init_calibration(ori_path: Path) -> Calibration:
     addpar_path = Path(str(ori_path).replace(".ori", ".addpar"))
 
     if ori_path.exists() and addpar_path.exists():
-        cal.from_file(str(ori_path), str(addpar_path))
+        cal = ptv.read_calibration(ori_path, addpar_path)
 
     return cal
 
@@ -156,8 +155,13 @@ def run_standalone_calibration(
     flags: Sequence[str],
     init_external: str | None = "first4",
     write: bool = False,
+    n_workers: int | None = None,
 ) -> list[Calibration]:
-    """Run calibration for all cameras and (optionally) write .ori/.addpar."""
+    """Run calibration for all cameras and (optionally) write .ori/.addpar.
+
+    Cameras are calibrated in up to n_workers processes (None = one per
+    camera, limited to the CPU count; 1 = serial).
+    """
 
     pm = load_parameter_manager(yaml_path)
     params = pm.parameters
@@ -171,37 +175,44 @@ def run_standalone_calibration(
     if num_cams != xy.shape[0]:
         raise ValueError(f"num_cams ({num_cams}) != xy.shape[0] ({xy.shape[0]})")
 
-    # Build ControlParams (cpar) from YAML
-    cpar, *_rest = ptv.py_start_proc_c(pm)
-
     ori_files = cal_ori.get("img_ori")
     if not ori_files or len(ori_files) < num_cams:
         raise ValueError("cal_ori.img_ori must list one .ori path per camera")
 
+    ori_paths: list[Path] = []
     calibrations: list[Calibration] = []
+    tasks = []
 
     for cam in range(num_cams):
         ori_path = (yaml_path.parent / ori_files[cam]).resolve() if not Path(ori_files[cam]).is_absolute() else Path(ori_files[cam])
         cal = _load_or_init_calibration(ori_path)
+        ori_paths.append(ori_path)
+        calibrations.append(cal)
 
-        targs = targets_from_xy(xy[cam], pnr)
-
+        task = {
+            "cam": cam,
+            "mode": "fine",
+            "cal": cal,
+            "xyz": np.asarray(xyz, dtype=float),
+            "xy": np.asarray(xy[cam], dtype=float),
+            "pnr": np.asarray(pnr, dtype=int),
+            "flags": list(flags),
+        }
         if init_external is not None:
             idx4 = _select_four_indices(init_external, len(pnr))
-            sel_xyz = np.asarray(xyz[pnr[idx4]], dtype=float)
-            sel_xy = np.asarray(xy[cam][idx4], dtype=float)
-
-            ok = external_calibration(cal, sel_xyz, sel_xy, cpar)
-            if ok is False:
-                raise RuntimeError(f"external_calibration failed for camera {cam}")
-
-        residuals, targ_ix, err_est = full_calibration(
-            cal,
-            np.asarray(xyz, dtype=float),
-            targs,
-            cpar,
-            list(flags),
-        )
+            task["init_xyz"] = np.asarray(xyz[pnr[idx4]], dtype=float)
+            task["init_xy"] = np.asarray(xy[cam][idx4], dtype=float)
+        tasks.append(task)
+
+    # Cameras are independent; solve them in parallel and write each one
+    # as soon as it is done.
+    for result in ptv.orient_cameras(tasks, ptv_params, num_cams, n_workers=n_workers):
+        cam = result["cam"]
+        if not result["success"]:
+            raise RuntimeError(f"external_calibration failed for camera {cam}")
+
+        cal = calibrations[cam]
+        ptv.update_calibration_from_dict(cal, result["cal"])
 
         packed = np.array(
             [
@@ -216,11 +227,10 @@ def run_standalone_calibration(
         if np.any(np.isnan(np.hstack(packed))):
             raise ValueError(f"Calibration for camera {cam} contains NaNs")
 
-        calibrations.append(cal)
-
         if write:
+            ori_path = ori_paths[cam]
             addpar_path = Path(str(ori_path).replace(".ori", ".addpar"))
             ori_path.parent.mkdir(parents=True, exist_ok=True)
-            cal.write(str(ori_path).encode(), str(addpar_path).encode())
+            ptv.write_calibration(cal, ori_path, addpar_path)
 
     return calibrations
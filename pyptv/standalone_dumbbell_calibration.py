@@ -25,7 +25,6 @@ from pathlib import Path
 from typing import Iterable, Sequence
 
 import numpy as np
-from scipy.optimize import least_squares
 
 from optv.transforms import convert_arr_pixel_to_metric
 
@@ -41,6 +40,9 @@ class DumbbellResult:
     fun_final: float
     n_frames_used: int
     n_frames_total: int
+    n_frames_selected: int
+    frame_selection: dict | None = None
+    multistart: dict | None = None
 
 
 def _load_pm(yaml_path: Path) -> ParameterManager:
@@ -115,6 +117,12 @@ def run_dumbbell_calibration(
     fixed_cams: Sequence[int] = (),
     maxiter: int = 1000,
     write: bool = True,
+    frame_budget: int | None = None,
+    refine_all: bool | None = None,
+    n_starts: int | None = None,
+    n_workers: int | None = None,
+    start_time_budget: float | None = None,
+    seed: int = 0,
 ) -> DumbbellResult:
     """Run dumbbell calibration end-to-end.
 
@@ -124,6 +132,20 @@ def run_dumbbell_calibration(
         fixed_cams: 0-based camera indices to keep fixed (not optimized).
         maxiter: SciPy `least_squares` max function evaluations
         write: write `.ori/.addpar` outputs
+        frame_budget: optimize on at most this many frames, chosen by
+            `ptv.select_dumbbell_frames` for volume/orientation coverage.
+            If None, uses dumbbell.dumbbell_frame_budget; 0 uses all frames.
+        refine_all: after solving on the selected frames, refine once more on
+            all valid frames. If None, uses dumbbell.dumbbell_refine_all.
+        n_starts: number of starts for `ptv.dumbbell_multistart`; start 0 is the
+            current calibration, the others perturb the active extrinsics.
+            If None, uses dumbbell.dumbbell_starts (default 1, single chain).
+        n_workers: worker processes for the starts (0/None = one per start,
+            capped at the CPU count). If None, uses dumbbell.dumbbell_workers.
+        start_time_budget: seconds allowed per start; the best point reached
+            so far is kept when it runs out. If None, uses
+            dumbbell.dumbbell_start_time_budget (0 = unlimited).
+        seed: random seed for the start perturbations.
 
     Returns:
         DumbbellResult summary
@@ -235,6 +257,12 @@ def run_dumbbell_calibration(
         print(f"{label} per-camera RMS (metric): {rms.tolist()}")
 
     per_frame_metric = all_targs_metric.reshape(num_cams, n_used, 2, 2)
+    all_frames_metric = per_frame_metric
+
+    if frame_budget is None:
+        frame_budget = int(dumbbell.get("dumbbell_frame_budget") or 0)
+    if refine_all is None:
+        refine_all = bool(dumbbell.get("dumbbell_refine_all", False))
 
     # Active cams mask
     active = np.ones(num_cams, dtype=bool)
@@ -261,32 +289,30 @@ def run_dumbbell_calibration(
         calib_vec[ptr, 1] = cals[cam].get_angles()
         ptr += 1
 
-    def _init_dumbbell_points(metric_targets: np.ndarray) -> np.ndarray:
-        from optv.orientation import multi_cam_point_positions
-
-        num_cams_local, num_frames_local, _, _ = metric_targets.shape
-        points = np.zeros((num_frames_local, 2, 3), dtype=float)
-
-        for frame_idx in range(num_frames_local):
-            frame_targets = metric_targets[:, frame_idx, :, :]
-            xyz1, _err1 = multi_cam_point_positions(
-                frame_targets[:, 0, :][np.newaxis], cpar, cals
-            )
-            xyz2, _err2 = multi_cam_point_positions(
-                frame_targets[:, 1, :][np.newaxis], cpar, cals
-            )
-            points[frame_idx, 0] = xyz1[0]
-            points[frame_idx, 1] = xyz2[0]
+    points_all = ptv.dumbbell_triangulate_endpoints(all_frames_metric, cpar, cals)
+    x0_all = np.concatenate([calib_vec.reshape(-1), points_all.reshape(-1)])
 
-        return points
+    selection = None
+    if 0 < frame_budget < n_used:
+        selected, selection = ptv.select_dumbbell_frames(points_all, frame_budget)
+        print(
+            f"Selected {selection['n_selected']} of {selection['n_candidates']} frame(s) "
+            f"covering {selection['voxels_covered']}/{selection['voxels_occupied']} voxels and "
+            f"{selection['cells_covered']}/{selection['cells_occupied']} voxel/orientation cells"
+        )
+        per_frame_metric = all_frames_metric[:, selected, :, :]
+        points_init = points_all[selected]
+    else:
+        points_init = points_all
+    n_selected = int(per_frame_metric.shape[1])
+    refine = bool(refine_all) and n_selected < n_used
 
-    points_init = _init_dumbbell_points(per_frame_metric)
     x0 = np.concatenate([calib_vec.reshape(-1), points_init.reshape(-1)])
 
-    def residuals(x: np.ndarray) -> np.ndarray:
-        return ptv.dumbbell_ba_residuals(
+    def cost(x: np.ndarray, metric_targets: np.ndarray) -> float:
+        residuals = ptv.dumbbell_ba_residuals(
             x,
-            per_frame_metric,
+            metric_targets,
             cpar,
             cals,
             active,
@@ -294,74 +320,79 @@ def run_dumbbell_calibration(
             float(db_weight),
             pos_scale,
         )
+        return float(np.sum(residuals**2))
 
-    initial_residuals = residuals(x0)
-    fun_initial = float(np.sum(initial_residuals**2))
+    # Report the initial cost on the frame set the final solution is fitted to
+    if refine:
+        fun_initial = cost(x0_all, all_frames_metric)
+    else:
+        fun_initial = cost(x0, per_frame_metric)
     _print_camera_residuals("Initial", per_frame_metric)
 
-    method = "trf"
-    loss = "soft_l1"
-    print(f"Using least_squares method={method} loss={loss}")
-
-    tol_steps = [
-        (1e-6, 1e-6, 1e-5),
-        (1e-5, 1e-5, 1e-4),
-        (1e-4, 1e-4, 1e-3),
-    ]
-    max_rounds = 3
-    nfev_per_round = max(1, int(maxiter) // max_rounds)
-    min_improvement = 1e-3
-
-    best_x = x0
-    best_fun = float(np.sum(initial_residuals**2))
-    res = None
-
-    jac_sparsity = ptv.dumbbell_ba_jac_sparsity(
-        per_frame_metric,
-        active,
-        float(db_weight),
-    )
-
-    for idx in range(max_rounds):
-        xtol, ftol, gtol = tol_steps[min(idx, len(tol_steps) - 1)]
-        res = least_squares(
-            residuals,
-            best_x,
-            xtol=xtol,
-            ftol=ftol,
-            gtol=gtol,
-            jac_sparsity=jac_sparsity,
-            x_scale="jac",
-            max_nfev=nfev_per_round,
-            loss=loss,
-            f_scale=1.0,
-            verbose=2,
-            method=method,
+    nfev_per_round = max(1, int(maxiter) // 3)
+    if n_starts is None:
+        n_starts = int(dumbbell.get("dumbbell_starts") or 1)
+    if n_workers is None:
+        n_workers = int(dumbbell.get("dumbbell_workers") or 0)
+    if start_time_budget is None:
+        start_time_budget = float(dumbbell.get("dumbbell_start_time_budget") or 0) or None
+
+    multistart = None
+    if n_starts > 1:
+        best, multistart = ptv.dumbbell_multistart(
+            calib_vec.reshape(-1),
+            per_frame_metric,
+            pm.get_parameter("ptv"),
+            cals,
+            active,
+            float(db_length),
+            float(db_weight),
+            pos_scale,
+            n_starts=n_starts,
+            n_workers=n_workers,
+            time_budget=start_time_budget,
+            seed=seed,
+            nfev_per_round=nfev_per_round,
         )
-        new_fun = float(np.sum(res.fun**2))
-        improvement = (best_fun - new_fun) / max(best_fun, 1e-12)
-        print(
-            f"Adaptive round {idx + 1}: fun={new_fun:.6g} improvement={improvement:.3g} "
-            f"xtol={xtol} ftol={ftol} gtol={gtol}"
+        ptv.print_multistart_report(multistart)
+        best_x = best["x"]
+        best_fun = cost(best_x, per_frame_metric)
+        success, message = best["success"], best["message"]
+    else:
+        res, best_x, best_fun = ptv.dumbbell_adaptive_solve(
+            x0,
+            per_frame_metric,
+            cpar,
+            cals,
+            active,
+            float(db_length),
+            float(db_weight),
+            pos_scale,
+            nfev_per_round=nfev_per_round,
         )
-        best_x = res.x
-        best_fun = new_fun
-        if improvement < min_improvement:
-            break
+        success, message = res.success, res.message
 
-    if res is None:
-        raise RuntimeError("Adaptive least_squares did not run")
+    cam_params_len = num_active * 6
+    if refine:
+        ptv.set_active_extrinsics(best_x[:cam_params_len], cals, active, pos_scale)
+        per_frame_metric = all_frames_metric
+        points_all = ptv.dumbbell_triangulate_endpoints(per_frame_metric, cpar, cals)
+        print(f"Refining on all {n_used} frame(s)")
+        res, best_x, best_fun = ptv.dumbbell_adaptive_solve(
+            np.concatenate([best_x[:cam_params_len], points_all.reshape(-1)]),
+            per_frame_metric,
+            cpar,
+            cals,
+            active,
+            float(db_length),
+            float(db_weight),
+            pos_scale,
+            nfev_per_round=nfev_per_round,
+        )
+        success, message = res.success, res.message
 
     # Apply solution back to calibration objects
-    cam_params_len = num_active * 6
-    calib_pars = np.asarray(best_x[:cam_params_len], dtype=float).reshape(-1, 2, 3)
-    ptr = 0
-    for cam in range(num_cams):
-        if not active[cam]:
-            continue
-        cals[cam].set_pos(calib_pars[ptr, 0] * pos_scale)
-        cals[cam].set_angles(calib_pars[ptr, 1])
-        ptr += 1
+    ptv.set_active_extrinsics(best_x[:cam_params_len], cals, active, pos_scale)
 
     if write:
         cal_ori = pm.get_parameter("cal_ori")
@@ -374,20 +405,23 @@ def run_dumbbell_calibration(
                     ori_path = (yaml_path.parent / ori_path).resolve()
                 addpar_path = Path(str(ori_path).replace(".ori", ".addpar"))
                 ori_path.parent.mkdir(parents=True, exist_ok=True)
-                cals[cam].write(str(ori_path).encode("utf-8"), str(addpar_path).encode("utf-8"))
+                ptv.write_calibration(cals[cam], ori_path, addpar_path)
             else:
                 # Fallback: use cpar's calibration base
                 base = cpar.get_cal_img_base_name(cam)
-                cals[cam].write(f"{base}.ori".encode("utf-8"), f"{base}.addpar".encode("utf-8"))
+                ptv.write_calibration(cals[cam], f"{base}.ori", f"{base}.addpar")
 
     fun_final = float(best_fun)
     _print_camera_residuals("Final", per_frame_metric)
 
     return DumbbellResult(
-        success=bool(res.success),
-        message=str(res.message),
+        success=bool(success),
+        message=str(message),
         fun_initial=fun_initial,
         fun_final=fun_final,
         n_frames_used=n_used,
         n_frames_total=n_total,
+        n_frames_selected=n_selected,
+        frame_selection=selection,
+        multistart=multistart,
     )
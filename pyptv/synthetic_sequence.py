@@ -0,0 +1,569 @@
+"""Synthetic particle-image sequences for scaling and regression tests.
+
+Particles are advected through the observation volume by a simple analytic
+flow, projected through the experiment's calibrations and rendered as
+Gaussian spots into the image files named by ``sequence.base_name``. The
+ground truth (3D trajectories, particle ids and pixel positions per camera)
+is saved next to the images as ``ground_truth.npz``.
+
+:func:`generate_tracking_data` skips the images and writes the per-camera
+``_targets`` files and ``res/rt_is.*`` of the same kind of trajectories
+directly, with controlled noise, dropout and ghosts, for tracker-only
+benchmarks; :func:`score_tracking` scores the tracker output against it.
+
+Design goals
+- Headless and deterministic (seeded)
+- Fast enough for 10k-100k particles per frame (vectorised splatting)
+- Same projection model as :mod:`pyptv.ground_truth`
+
+Example::
+
+    from pyptv.synthetic_sequence import ParticleSequenceSpec, render_particle_sequence
+
+    render_particle_sequence(
+        "parameters_Run1.yaml",
+        ParticleSequenceSpec(n_particles=20_000, flow="vortex", first=1, last=10),
+    )
+"""
+
+from __future__ import annotations
+
+import os
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from optv.imgcoord import image_coordinates
+from optv.transforms import convert_arr_metric_to_pixel
+
+from pyptv.parameter_manager import ParameterManager
+from pyptv import ptv
+
+IMAGE_EXTENSIONS = {".tif", ".tiff", ".png", ".bmp", ".jpg", ".jpeg"}
+GROUND_TRUTH_NAME = "ground_truth.npz"
+
+
+@dataclass(frozen=True)
+class ParticleSequenceSpec:
+    n_particles: int = 1000
+    first: Optional[int] = None  # default: sequence.first
+    last: Optional[int] = None  # default: sequence.last
+    flow: str = "vortex"
+    speed: float = 0.5  # largest displacement per frame, mm
+    volume: Optional[tuple] = None  # ((xmin, xmax), (ymin, ymax), (zmin, zmax)), mm
+    sigma_px: float = 1.0  # Gaussian spot radius
+    peak: float = 200.0  # brightest particle, grey values
+    background: float = 5.0
+    noise_sigma: float = 2.0
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class Trajectories:
+    frames: np.ndarray  # (F,)
+    xyz: np.ndarray  # (F,N,3)
+    ids: np.ndarray  # (F,N) particle id; a particle leaving the volume is re-seeded with a new id
+
+
+def _uniform(xyz, center, half):
+    v = np.zeros_like(xyz)
+    v[:, 0] = 1.0
+    return v
+
+
+def _vortex(xyz, center, half):
+    # solid-body rotation about the z axis through the volume center
+    r = xyz - center
+    v = np.zeros_like(xyz)
+    v[:, 0] = -r[:, 1]
+    v[:, 1] = r[:, 0]
+    return v / max(half[0], half[1])
+
+
+def _shear(xyz, center, half):
+    v = np.zeros_like(xyz)
+    v[:, 0] = (xyz[:, 2] - center[2]) / half[2]
+    return v
+
+
+def _abc(xyz, center, half):
+    # Arnold-Beltrami-Childress flow with A = B = C = 1, one period per volume
+    k = np.pi / half
+    x, y, z = ((xyz - center) * k).T
+    v = np.stack(
+        [np.sin(z) + np.cos(y), np.sin(x) + np.cos(z), np.sin(y) + np.cos(x)], axis=1
+    )
+    return v / 2.0
+
+
+FLOWS = {"uniform": _uniform, "vortex": _vortex, "shear": _shear, "abc": _abc}
+
+
+def observation_volume(pm: ParameterManager) -> tuple:
+    """Volume spanned by the criteria section (X_lay, Zmin_lay, Zmax_lay).
+
+    Y uses the X range, as the criteria only bound X and Z.
+    """
+    crit = pm.get_parameter("criteria")
+    x = (float(min(crit["X_lay"])), float(max(crit["X_lay"])))
+    z = (float(max(crit["Zmin_lay"])), float(min(crit["Zmax_lay"])))
+    return (x, x, z)
+
+
+def simulate_trajectories(
+    n_particles: int,
+    frames,
+    volume: tuple,
+    flow: str = "vortex",
+    speed: float = 0.5,
+    seed: int = 0,
+) -> Trajectories:
+    """Advect ``n_particles`` through ``volume`` with a midpoint (RK2) step per frame."""
+    if flow not in FLOWS:
+        raise ValueError(f"Unknown flow {flow!r}; choose from {sorted(FLOWS)}")
+    if n_particles <= 0:
+        raise ValueError("n_particles must be > 0")
+    velocity = FLOWS[flow]
+    frames = np.asarray(list(frames), dtype=int)
+    lo = np.array([v[0] for v in volume], dtype=float)
+    hi = np.array([v[1] for v in volume], dtype=float)
+    center = (lo + hi) / 2
+    half = (hi - lo) / 2
+
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(lo, hi, size=(n_particles, 3))
+    ids = np.arange(n_particles)
+    next_id = n_particles
+
+    xyz = np.empty((len(frames), n_particles, 3))
+    all_ids = np.empty((len(frames), n_particles), dtype=np.int64)
+    for i in range(len(frames)):
+        xyz[i] = pos
+        all_ids[i] = ids
+        mid = pos + 0.5 * speed * velocity(pos, center, half)
+        pos = pos + speed * velocity(mid, center, half)
+        outside = np.any((pos < lo) | (pos > hi), axis=1)
+        n_out = int(outside.sum())
+        if n_out:
+            pos[outside] = rng.uniform(lo, hi, size=(n_out, 3))
+            ids = ids.copy()
+            ids[outside] = np.arange(next_id, next_id + n_out)
+            next_id += n_out
+    return Trajectories(frames=frames, xyz=xyz, ids=all_ids)
+
+
+def project_points(xyz: np.ndarray, cal, cpar) -> np.ndarray:
+    """Pixel coordinates (N,2) of world points in one camera."""
+    metric = image_coordinates(np.asarray(xyz, dtype=float), cal, cpar.get_multimedia_params())
+    return np.asarray(convert_arr_metric_to_pixel(metric, cpar), dtype=float).reshape(-1, 2)
+
+
+def render_particles(
+    xy: np.ndarray,
+    intensity: np.ndarray,
+    shape: tuple,
+    sigma_px: float = 1.0,
+    background: float = 0.0,
+    noise_sigma: float = 0.0,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """Render Gaussian spots at pixel positions ``xy`` into a uint8 image.
+
+    Pixel ``(row, col)`` covers ``[col, col + 1) x [row, row + 1)``, the
+    convention of optv's target_recognition, whose centroids of these spots
+    are therefore ``xy``. Every spot is evaluated on a (2r+1)^2 patch with
+    r = ceil(3 sigma) and accumulated with one ``np.bincount`` call per patch
+    row, so the cost is linear in the number of particles.
+    """
+    imy, imx = shape
+    # work in pixel-index space, where pixel centers are integers
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2) - 0.5
+    intensity = np.asarray(intensity, dtype=float)
+    canvas = np.full(imy * imx, float(background))
+
+    r = max(1, int(np.ceil(3 * sigma_px)))
+    offsets = np.arange(-r, r + 1)
+    for dy in offsets:
+        # one row of the patch at a time keeps the temporaries at N*(2r+1)
+        cy = np.floor(xy[:, 1] + 0.5).astype(np.int64) + dy
+        cx = np.floor(xy[:, 0] + 0.5).astype(np.int64)[:, None] + offsets[None, :]
+        cy = np.broadcast_to(cy[:, None], cx.shape)
+        w = np.exp(
+            -((cx - xy[:, :1]) ** 2 + (cy - xy[:, 1:]) ** 2) / (2 * sigma_px**2)
+        ) * intensity[:, None]
+        inside = (cx >= 0) & (cx < imx) & (cy >= 0) & (cy < imy)
+        canvas += np.bincount(
+            (cy[inside] * imx + cx[inside]), weights=w[inside], minlength=imy * imx
+        )
+
+    if noise_sigma > 0:
+        rng = rng if rng is not None else np.random.default_rng()
+        canvas += rng.normal(0.0, noise_sigma, size=canvas.shape)
+    return np.clip(canvas, 0, 255).astype(np.uint8).reshape(imy, imx)
+
+
+def _write_image(path: Path, img: np.ndarray) -> None:
+    from imageio.v3 import imwrite
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # base names such as img/cam1.%d have no image extension
+    extension = path.suffix.lower() if path.suffix.lower() in IMAGE_EXTENSIONS else ".tif"
+    imwrite(path, img, extension=extension)
+
+
+def _load_experiment(yaml_path: Path, first: Optional[int], last: Optional[int]):
+    """(ParameterManager, cpar, calibrations, (first, last)) of an experiment."""
+    pm = ParameterManager()
+    pm.from_yaml(yaml_path)
+
+    seq = pm.get_parameter("sequence")
+    first = int(seq["first"] if first is None else first)
+    last = int(seq["last"] if last is None else last)
+    if first > last:
+        raise ValueError(f"first ({first}) must be <= last ({last})")
+
+    # calibration paths in the YAML are relative to the experiment directory
+    previous = Path.cwd()
+    os.chdir(yaml_path.parent)
+    try:
+        cpar, _spar, _vpar, _track, _tpar, cals, _epar = ptv.py_start_proc_c(pm)
+    finally:
+        os.chdir(previous)
+    return pm, cpar, cals, (first, last)
+
+
+def render_particle_sequence(
+    yaml_path: Path,
+    spec: Optional[ParticleSequenceSpec] = None,
+    *,
+    out_root: Optional[Path] = None,
+) -> dict[str, object]:
+    """Render a synthetic sequence into the experiment's ``sequence.base_name`` files.
+
+    Args:
+        yaml_path: parameters YAML; calibrations and image names are
+                   resolved relative to its directory
+        spec: ParticleSequenceSpec; defaults to 1000 particles over the
+              YAML sequence range
+        out_root: optional directory the image paths are re-rooted under
+
+    Returns a small summary dict, including the ground-truth path.
+    """
+    yaml_path = Path(yaml_path).resolve()
+    spec = spec or ParticleSequenceSpec()
+    pm, cpar, cals, (first, last) = _load_experiment(yaml_path, spec.first, spec.last)
+    num_cams = len(cals)
+    imx = int(pm.get_parameter("ptv")["imx"])
+    imy = int(pm.get_parameter("ptv")["imy"])
+
+    root = Path(out_root) if out_root is not None else yaml_path.parent
+    base_names = [root / name for name in pm.get_parameter("sequence")["base_name"][:num_cams]]
+
+    volume = spec.volume or observation_volume(pm)
+    frames = range(first, last + 1)
+    traj = simulate_trajectories(
+        spec.n_particles, frames, volume, spec.flow, spec.speed, spec.seed
+    )
+    rng = np.random.default_rng(spec.seed + 1)
+    # per-particle brightness, kept when a particle is re-seeded
+    intensity = spec.peak * rng.uniform(0.5, 1.0, size=spec.n_particles)
+
+    xy = np.empty((len(traj.frames), num_cams, spec.n_particles, 2))
+    for i, frame in enumerate(traj.frames):
+        for cam in range(num_cams):
+            xy[i, cam] = project_points(traj.xyz[i], cals[cam], cpar)
+            img = render_particles(
+                xy[i, cam],
+                intensity,
+                (imy, imx),
+                sigma_px=spec.sigma_px,
+                background=spec.background,
+                noise_sigma=spec.noise_sigma,
+                rng=rng,
+            )
+            _write_image(Path(str(base_names[cam]) % frame), img)
+
+    visible = (
+        np.isfinite(xy).all(axis=-1)
+        & (xy[..., 0] >= 0) & (xy[..., 0] < imx)
+        & (xy[..., 1] >= 0) & (xy[..., 1] < imy)
+    )
+    gt_path = Path(str(base_names[0]) % first).parent / GROUND_TRUTH_NAME
+    np.savez_compressed(
+        gt_path,
+        frames=traj.frames,
+        xyz=traj.xyz,
+        ids=traj.ids,
+        xy=xy,
+        visible=visible,
+        intensity=intensity,
+    )
+    return {
+        "num_cams": num_cams,
+        "first": first,
+        "last": last,
+        "n_particles": spec.n_particles,
+        "flow": spec.flow,
+        "visible_fraction": float(visible.mean()),
+        "images": [str(b) for b in base_names],
+        "ground_truth": str(gt_path),
+    }
+
+
+def load_ground_truth(path: Path) -> dict[str, np.ndarray]:
+    """Arrays saved by :func:`render_particle_sequence` or :func:`generate_tracking_data`."""
+    with np.load(Path(path)) as data:
+        return {key: data[key] for key in data.files}
+
+
+# ------- Targets and rt_is without images ----------#
+
+TRACKING_GROUND_TRUTH_NAME = "tracking_ground_truth.npz"
+# pnr, x, y, constant pixel counts (total 9, x 3, y 3), sum of grey values
+# 1000 and tnr, in the columns of ptv.write_targets
+_TARGETS_FMT = "%4d %9.4f %9.4f     9     3     3  1000 %5d"
+_RT_IS_FMT = "%4d %9.3f %9.3f %9.3f %4d %4d %4d %4d"
+# optv's Tracker allocates this many targets per camera and frame (and
+# rt_is rows per frame) and overruns the buffers beyond it
+OPTV_MAX_TARGETS = 20000
+
+
+@dataclass(frozen=True)
+class TrackingDataSpec:
+    n_particles: int = 1000
+    first: Optional[int] = None  # default: sequence.first
+    last: Optional[int] = None  # default: sequence.last
+    flow: str = "vortex"
+    speed: float = 0.5  # largest displacement per frame, mm
+    volume: Optional[tuple] = None  # ((xmin, xmax), (ymin, ymax), (zmin, zmax)), mm
+    noise_px: float = 0.0  # Gaussian noise of target positions
+    noise_mm: float = 0.0  # Gaussian noise of rt_is positions
+    dropout: float = 0.0  # probability that a target is missing in one camera
+    ghost_rate: float = 0.0  # ghost particles per reconstructed particle
+    min_cams: int = 2  # cameras a particle needs to appear in rt_is
+    seed: int = 0
+
+
+def _write_table(path: Path, fmt: str, columns) -> None:
+    """Write a count line and one ``fmt`` line per row of ``columns``.
+
+    Formatting Python ints and floats column-wise is about twice as fast as
+    np.savetxt, which matters for files with millions of rows.
+    """
+    n = len(columns[0])
+    line = fmt + "\n"
+    with open(path, "w", encoding="utf8") as f:
+        f.write(f"{n}\n")
+        f.write("".join(map(line.__mod__, zip(*(np.asarray(c).tolist() for c in columns)))))
+
+
+def _write_targets_file(path: Path, xy: np.ndarray, tnr: np.ndarray) -> None:
+    """Targets sorted by y, in the format of ptv.write_targets."""
+    _write_table(path, _TARGETS_FMT, (np.arange(len(xy)), xy[:, 0], xy[:, 1], tnr.astype(np.int64)))
+
+
+def _write_rt_is_file(path: Path, xyz: np.ndarray, corresp: np.ndarray) -> None:
+    """rt_is file; ``corresp`` is (N, num_cams) target numbers or -1."""
+    n = len(xyz)
+    padded = np.full((n, 4), -1, dtype=np.int64)
+    padded[:, : corresp.shape[1]] = corresp
+    _write_table(
+        path, _RT_IS_FMT, (np.arange(1, n + 1), xyz[:, 0], xyz[:, 1], xyz[:, 2], *padded.T)
+    )
+
+
+def generate_tracking_data(
+    yaml_path: Path,
+    spec: Optional[TrackingDataSpec] = None,
+    *,
+    out_root: Optional[Path] = None,
+) -> dict[str, object]:
+    """Write per-camera ``_targets`` files and ``res/rt_is.*`` for known trajectories.
+
+    No images are rendered, so the cost is dominated by projection and text
+    output and stays practical at millions of particles. Per frame:
+
+    - every particle is projected into every camera; it yields a target where
+      it is inside the image and not dropped (``dropout``), with ``noise_px``
+    - particles with targets in at least ``min_cams`` cameras become rt_is
+      rows (shuffled, with ``noise_mm``) that reference their targets
+    - ``ghost_rate`` adds rt_is rows at random positions that reference the
+      target nearest to their projection in each camera, as wrong matches do
+
+    The ground truth (true particle id of every rt_is row, -1 for ghosts) is
+    saved to ``res/tracking_ground_truth.npz`` for :func:`score_tracking`.
+
+    optv's tracker handles at most :data:`OPTV_MAX_TARGETS` targets per
+    camera and frame; larger data sets are written (for other trackers) with
+    a warning.
+    """
+    from scipy.spatial import cKDTree
+
+    yaml_path = Path(yaml_path).resolve()
+    spec = spec or TrackingDataSpec()
+    pm, cpar, cals, (first, last) = _load_experiment(yaml_path, spec.first, spec.last)
+    num_cams = len(cals)
+    imx = int(pm.get_parameter("ptv")["imx"])
+    imy = int(pm.get_parameter("ptv")["imy"])
+
+    root = Path(out_root) if out_root is not None else yaml_path.parent
+    target_bases = [root / base for base in pm.get_target_filenames()]
+    res_dir = root / "res"
+    res_dir.mkdir(parents=True, exist_ok=True)
+    for base in target_bases:
+        base.parent.mkdir(parents=True, exist_ok=True)
+
+    volume = spec.volume or observation_volume(pm)
+    lo = np.array([v[0] for v in volume], dtype=float)
+    hi = np.array([v[1] for v in volume], dtype=float)
+    traj = simulate_trajectories(
+        spec.n_particles, range(first, last + 1), volume, spec.flow, spec.speed, spec.seed
+    )
+    rng = np.random.default_rng(spec.seed + 1)
+    n = spec.n_particles
+
+    row_ids = []
+    n_targets = 0
+    max_targets = 0
+    for i, frame in enumerate(traj.frames):
+        xy = np.empty((num_cams, n, 2))
+        pnr = np.full((num_cams, n), -1, dtype=np.int64)
+        for cam in range(num_cams):
+            xy[cam] = project_points(traj.xyz[i], cals[cam], cpar)
+            if spec.noise_px > 0:
+                xy[cam] += rng.normal(0.0, spec.noise_px, size=(n, 2))
+            seen = (
+                np.isfinite(xy[cam]).all(axis=1)
+                & (xy[cam, :, 0] >= 0) & (xy[cam, :, 0] < imx)
+                & (xy[cam, :, 1] >= 0) & (xy[cam, :, 1] < imy)
+            )
+            if spec.dropout > 0:
+                seen &= rng.random(n) >= spec.dropout
+            idx = np.flatnonzero(seen)
+            # targets files are sorted by y; pnr is the row in the sorted file
+            idx = idx[np.argsort(xy[cam, idx, 1], kind="stable")]
+            pnr[cam, idx] = np.arange(len(idx))
+
+        particles = np.flatnonzero((pnr >= 0).sum(axis=0) >= spec.min_cams)
+        n_ghosts = int(round(spec.ghost_rate * len(particles)))
+        ghost_xyz = rng.uniform(lo, hi, size=(n_ghosts, 3))
+        ghost_pnr = np.full((num_cams, n_ghosts), -1, dtype=np.int64)
+        if n_ghosts:
+            for cam in range(num_cams):
+                idx = np.flatnonzero(pnr[cam] >= 0)
+                if len(idx) == 0:
+                    continue
+                _dist, nearest = cKDTree(xy[cam, idx]).query(
+                    project_points(ghost_xyz, cals[cam], cpar)
+                )
+                ghost_pnr[cam] = pnr[cam, idx[nearest]]
+
+        ids = np.concatenate([traj.ids[i, particles], np.full(n_ghosts, -1)])
+        xyz = np.concatenate([traj.xyz[i, particles], ghost_xyz])
+        corresp = np.concatenate([pnr[:, particles], ghost_pnr], axis=1).T
+        order = rng.permutation(len(ids))
+        ids, xyz, corresp = ids[order], xyz[order], corresp[order]
+        if spec.noise_mm > 0:
+            xyz = xyz + rng.normal(0.0, spec.noise_mm, size=xyz.shape)
+        _write_rt_is_file(res_dir / f"rt_is.{frame}", xyz, corresp)
+        row_ids.append(ids)
+
+        # tnr: the rt_is row of the true particle that uses the target
+        rt_row = np.full(n, -1, dtype=np.int64)
+        true_rows = np.flatnonzero(ids >= 0)
+        rt_row[particles[order[true_rows]]] = true_rows
+        for cam in range(num_cams):
+            idx = np.flatnonzero(pnr[cam] >= 0)
+            idx = idx[np.argsort(pnr[cam, idx])]
+            _write_targets_file(
+                Path(f"{target_bases[cam]}.{frame:04d}_targets"), xy[cam, idx], rt_row[idx]
+            )
+            n_targets += len(idx)
+            max_targets = max(max_targets, len(idx), len(ids))
+
+    if max_targets > OPTV_MAX_TARGETS:
+        warnings.warn(
+            f"{max_targets} targets in one camera/frame exceed optv's tracker "
+            f"limit of {OPTV_MAX_TARGETS}",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+
+    gt_path = res_dir / TRACKING_GROUND_TRUTH_NAME
+    np.savez_compressed(
+        gt_path,
+        frames=traj.frames,
+        row_counts=np.array([len(ids) for ids in row_ids]),
+        row_ids=np.concatenate(row_ids),
+        xyz=traj.xyz,
+        ids=traj.ids,
+    )
+    n_rows = sum(len(ids) for ids in row_ids)
+    return {
+        "num_cams": num_cams,
+        "first": first,
+        "last": last,
+        "n_particles": n,
+        "flow": spec.flow,
+        "targets_per_frame": n_targets / len(traj.frames),
+        "rt_is_per_frame": n_rows / len(traj.frames),
+        "ghosts_per_frame": int((np.concatenate(row_ids) < 0).sum()) / len(traj.frames),
+        "max_targets": max_targets,
+        "ground_truth": str(gt_path),
+    }
+
+
+def _read_ptv_is(path: Path) -> np.ndarray:
+    """(prev, next) columns of a ptv_is file."""
+    with open(path, encoding="utf8") as f:
+        n = int(f.readline())
+    if n == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.loadtxt(path, skiprows=1, usecols=(0, 1), dtype=np.int64, ndmin=2)
+
+
+def _true_ids(ids: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Particle ids of rt_is ``rows``; -1 for rows beyond the generated ones."""
+    out = np.full(len(rows), -1, dtype=np.int64)
+    known = rows < len(ids)
+    out[known] = ids[rows[known]]
+    return out
+
+
+def score_tracking(res_dir: Path, ground_truth: Optional[Path] = None) -> dict[str, float]:
+    """Compare the links in ``res_dir/ptv_is.*`` with the generated ground truth.
+
+    A link from row i of frame f to row j of frame f+1 is correct if both
+    rows stem from the same true particle. Rows the tracker added beyond the
+    generated rt_is rows count as ghosts. ``true_links`` counts the particles
+    present in the rt_is of two consecutive frames.
+    """
+    res_dir = Path(res_dir)
+    gt = load_ground_truth(ground_truth or res_dir / TRACKING_GROUND_TRUTH_NAME)
+    frames = gt["frames"]
+    ids_by_frame = np.split(gt["row_ids"], np.cumsum(gt["row_counts"])[:-1])
+
+    links = correct = true_links = 0
+    for i in range(len(frames) - 1):
+        ids, next_ids = ids_by_frame[i], ids_by_frame[i + 1]
+        true_links += len(np.intersect1d(ids[ids >= 0], next_ids[next_ids >= 0]))
+        ptv_is = res_dir / f"ptv_is.{frames[i]}"
+        if not ptv_is.exists():
+            continue
+        nxt = _read_ptv_is(ptv_is)[:, 1]
+        rows = np.flatnonzero(nxt >= 0)
+        links += len(rows)
+        # rows/targets the tracker added have no ground truth
+        src = _true_ids(ids, rows)
+        dst = _true_ids(next_ids, nxt[rows])
+        correct += int(np.sum((src >= 0) & (src == dst)))
+    return {
+        "links": links,
+        "correct_links": correct,
+        "true_links": true_links,
+        "precision": correct / links if links else 0.0,
+        "recall": correct / true_links if true_links else 0.0,
+    }
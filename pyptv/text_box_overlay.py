@@ -1,9 +1,11 @@
-"""Defines the TextBoxOverlay class."""
+"""Defines the TextBoxOverlay and TextBoxesOverlay classes."""
+
+import numpy as np
 
 # Enthought library imports
 from enable.api import ColorTrait, AbstractOverlay, Label, black_color_trait
 from kiva.trait_defs.kiva_font_trait import KivaFont
-from traits.api import Any, Enum, Int, Str, Float, Trait
+from traits.api import Any, Array, Enum, Int, List, Str, Float, Trait
 
 
 # Local, relative imports
@@ -59,17 +61,24 @@ class TextBoxOverlay(AbstractOverlay):
         # draw the label on a transparent box. This allows us to draw
         # different shapes and put the text inside it without the label
         # filling a rectangle on top of it
-        label = Label(
-            text=self.text, # type: ignore
+        label = self._make_label(self.text)
+        self._draw_label(component, gc, label, self.alternate_position)
+
+    def _make_label(self, text):
+        return Label(
+            text=text,
             font=self.font,
             bgcolor="transparent",
             color=self.text_color,
             margin=5,
         )
+
+    def _draw_label(self, component, gc, label, position):
+        """Draws ``label`` in a box next to the screen ``position``, or in a corner."""
         width, height = label.get_width_height(gc)
         valign, halign = self.align
-        if self.alternate_position:
-            x, y = self.alternate_position # type: ignore
+        if position is not None and len(position):
+            x, y = position # type: ignore
             if valign == "u":
                 y += self.padding
             else:
@@ -131,3 +140,38 @@ class TextBoxOverlay(AbstractOverlay):
             label.draw(gc)
         finally:
             gc.restore_state()
+
+
+class TextBoxesOverlay(TextBoxOverlay):
+    """Draws many text boxes, one per data point, as a single overlay
+
+    The positions are in data space and mapped to the screen on every draw,
+    so the boxes follow zoom and pan; boxes outside the component are skipped.
+    """
+
+    # The texts of the boxes
+    texts = List(Str)
+
+    # The data space positions of the boxes, an (N, 2) array
+    positions = Array
+
+    # Labels of the texts, made on the first draw
+    _labels = Any
+
+    def _texts_changed(self):
+        self._labels = None
+
+    def overlay(self, component, gc, view_bounds=None, mode="normal"): # type: ignore
+        if not self.visible or len(self.texts) == 0:
+            return
+        if self._labels is None:
+            self._labels = [self._make_label(text) for text in self.texts]
+        screen = np.asarray(component.map_screen(self.positions), dtype=float)
+        inside = (
+            (screen[:, 0] >= component.x)
+            & (screen[:, 0] <= component.x2)
+            & (screen[:, 1] >= component.y)
+            & (screen[:, 1] <= component.y2)
+        )
+        for i in np.flatnonzero(inside):
+            self._draw_label(component, gc, self._labels[i], screen[i])
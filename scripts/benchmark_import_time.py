@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Import-time benchmark for the headless PyPTV entry points.
+
+Every module is imported in a fresh interpreter, as a spawned batch worker
+would, and the wall time of the import statement is reported together with
+any heavy optional dependency it pulled in.
+
+Examples
+    python scripts/benchmark_import_time.py
+    python scripts/benchmark_import_time.py pyptv.ptv --repeat 10 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "pyptv.parameter_manager",
+    "pyptv.ptv",
+    "pyptv.pyptv_batch",
+    "pyptv.pyptv_batch_parallel",
+    "pyptv.pyptv_batch_plugins",
+]
+
+# Dependencies a headless sequence/tracking worker should not need
+HEAVY_MODULES = [
+    "scipy.optimize",
+    "scipy.sparse",
+    "skimage",
+    "traits.api",
+    "traitsui",
+    "pyface",
+    "PySide6",
+    "matplotlib",
+    "tqdm",
+]
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeat: int = 5) -> dict:
+    """Import ``module`` ``repeat`` times in fresh interpreters."""
+    times = []
+    heavy: list[str] = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        heavy = result["heavy"]
+    return {
+        "module": module,
+        "median_ms": 1e3 * statistics.median(times),
+        "min_ms": 1e3 * min(times),
+        "repeat": repeat,
+        "heavy_modules": heavy,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = [measure_import(module, args.repeat) for module in args.modules]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        width = max(len(r["module"]) for r in results)
+        for r in results:
+            heavy = ", ".join(r["heavy_modules"]) or "-"
+            print(f"{r['module']:<{width}}  {r['median_ms']:8.1f} ms  heavy: {heavy}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
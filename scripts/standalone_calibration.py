@@ -91,6 +91,12 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
         action="store_true",
         help="Write output .ori/.addpar to paths in cal_ori.img_ori",
     )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for the per-camera solves (default: one per camera, 1 = serial)",
+    )
 
     return p.parse_args(argv)
 
@@ -132,6 +138,7 @@ def main(argv: Sequence[str] | None = None) -> int:
         flags=flags,
         init_external=init_external,
         write=bool(ns.write),
+        n_workers=ns.workers,
     )
 
     return 0
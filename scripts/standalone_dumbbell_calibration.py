@@ -35,6 +35,37 @@ def _parse_args() -> argparse.Namespace:
     p.add_argument("--step", type=int, default=None, help="Frame step (default: dumbbell.dumbbell_step or 1)")
     p.add_argument("--fixed-cams", nargs="*", type=int, default=[], help="0-based camera indices to keep fixed")
     p.add_argument("--maxiter", type=int, default=1000, help="SciPy least_squares max function evaluations")
+    p.add_argument(
+        "--frame-budget",
+        type=int,
+        default=None,
+        help="Optimize on at most N coverage-selected frames (default: dumbbell.dumbbell_frame_budget, 0 = all)",
+    )
+    p.add_argument(
+        "--refine-all",
+        action="store_true",
+        default=None,
+        help="After solving on the selected frames, refine on all valid frames",
+    )
+    p.add_argument(
+        "--starts",
+        type=int,
+        default=None,
+        help="Number of perturbed starts run in parallel (default: dumbbell.dumbbell_starts or 1)",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for multi-start (default: dumbbell.dumbbell_workers, 0 = auto)",
+    )
+    p.add_argument(
+        "--start-time-budget",
+        type=float,
+        default=None,
+        help="Seconds allowed per start (default: dumbbell.dumbbell_start_time_budget, 0 = unlimited)",
+    )
+    p.add_argument("--seed", type=int, default=0, help="Random seed for start perturbations")
     p.add_argument("--write", action="store_true", help="Write updated .ori/.addpar")
     p.add_argument("--no-write", action="store_true", help="Do not write outputs")
     return p.parse_args()
@@ -50,12 +81,19 @@ def main() -> int:
         fixed_cams=ns.fixed_cams,
         maxiter=ns.maxiter,
         write=write,
+        frame_budget=ns.frame_budget,
+        refine_all=ns.refine_all,
+        n_starts=ns.starts,
+        n_workers=ns.workers,
+        start_time_budget=ns.start_time_budget,
+        seed=ns.seed,
     )
 
     print(
         "Dumbbell calibration result: "
         f"success={result.success} fun_initial={result.fun_initial:.6g} fun_final={result.fun_final:.6g} "
-        f"frames_used={result.n_frames_used}/{result.n_frames_total} msg={result.message}"
+        f"frames_used={result.n_frames_used}/{result.n_frames_total} "
+        f"frames_selected={result.n_frames_selected} msg={result.message}"
     )
 
     # SciPy occasionally reports `success=False` with messages like
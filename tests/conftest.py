@@ -1,3 +1,4 @@
+import os
 import pytest
 from pathlib import Path
 import shutil
@@ -13,6 +14,29 @@ def test_data_dir():
     return test_dir
 
 
+def _working_copy(tmp_path: Path, name: str, target: str):
+    """Copy tests/<name> with a res directory and chdir into it while in use"""
+    work = tmp_path / target
+    shutil.copytree(Path(__file__).parent / name, work)
+    (work / "res").mkdir(exist_ok=True)
+    cwd = Path.cwd()
+    os.chdir(work)
+    yield work
+    os.chdir(cwd)
+
+
+@pytest.fixture
+def cavity(tmp_path: Path):
+    """A copy of test_cavity with a res directory, as the working directory"""
+    yield from _working_copy(tmp_path, "test_cavity", "cavity")
+
+
+@pytest.fixture
+def splitter(tmp_path: Path):
+    """A copy of test_splitter with a res directory, as the working directory"""
+    yield from _working_copy(tmp_path, "test_splitter", "splitter")
+
+
 @pytest.fixture(scope="session")
 def clean_test_environment(test_data_dir):
     """Clean up test environment before and after tests"""
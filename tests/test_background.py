@@ -0,0 +1,161 @@
+"""Tests for the background images of the masking step."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from imageio.v3 import imread
+
+from pyptv.background import (
+    RollingBackground,
+    background_path,
+    build_backgrounds,
+    camera_background,
+    percentile_image,
+    sample_frames,
+    subtract_background,
+)
+from pyptv.cli import cli
+from pyptv.frame_source import FileFrameSource
+from pyptv.processing import load_parameters, start_processing
+from pyptv.ptv import py_sequence_loop
+
+
+def test_helpers():
+    assert background_path("bg/cam%d.tif", 0) == "bg/cam1.tif"
+    assert background_path("background_mask_#.tif", 2) == "background_mask_2.tif"
+    with pytest.raises(ValueError):
+        background_path("background.tif", 0)
+
+    assert sample_frames(list(range(100, 200)), 3) == [100, 150, 199]
+    assert sample_frames([5, 6], 10) == [5, 6]
+
+    img = np.array([[10, 200]], np.uint8)
+    np.testing.assert_array_equal(subtract_background(img, np.array([[20, 50]], np.uint8)), [[0, 150]])
+    np.testing.assert_array_equal(subtract_background(img, np.array([[20.0, 50.5]])), [[0, 149]])
+
+
+def test_percentile_tiles_and_spill(tmp_path):
+    rng = np.random.default_rng(0)
+    stack = rng.integers(0, 256, size=(9, 40, 30)).astype(np.uint8)
+    expected = np.rint(np.percentile(stack, 20, axis=0))
+    # a few kB of memory: one row per tile
+    np.testing.assert_array_equal(percentile_image(stack, 20, memory_mb=0.001), expected)
+    np.testing.assert_array_equal(percentile_image(stack), np.rint(np.median(stack, axis=0)))
+
+    base = str(tmp_path / "cam1.%d.tif")
+    from imageio.v3 import imwrite
+
+    for k, img in enumerate(stack):
+        imwrite(base % k, img)
+    source = FileFrameSource([base])
+    in_memory = camera_background(source, 0, range(9))
+    spilled = camera_background(source, 0, range(9), memory_mb=0.001, spill_dir=tmp_path)
+    np.testing.assert_array_equal(in_memory, spilled)
+    np.testing.assert_array_equal(in_memory, np.rint(np.median(stack, axis=0)))
+    # the spill file is removed
+    assert sorted(p.name for p in tmp_path.iterdir() if not p.name.startswith("cam1.")) == []
+
+
+def test_build_backgrounds_parallel(cavity):
+    Path("img/cam3.10002").unlink()
+    pm = load_parameters("parameters_Run1.yaml")
+    serial = build_backgrounds(pm, 10000, 10004, samples=3, mask_base_name="bg/serial_%d.tif", workers=1)
+    assert (serial["frames"], serial["first_sample"], serial["last_sample"]) == (3, 10000, 10004)
+    parallel = build_backgrounds(pm, 10000, 10004, samples=3, mask_base_name="bg/parallel_%d.tif", workers=2)
+    for cam in range(1, 5):
+        a = imread(f"bg/serial_{cam}.tif")
+        np.testing.assert_array_equal(a, imread(f"bg/parallel_{cam}.tif"))
+        # frame 10002 is missing in one camera and not sampled
+        frames = [imread(f"img/cam{cam}.{f}") for f in (10000, 10003, 10004)]
+        np.testing.assert_array_equal(a, np.rint(np.median(frames, axis=0)))
+    assert [row["cam"] for row in parallel["cameras"]] == [1, 2, 3, 4]
+
+
+def test_cli_background_feeds_masking(cavity, capsys):
+    argv = ["background", str(cavity / "parameters_Run1.yaml"), "--samples", "5", "--write", "--json"]
+    assert cli(argv) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["mask_base_name"] == "background_cam%d.tif"
+    assert len(result["cameras"]) == 4
+
+    exp = start_processing("parameters_Run1.yaml", 10001, 10001)
+    masking = exp.pm.get_parameter("masking")
+    assert masking["mask_flag"] and masking["mask_base_name"] == "background_cam%d.tif"
+    py_sequence_loop(exp)
+    assert "failed to read the mask" not in capsys.readouterr().out
+    assert int(Path("res/rt_is.10001").read_text().split()[0]) > 0
+
+
+@pytest.mark.parametrize("statistic", ["median", "min"])
+@pytest.mark.parametrize("window", [1, 2, 5])
+def test_rolling_background_window(statistic, window):
+    rng = np.random.default_rng(window)
+    rolling = RollingBackground(window, statistic, every=2, origin=100)
+    pushed = []
+    expected = None
+    for frame in range(100, 120):
+        # noise, dark frames and bright frames with saturated pixels
+        low, high = [(0, 256), (0, 8), (240, 256)][frame % 3]
+        img = rng.integers(low, high, size=(6, 7)).astype(np.uint8)
+        out = rolling.subtract(frame, img)
+        if pushed:
+            # the background of the frames before this one
+            np.testing.assert_array_equal(out, subtract_background(img, expected.astype(np.uint8)))
+        else:
+            np.testing.assert_array_equal(out, img)
+        if frame % 2 == 0:
+            pushed.append(img)
+        stack = np.array(pushed[-window:])
+        expected = np.rint(np.median(stack, axis=0)) if statistic == "median" else stack.min(axis=0)
+        np.testing.assert_array_equal(rolling.background(), expected)
+
+    assert rolling.warm_up_frames(100) == []
+    assert rolling.warm_up_frames(107) == [106, 104, 102, 100][:window][::-1]
+    assert RollingBackground(3, every=2, origin=100).warm_up_frames(107) == [102, 104, 106]
+    with pytest.raises(ValueError):
+        RollingBackground(3, "mean")
+
+
+def test_rolling_background_chunks(cavity):
+    from pyptv.pyptv_batch_parallel import main as run_parallel
+
+    pm = load_parameters("parameters_Run1.yaml")
+    pm.parameters["sequence"]["first"] = 10000
+    pm.parameters["masking"]["rolling"] = {"window": 3, "statistic": "median", "every": 2}
+    pm.to_yaml(cavity / "parameters_Run1.yaml")
+    frames = range(10000, 10005)
+
+    exp = start_processing("parameters_Run1.yaml", 10000, 10004)
+    del exp.pm.parameters["masking"]["rolling"]
+    py_sequence_loop(exp)
+    plain = [Path(f"res/rt_is.{frame}").read_text() for frame in frames]
+
+    py_sequence_loop(start_processing("parameters_Run1.yaml", 10000, 10004))
+    serial = [Path(f"res/rt_is.{frame}").read_text() for frame in frames]
+    # the first frame has no background yet, no frame is subtracted from itself
+    assert serial[0] == plain[0]
+    counts = [int(text.split()[0]) for text in serial]
+    assert min(counts) > 0.5 * max(counts), counts
+    # a later start first fills the window with the update frames before it
+    py_sequence_loop(start_processing("parameters_Run1.yaml", 10003, 10004))
+    assert [Path(f"res/rt_is.{frame}").read_text() for frame in frames[3:]] == serial[3:]
+
+    for path in Path("res").iterdir():
+        path.unlink()
+    run_parallel(cavity / "parameters_Run1.yaml", 10000, 10004, n_processes=2, mode="sequence")
+    assert [Path(f"res/rt_is.{frame}").read_text() for frame in frames] == serial
+    assert serial[-1] != plain[-1]
+
+
+def test_rolling_warm_up_frames_checked_first(cavity):
+    pm = load_parameters("parameters_Run1.yaml")
+    pm.parameters["sequence"]["first"] = 10000
+    pm.parameters["masking"]["rolling"] = {"window": 3, "statistic": "median", "every": 2}
+    pm.to_yaml(cavity / "parameters_Run1.yaml")
+    # 10000 is in the window of a start at 10003, but not in 10003..10004
+    Path("img/cam2.10000").unlink()
+
+    with pytest.raises(FileNotFoundError, match=r"Missing frames in 10000\.\.10004: cam2: 10000"):
+        py_sequence_loop(start_processing("parameters_Run1.yaml", 10003, 10004))
@@ -0,0 +1,140 @@
+"""Tests for the benchmark suite runner."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from pyptv.benchmark import (
+    DEFAULT_SUITE,
+    compare,
+    load_results,
+    load_suite,
+    run_suite,
+    save_results,
+    select,
+)
+from pyptv.cli import cli
+
+SUITE = '''
+from pyptv.benchmark import case
+
+def _setup(ctx, n):
+    return list(range(n))
+
+@case(setup=_setup, params={"n": [10, 1000]}, items="n")
+def total(values, n):
+    sum(values)
+
+@case
+def fails(state):
+    raise RuntimeError("boom")
+'''
+
+
+@pytest.fixture
+def suite(tmp_path: Path) -> Path:
+    suite_dir = tmp_path / "suite"
+    suite_dir.mkdir()
+    (suite_dir / "bench_demo.py").write_text(SUITE)
+    (suite_dir / "helper.py").write_text("raise ImportError('not a benchmark file')\n")
+    return suite_dir
+
+
+def test_variants_and_selection(suite):
+    cases = load_suite(suite)
+    names = [name for _c, name, _kw in select(cases)]
+    assert names == ["bench_demo.total[n=10]", "bench_demo.total[n=1000]", "bench_demo.fails"]
+    assert [name for _c, name, _kw in select(cases, quick=True)] == [
+        "bench_demo.total[n=10]",
+        "bench_demo.fails",
+    ]
+    assert [name for _c, name, _kw in select(cases, ["total*"])] == []
+    assert [name for _c, name, _kw in select(cases, ["*total[n=1000]"])] == [
+        "bench_demo.total[n=1000]"
+    ]
+
+
+def test_run_compare_and_roundtrip(suite, tmp_path):
+    results = run_suite(suite, repeat=3, warmup=0)
+    total = results["results"]["bench_demo.total[n=1000]"]
+    assert total["repeat"] == 3 and total["items"] == 1000
+    assert total["items_per_second"] == pytest.approx(1000 / total["median"])
+    assert "RuntimeError: boom" in results["results"]["bench_demo.fails"]["error"]
+    assert results["machine"]["cpu_count"]
+
+    path = save_results(results, tmp_path / "out" / "base.json")
+    baseline = load_results(path)
+    baseline["results"]["bench_demo.total[n=10]"]["median"] = total["median"] * 1e6
+    baseline["results"]["gone"] = {"median": 1.0}
+    status = {row["name"]: row["status"] for row in compare(results, baseline)}
+    assert status == {
+        "bench_demo.total[n=10]": "faster",
+        "bench_demo.total[n=1000]": "same",
+        "bench_demo.fails": "error",
+        "gone": "missing",
+    }
+
+
+def test_cli_benchmark_regression(suite, tmp_path, capsys):
+    base = tmp_path / "base.json"
+    assert cli(["benchmark", "total", "--suite", str(suite), "--repeat", "2", "--output", str(base), "--json"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["ok"] and result["output"] == str(base)
+
+    data = json.loads(base.read_text())
+    for entry in data["results"].values():
+        entry["median"] = 1e-12
+    base.write_text(json.dumps(data))
+    argv = ["benchmark", "total", "--suite", str(suite), "--repeat", "2", "--baseline", str(base), "--json"]
+    assert cli(argv) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert sorted(result["slower"]) == ["bench_demo.total[n=1000]", "bench_demo.total[n=10]"]
+    assert cli(argv + ["--fail-on-regression"]) == 1
+
+
+def test_cli_benchmark_failures_exit_1(suite, capsys):
+    argv = ["benchmark", "--suite", str(suite), "--quick", "--repeat", "1", "--warmup", "0", "--json"]
+    assert cli(argv) == 1
+    result = json.loads(capsys.readouterr().out)
+    assert result["ok"] is False and result["failed"] == ["bench_demo.fails"]
+    assert "bench_demo.fails" in result["error"]
+    assert "median" in result["results"]["results"]["bench_demo.total[n=10]"]
+    assert cli(argv[:-1] + ["fails"]) == 1
+    assert "benchmark(s) failed" in capsys.readouterr().out
+
+
+def test_repository_suite_loads():
+    names = [name for _c, name, _kw in select(load_suite(DEFAULT_SUITE), quick=True)]
+    for expected in (
+        "bench_sequence.decode",
+        "bench_sequence.correspondences",
+        "bench_io.read_targets[n_targets=1000]",
+        "bench_tracking.forward_steps",
+        "bench_calibration.dumbbell_ba_residuals[n_frames=100]",
+        "bench_parallel.sequence_batch[workers=1]",
+    ):
+        assert expected in names
+
+
+def test_cli_benchmark_experiment(cavity, capsys):
+    argv = [
+        "benchmark", "--experiment", str(cavity / "parameters_Run1.yaml"),
+        "--first", "10000", "--last", "10001", "--repeat", "1", "--warmup", "0", "--json",
+    ]
+    assert cli(argv) == 0
+    result = json.loads(capsys.readouterr().out)
+    ((name, timing),) = result["results"]["results"].items()
+    assert name == "experiment.cavity[mode=sequence,backend=serial,workers=None]"
+    assert timing["items"] == 2 and timing["items_per_second"] > 0
+    assert Path("res/rt_is.10001").exists()
+
+
+def test_missing_default_suite(monkeypatch, capsys):
+    import pyptv.benchmark
+
+    monkeypatch.setattr(pyptv.benchmark, "DEFAULT_SUITE", Path("/nonexistent/benchmarks"))
+    with pytest.raises(FileNotFoundError, match="source tree"):
+        load_suite()
+    assert cli(["benchmark", "--list", "--json"]) == 1
+    assert "--suite" in json.loads(capsys.readouterr().out)["error"]
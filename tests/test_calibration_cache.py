@@ -0,0 +1,80 @@
+"""Tests for the process-wide calibration cache."""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pyptv import ptv
+
+
+@pytest.fixture
+def cal_files(tmp_path: Path):
+    src = Path(__file__).parent / "test_cavity" / "cal"
+    ori = tmp_path / "cam1.tif.ori"
+    addpar = tmp_path / "cam1.tif.addpar"
+    shutil.copyfile(src / "cam1.tif.ori", ori)
+    shutil.copyfile(src / "cam1.tif.addpar", addpar)
+    ptv.clear_calibration_cache()
+    yield ori, addpar
+    ptv.clear_calibration_cache()
+
+
+def test_read_calibration_returns_independent_copies(cal_files):
+    ori, addpar = cal_files
+    first = ptv.read_calibration(ori, addpar)
+    first.set_pos(np.array([1.0, 2.0, 3.0]))
+
+    second = ptv.read_calibration(ori, addpar)
+    assert second is not first
+    assert not np.allclose(second.get_pos(), [1.0, 2.0, 3.0])
+    assert len(ptv._calibration_cache) == 1
+
+
+def test_read_calibration_skips_parsing_when_unchanged(cal_files, monkeypatch):
+    ori, addpar = cal_files
+    ptv.read_calibration(ori, addpar)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("file was parsed again")
+
+    # only a cache miss stores a new state
+    monkeypatch.setattr(ptv, "calibration_to_dict", _fail)
+    ptv.read_calibration(ori, addpar)
+
+
+def test_read_calibration_sees_external_edits(cal_files):
+    ori, addpar = cal_files
+    before = ptv.read_calibration(ori, addpar)
+
+    lines = ori.read_text().splitlines()
+    lines[0] = "1.0 2.0 3.0"
+    ori.write_text("\n".join(lines) + "\n")
+    stat = ori.stat()
+    os.utime(ori, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    after = ptv.read_calibration(ori, addpar)
+    np.testing.assert_allclose(after.get_pos(), [1.0, 2.0, 3.0])
+    np.testing.assert_allclose(after.get_angles(), before.get_angles())
+
+
+def test_write_calibration_invalidates(cal_files):
+    ori, addpar = cal_files
+    cal = ptv.read_calibration(ori, addpar)
+    stat = ori.stat()
+
+    cal.set_pos(cal.get_pos() + 0.5)
+    ptv.write_calibration(cal, ori, addpar)
+    # even if the file system reports the old time stamp
+    os.utime(ori, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    np.testing.assert_allclose(ptv.read_calibration(ori, addpar).get_pos(), cal.get_pos())
+
+
+def test_read_calibration_missing_file(tmp_path: Path):
+    with pytest.raises(OSError):
+        ptv.read_calibration(tmp_path / "none.ori", tmp_path / "none.addpar")
@@ -0,0 +1,64 @@
+"""Tests for the projected calibration points of the calibration GUI."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("chaco")
+
+from kiva.image import GraphicsContext
+from optv.imgcoord import image_coordinates
+from optv.transforms import convert_arr_metric_to_pixel
+
+from pyptv.calibration_gui import CalibrationGUI
+from pyptv.text_box_overlay import TextBoxesOverlay
+
+
+def test_project_cal_points_labels(cavity, monkeypatch):
+    gui = CalibrationGUI(cavity / "parameters_Run1.yaml")
+    gui._button_showimg_fired()
+    gui._button_init_guess_fired()
+    assert len(gui.cal_points) > 10
+
+    for i_cam, camera in enumerate(gui.camera):
+        # the labels of all points are one overlay
+        (labels,) = camera._plot.overlays
+        assert isinstance(labels, TextBoxesOverlay)
+        assert labels.texts == [str(pnr) for pnr in gui.cal_points["id"]]
+
+        # the projection of one point at a time, as before
+        expected = []
+        for row in gui.cal_points:
+            projected = image_coordinates(
+                np.atleast_2d(row["pos"]),
+                gui.cals[i_cam],
+                gui.cpar.get_multimedia_params(),
+            )
+            expected.append(convert_arr_metric_to_pixel(projected, gui.cpar)[0])
+        np.testing.assert_allclose(labels.positions, expected)
+        np.testing.assert_allclose(
+            np.column_stack([camera._plot_data.get_data(k) for k in ("init_x", "init_y")]),
+            expected,
+        )
+
+    # the labels draw; those out of view are skipped
+    drawn = []
+    draw_label = TextBoxesOverlay._draw_label
+    monkeypatch.setattr(
+        TextBoxesOverlay,
+        "_draw_label",
+        lambda self, *args: drawn.append(1) or draw_label(self, *args),
+    )
+    plot = gui.camera[0]._plot
+    plot.outer_bounds = [400, 300]
+    plot.do_layout(force=True)
+    plot.draw(GraphicsContext((400, 300)))
+    assert len(drawn) == len(gui.cal_points)
+    drawn.clear()
+    plot.index_mapper.range.set_bounds(0, 600)
+    plot.draw(GraphicsContext((400, 300)))
+    assert 0 < len(drawn) < len(gui.cal_points)
+
+    # a new projection replaces the labels
+    plot.overlays.clear()
+    gui._project_cal_points(0, color="red")
+    assert len(plot.overlays) == 1
@@ -1,5 +1,75 @@
+import json
+from pathlib import Path
+
+import pytest
+
 from pyptv import cli
 
 
-def test_cli_template():
-    assert cli.cli() == "CLI template"
+@pytest.fixture
+def cavity_yaml(cavity: Path):
+    return cavity / "parameters_Run1.yaml"
+
+
+def _json_result(capfd):
+    out = capfd.readouterr().out
+    lines = out.strip().splitlines()
+    assert len(lines) == 1, out
+    return json.loads(lines[0])
+
+
+def test_run_sequence_json(cavity_yaml, capfd):
+    assert cli.cli(["run", str(cavity_yaml), "--mode", "sequence", "--last", "10002", "--json"]) == 0
+
+    result = _json_result(capfd)
+    assert result["ok"] is True
+    assert (result["first"], result["last"]) == (10001, 10002)
+    assert (cavity_yaml.parent / "res" / "rt_is.10002").exists()
+    assert not (cavity_yaml.parent / "res" / "rt_is.10003").exists()
+
+
+def test_track_json_keeps_stdout_clean(cavity_yaml, capfd):
+    assert cli.cli(["run", str(cavity_yaml), "--mode", "sequence", "--json"]) == 0
+    capfd.readouterr()
+
+    # the tracker prints progress from C; it must not reach stdout
+    assert cli.cli(["track", str(cavity_yaml), "--json"]) == 0
+    result = _json_result(capfd)
+    assert result["mode"] == "tracking"
+    assert (cavity_yaml.parent / "res" / "ptv_is.10002").exists()
+
+
+def test_sweep_reports_particles(cavity_yaml, capfd):
+    code = cli.cli(
+        [
+            "sweep",
+            str(cavity_yaml),
+            "--last",
+            "10001",
+            "--set",
+            "targ_rec.gvthres=20,60",
+            "--json",
+        ]
+    )
+    assert code == 0
+    runs = _json_result(capfd)["runs"]
+    assert [run["overrides"] for run in runs] == [
+        {"targ_rec.gvthres": 20},
+        {"targ_rec.gvthres": 60},
+    ]
+    # a higher threshold finds fewer particles
+    assert runs[0]["particles"][0] > runs[1]["particles"][0] > 0
+
+
+def test_error_is_reported_as_json(cavity_yaml, capfd):
+    code = cli.cli(["sweep", str(cavity_yaml), "--set", "nosuch.key=1", "--json"])
+    assert code == 1
+    result = _json_result(capfd)
+    assert result["ok"] is False
+    assert "nosuch.key" in result["error"]
+
+
+def test_parse_override():
+    assert cli._parse_override("sequence.first=1,2") == (("sequence", "first"), [1, 2])
+    with pytest.raises(cli.CLIError):
+        cli._parse_override("first=1")
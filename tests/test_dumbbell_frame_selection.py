@@ -0,0 +1,88 @@
+"""Tests for coverage-aware dumbbell frame subsampling."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from pyptv import ptv
+from pyptv.dumbbell_ground_truth import DumbbellGTSpec, generate_dumbbell_target_files
+from pyptv.standalone_dumbbell_calibration import run_dumbbell_calibration
+
+
+def _dumbbells(centers: np.ndarray, axes: np.ndarray, length: float = 25.0) -> np.ndarray:
+    axes = axes / np.linalg.norm(axes, axis=1, keepdims=True)
+    half = 0.5 * length * axes
+    return np.stack([centers - half, centers + half], axis=1)
+
+
+def test_select_dumbbell_frames_prefers_unseen_voxels():
+    rng = np.random.default_rng(0)
+    # 900 frames hovering in one corner, 100 spread through the volume
+    hover = rng.normal([-15.0, -15.0, -5.0], 0.2, size=(900, 3))
+    spread = rng.uniform([-20.0, -20.0, -10.0], [20.0, 20.0, 10.0], size=(100, 3))
+    centers = np.vstack([hover, spread])
+    points = _dumbbells(centers, rng.normal(size=(1000, 3)))
+
+    selected, report = ptv.select_dumbbell_frames(points, budget=60)
+
+    assert len(selected) == 60
+    assert np.all(np.diff(selected) > 0)
+    assert report["n_candidates"] == 1000
+    assert report["n_selected"] == 60
+    assert report["voxels_covered"] == report["voxels_occupied"]
+    # Most of the budget must go to the spread-out frames, not the hover cluster
+    assert np.sum(selected >= 900) > 30
+
+
+def test_select_dumbbell_frames_budget_zero_keeps_all():
+    rng = np.random.default_rng(1)
+    points = _dumbbells(rng.uniform(-10, 10, size=(20, 3)), rng.normal(size=(20, 3)))
+    points[3] = np.nan
+
+    selected, report = ptv.select_dumbbell_frames(points, budget=0)
+    np.testing.assert_array_equal(selected, np.arange(20))
+
+    selected, report = ptv.select_dumbbell_frames(points, budget=10)
+    assert 3 not in selected
+    assert report["n_selected"] == 10
+
+
+def test_dumbbell_calibration_with_frame_budget(cavity: Path):
+    yaml_path = cavity / "parameters_Run1.yaml"
+    params = yaml.safe_load(yaml_path.read_text())
+    params["sequence"]["first"] = 10001
+    params["sequence"]["last"] = 10024
+    yaml_path.write_text(yaml.safe_dump(params, sort_keys=False))
+
+    generate_dumbbell_target_files(
+        yaml_path,
+        out_root=None,
+        spec=DumbbellGTSpec(first=10001, last=10024, length=25.0, seed=0, max_tries_per_frame=2000),
+    )
+
+    from optv.calibration import Calibration
+
+    ori = cavity / "cal" / "cam2.tif.ori"
+    addpar = cavity / "cal" / "cam2.tif.addpar"
+    start = Calibration()
+    start.from_file(str(ori), str(addpar))
+    start.set_pos(start.get_pos() + np.array([2.0, -1.0, 1.5]))
+    start.set_angles(start.get_angles() + np.array([0.01, -0.005, 0.008]))
+    start.write(str(ori).encode("utf-8"), str(addpar).encode("utf-8"))
+
+    result = run_dumbbell_calibration(
+        yaml_path,
+        fixed_cams=(0, 2, 3),
+        maxiter=300,
+        write=False,
+        frame_budget=8,
+        refine_all=True,
+    )
+
+    assert result.n_frames_used > 8
+    assert result.n_frames_selected == 8
+    assert result.frame_selection["n_selected"] == 8
+    assert result.fun_final < result.fun_initial * 0.5
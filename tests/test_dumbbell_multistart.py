@@ -0,0 +1,104 @@
+"""Tests for multi-start parallel dumbbell calibration."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from optv.calibration import Calibration
+
+from pyptv import ptv
+from pyptv.dumbbell_ground_truth import DumbbellGTSpec, generate_dumbbell_target_files
+from pyptv.standalone_dumbbell_calibration import run_dumbbell_calibration
+
+
+@pytest.fixture
+def perturbed_cavity(cavity: Path):
+    yaml_path = cavity / "parameters_Run1.yaml"
+
+    generate_dumbbell_target_files(
+        yaml_path,
+        out_root=None,
+        spec=DumbbellGTSpec(first=10001, last=10004, length=25.0, seed=0, max_tries_per_frame=2000),
+    )
+
+    ori = cavity / "cal" / "cam2.tif.ori"
+    addpar = cavity / "cal" / "cam2.tif.addpar"
+    start = Calibration()
+    start.from_file(str(ori), str(addpar))
+    start.set_pos(start.get_pos() + np.array([2.0, -1.0, 1.5]))
+    start.set_angles(start.get_angles() + np.array([0.01, -0.005, 0.008]))
+    start.write(str(ori).encode("utf-8"), str(addpar).encode("utf-8"))
+    return yaml_path
+
+
+def test_calibration_dict_roundtrip():
+    cal = Calibration()
+    cal.set_pos(np.array([1.0, 2.0, 3.0]))
+    cal.set_angles(np.array([0.1, 0.2, 0.3]))
+    cal.set_radial_distortion(np.array([1e-4, 0.0, 0.0]))
+
+    copy = ptv.calibration_from_dict(ptv.calibration_to_dict(cal))
+
+    np.testing.assert_allclose(copy.get_pos(), cal.get_pos())
+    np.testing.assert_allclose(copy.get_angles(), cal.get_angles())
+    np.testing.assert_allclose(copy.get_radial_distortion(), cal.get_radial_distortion())
+    np.testing.assert_allclose(copy.get_affine(), cal.get_affine())
+
+
+def test_dumbbell_multistart_parallel(perturbed_cavity, monkeypatch):
+    import concurrent.futures
+
+    start_methods = []
+    executor = concurrent.futures.ProcessPoolExecutor
+
+    def spy(*args, mp_context=None, **kwargs):
+        start_methods.append(mp_context.get_start_method() if mp_context else None)
+        return executor(*args, mp_context=mp_context, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", spy)
+    result = run_dumbbell_calibration(
+        perturbed_cavity,
+        fixed_cams=(0, 2, 3),
+        maxiter=300,
+        write=False,
+        n_starts=3,
+        n_workers=2,
+    )
+
+    report = result.multistart
+    assert report["n_starts"] == 3
+    assert len(report["costs"]) == 3
+    assert report["best_start"] in (0, 1, 2)
+    assert report["costs"][report["best_start"]] == min(report["costs"])
+    assert report["pos_spread"] >= 0.0
+    assert result.fun_final < result.fun_initial * 0.5
+    # the GUI can run this, so the workers are spawned, never forked
+    assert start_methods == ["spawn"]
+
+    serial = run_dumbbell_calibration(
+        perturbed_cavity,
+        fixed_cams=(0, 2, 3),
+        maxiter=300,
+        write=False,
+        n_starts=3,
+        n_workers=1,
+    )
+    np.testing.assert_allclose(serial.multistart["costs"], report["costs"])
+
+
+def test_dumbbell_multistart_time_budget(perturbed_cavity):
+    result = run_dumbbell_calibration(
+        perturbed_cavity,
+        fixed_cams=(0, 2, 3),
+        maxiter=300,
+        write=False,
+        n_starts=2,
+        n_workers=1,
+        start_time_budget=1e-9,
+    )
+
+    assert result.multistart["n_timed_out"] == 2
+    assert np.isfinite(result.fun_final)
@@ -231,5 +231,32 @@ def test_clean_design_principles():
     assert isinstance(exp.pm, ParameterManager)
 
 
+def test_populate_runs_defers_loading(tmp_path):
+    """Only the active set is parsed; legacy directories convert on activation"""
+    cavity = Path(__file__).parent / "test_cavity"
+    shutil.copyfile(cavity / "parameters_Run1.yaml", tmp_path / "parameters_Run1.yaml")
+    shutil.copyfile(cavity / "parameters_Run1.yaml", tmp_path / "parameters_Run2.yaml")
+    shutil.copytree(cavity / "parameters", tmp_path / "parametersRun3")
+
+    exp = Experiment()
+    exp.populate_runs(tmp_path)
+
+    assert [ps.name for ps in exp.paramsets] == ["Run1", "Run2", "Run3"]
+    assert exp.active_params.name == "Run1"
+    assert exp.active_params.is_loaded
+    run2, run3 = exp.paramsets[1:]
+    assert not run2.is_loaded and not run3.is_loaded
+    assert run3.legacy_dir == tmp_path / "parametersRun3"
+    assert not (tmp_path / "parameters_Run3.yaml").exists()
+
+    # first access parses the file
+    assert run2.num_cams == 4
+    assert run2.is_loaded
+
+    exp.set_active(run3)
+    assert (tmp_path / "parameters_Run3.yaml").exists()
+    assert exp.get_n_cam() == 4
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,292 @@
+"""Tests for frame sources and the HDF5 frame store."""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from imageio.v3 import imread
+
+from pyptv.cli import cli
+from pyptv.frame_source import (
+    FileFrameSource,
+    FrameIndex,
+    HDF5FrameSource,
+    RawFrameSource,
+    SplitterFrameSource,
+    TiffStackFrameSource,
+    frame_ranges,
+    ingest_sequence,
+    open_frame_source,
+)
+from pyptv.processing import start_processing
+from pyptv.ptv import py_sequence_loop
+
+BASE_NAMES = [f"img/cam{cam}.%d" for cam in range(1, 5)]
+
+
+def test_file_source(cavity):
+    source = open_frame_source({"base_name": BASE_NAMES}, 4)
+    assert isinstance(source, FileFrameSource)
+    np.testing.assert_array_equal(source.read(2, 10001), imread("img/cam3.10001"))
+    assert not source.has_frame(0, 99)
+    with pytest.raises(FileNotFoundError, match="img/cam1.99 does not exist"):
+        source.read(0, 99)
+    # placeholders of unused cameras never have frames
+    assert not FileFrameSource(["--"]).has_frame(0, 10001)
+
+
+def test_hdf5_store_matches_files(cavity):
+    Path("img/cam2.10002").unlink()
+    summary = ingest_sequence(BASE_NAMES, range(10000, 10005), "store/frames.h5")
+    assert summary["frames_per_camera"] == [5, 4, 5, 5]
+    assert not Path("store/frames.h5.tmp").exists()
+
+    with HDF5FrameSource("store/frames.h5") as store:
+        assert store.num_cams == 4
+        assert store.frames(1) == [10000, 10001, 10003, 10004]
+        assert not store.has_frame(1, 10002)
+        with pytest.raises(FileNotFoundError):
+            store.read(1, 10002)
+        files = FileFrameSource(BASE_NAMES)
+        for cam in range(4):
+            img = store.read(cam, 10004)
+            np.testing.assert_array_equal(img, files.read(cam, 10004))
+            assert img.dtype == np.uint8
+        chunks = store._file().get_node("/cam1/images").chunkshape
+        assert chunks == (1, *img.shape)
+
+    # a disabled camera is not stored and not reported missing
+    ingest_sequence([*BASE_NAMES[:3], "--"], range(10000, 10002), "store/three.h5")
+    with HDF5FrameSource("store/three.h5") as store:
+        assert not store.has_frame(3, 10000)
+        assert store.missing_frames(10000, 10002) == {cam: [10002] for cam in range(3)}
+        store.check_frames(10000, 10001)
+
+
+def test_sequence_loop_reads_frame_store(cavity):
+    exp = start_processing("parameters_Run1.yaml", 10001, 10002)
+    py_sequence_loop(exp)
+    expected = Path("res/rt_is.10002").read_text()
+
+    ingest_sequence(BASE_NAMES, range(10001, 10003), "img/frames.h5")
+    for cam in range(1, 5):
+        for frame in (10001, 10002):
+            Path(f"img/cam{cam}.{frame}").unlink()
+    exp = start_processing("parameters_Run1.yaml", 10001, 10002)
+    exp.pm.parameters["sequence"]["frame_store"] = "img/frames.h5"
+    py_sequence_loop(exp)
+    assert Path("res/rt_is.10002").read_text() == expected
+
+
+def test_cli_ingest_writes_yaml(cavity, capsys):
+    argv = ["ingest", str(cavity / "parameters_Run1.yaml"), "--first", "10001", "--last", "10002",
+            "--write", "--json"]
+    assert cli(argv) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["output"] == "img/frames.h5"
+    assert result["frames_per_camera"] == [2, 2, 2, 2]
+
+    exp = start_processing("parameters_Run1.yaml")
+    assert exp.pm.get_parameter("sequence")["frame_store"] == "img/frames.h5"
+    with open_frame_source(exp.pm.get_parameter("sequence"), 4) as source:
+        assert isinstance(source, HDF5FrameSource)
+        assert source.has_frame(3, 10002)
+
+
+def _write_dump(path: Path, frames, header: bytes = b"", trailer: int = 0) -> None:
+    with open(path, "wb") as f:
+        f.write(header)
+        for img in frames:
+            f.write(img.tobytes())
+            f.write(b"\xff" * trailer)
+
+
+def test_raw_source_views(tmp_path):
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 4096, size=(3, 6, 8)).astype(">u2")
+    _write_dump(tmp_path / "cam1.raw", frames, header=b"H" * 16, trailer=4)
+    source = RawFrameSource(
+        [tmp_path / "cam1.raw", "--"], width=8, height=6, dtype=">u2", header=16,
+        frame_stride=6 * 8 * 2 + 4, first_frame=100,
+    )
+    assert source.frames(0) == range(100, 103)
+    assert not source.has_frame(1, 100)
+    # the placeholder camera is not reported missing
+    assert source.missing_frames(100, 103) == {0: [103]}
+    source.check_frames(100, 102)
+    img = source.read(0, 102)
+    np.testing.assert_array_equal(img, frames[2])
+    # a read-only view into the mapping, not a copy
+    assert np.shares_memory(img, source._stack(0))
+    assert not img.flags.writeable and img.flags.c_contiguous
+    with pytest.raises(FileNotFoundError):
+        source.read(0, 103)
+    with pytest.raises(ValueError):
+        RawFrameSource([tmp_path / "cam1.raw"], width=8, height=6, dtype="u2", frame_stride=10)
+
+
+def test_sequence_loop_reads_raw_dumps(cavity):
+    py_sequence_loop(start_processing("parameters_Run1.yaml", 10001, 10002))
+    expected = Path("res/rt_is.10002").read_text()
+
+    for cam in range(1, 5):
+        images = [imread(f"img/cam{cam}.{frame}") for frame in (10001, 10002)]
+        _write_dump(Path(f"img/cam{cam}.raw"), images, header=b"\0" * 512)
+    exp = start_processing("parameters_Run1.yaml", 10002, 10002)
+    seq = exp.pm.parameters["sequence"]
+    seq["base_name"] = [f"img/cam{cam}.raw" for cam in range(1, 5)]
+    seq["raw"] = {"width": 1280, "height": 1024, "dtype": "uint8", "header": 512, "first_frame": 10001}
+    for cam in range(4):
+        exp.spar.set_img_base_name(cam, seq["base_name"][cam])
+    Path("res/rt_is.10002").unlink()
+    py_sequence_loop(exp)
+    assert Path("res/rt_is.10002").read_text() == expected
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"compression": "zlib"}, {"byteorder": ">"}, {"imagej": True}])
+def test_tiff_stack_pages(tmp_path, kwargs):
+    import tifffile
+
+    rng = np.random.default_rng(1)
+    # tifffile writes 3-4 pages of this size as one planar RGB(A) page
+    pages = rng.integers(0, 60000, size=(5, 60, 80)).astype(np.uint16)
+    tifffile.imwrite(tmp_path / "cam1.tif", pages, **kwargs)
+    source = TiffStackFrameSource([tmp_path / "cam1.tif", "--"], first_frame=7, readahead=2)
+    assert source.frames(0) == range(7, 12)
+    assert not source.has_frame(1, 7)
+    assert source.missing_frames(7, 12) == {0: [12]}
+    source.check_frames(7, 11)
+    for k in (3, 0, 2):
+        np.testing.assert_array_equal(source.read(0, 7 + k), pages[k])
+    with pytest.raises(FileNotFoundError, match="page 5"):
+        source.read(0, 12)
+    source.close()
+
+
+def test_sequence_loop_reads_tiff_stacks(cavity):
+    import tifffile
+
+    py_sequence_loop(start_processing("parameters_Run1.yaml", 10001, 10002))
+    expected = Path("res/rt_is.10002").read_text()
+
+    for cam in range(1, 5):
+        tifffile.imwrite(
+            f"img/cam{cam}_stack.tif",
+            np.stack([imread(f"img/cam{cam}.{frame}") for frame in (10000, 10001, 10002)]),
+        )
+    exp = start_processing("parameters_Run1.yaml", 10002, 10002)
+    seq = exp.pm.parameters["sequence"]
+    seq["base_name"] = [f"img/cam{cam}_stack.tif" for cam in range(1, 5)]
+    seq["tiff_stack"] = {"first_frame": 10000}
+    for cam in range(4):
+        exp.spar.set_img_base_name(cam, seq["base_name"][cam])
+    Path("res/rt_is.10002").unlink()
+    py_sequence_loop(exp)
+    assert Path("res/rt_is.10002").read_text() == expected
+
+
+def test_frame_index_one_listing_per_directory(tmp_path, monkeypatch):
+    for name in ("a.7", "a.8", "a.10", "a.010", "a.9_targets", "b_0007.tif", "b_0009.tif", "b_7.tif"):
+        (tmp_path / name).write_bytes(b"x" * len(name))
+    (tmp_path / "static.tif").write_bytes(b"")
+
+    scans = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or real_scandir(path))
+    monkeypatch.setattr(Path, "exists", lambda self: pytest.fail("per-frame stat"))
+    bases = [str(tmp_path / "a.%d"), str(tmp_path / "b_%04d.tif"), "--"]
+    index = FrameIndex(bases, sizes=True)
+    assert len(scans) == 1
+    assert index.frames(0) == [7, 8, 10]
+    assert index.frames(1) == [7, 9]
+    assert index.path(1, 9) == tmp_path / "b_0009.tif"
+    assert index.sizes[0][10] == len("a.10")
+    assert index.missing(0, 6, 10) == [6, 9]
+    assert index.missing(2, 6, 10) == []
+
+    source = FileFrameSource(bases, index=index)
+    assert source.missing_frames(7, 9) == {0: [9], 1: [8]}
+    with pytest.raises(FileNotFoundError, match=r"cam1: 9; cam2: 8 \(first: .*a.9 does not exist\)"):
+        source.check_frames(7, 9)
+    monkeypatch.undo()
+
+    static = FrameIndex([str(tmp_path / "static.tif"), str(tmp_path / "none.tif")])
+    assert static.path(0, 123) == tmp_path / "static.tif"
+    assert static.missing(1, 1, 2) == [1, 2]
+    assert frame_ranges([1, 2, 3, 5, 7, 8]) == [(1, 3), (5, 5), (7, 8)]
+
+
+def test_cli_frames_reports_gaps(cavity, capsys):
+    Path("img/cam2.10002").unlink()
+    Path("img/cam3.10003").unlink()
+    argv = ["frames", str(cavity / "parameters_Run1.yaml"), "--sizes", "--json"]
+    assert cli(argv) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert not result["complete"]
+    cams = {row["cam"]: row for row in result["cameras"]}
+    assert cams[2]["missing_frames"] == "10002" and cams[3]["found"] == 3
+    assert cams[1]["min_bytes"] > 0
+    assert cli(argv + ["--strict"]) == 1
+
+    with pytest.raises(FileNotFoundError, match="cam2: 10002; cam3: 10003"):
+        py_sequence_loop(start_processing("parameters_Run1.yaml"))
+    # nothing was processed before the check
+    assert not Path("res/rt_is.10001").exists()
+
+
+def test_splitter_source_views(splitter):
+    exp = start_processing("parameters_Run1.yaml")
+    seq_params = exp.pm.get_parameter("sequence")
+    ptv_params = exp.pm.get_parameter("ptv")
+    with open_frame_source(seq_params, 4, ptv_params) as source:
+        assert isinstance(source, SplitterFrameSource)
+        reads = []
+        read = source.composite.read
+        source.composite.read = lambda cam, frame: reads.append(frame) or read(cam, frame)
+        views = [source.read(cam, 1000001) for cam in range(4)]
+        # one composite read per frame, every camera a view into it
+        assert reads == [1000001]
+        composite = imread("img/C001H001S0001000001.tif")
+        np.testing.assert_array_equal(views[2], composite[512:, 512:])
+        assert all(np.shares_memory(view, views[0].base) for view in views)
+        assert source.missing_frames(1000001, 1000006) == {0: [1000006]}
+        assert source.name(3, 1000002) == "img/C001H001S0001000002.tif"
+
+    ptv_params["splitter_order"] = [3, 2, 1, 0]
+    with open_frame_source(seq_params, 4, ptv_params) as source:
+        np.testing.assert_array_equal(source.read(0, 1000001), composite[512:, 512:])
+    with pytest.raises(ValueError):
+        SplitterFrameSource(source.composite, order=[0, 1, 1, 2])
+
+
+def test_sequence_loop_splits_images(splitter):
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(
+        "ext_sequence_splitter", "plugins/ext_sequence_splitter.py"
+    )
+    plugin = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(plugin)
+    plugin.Sequence(exp=start_processing("parameters_Run1.yaml", 1000001, 1000002)).do_sequence()
+    expected = {frame: Path(f"res/rt_is.{frame}").read_text() for frame in (1000001, 1000002)}
+    assert int(expected[1000002].split()[0]) > 0
+
+    for path in Path("res").iterdir():
+        path.unlink()
+    py_sequence_loop(start_processing("parameters_Run1.yaml", 1000001, 1000002))
+    for frame, text in expected.items():
+        assert Path(f"res/rt_is.{frame}").read_text() == text
+    assert Path("img/cam4.1000002_targets").exists()
+
+
+def test_parallel_batch_splitter(splitter):
+    from pyptv.pyptv_batch_parallel import main as run_parallel
+
+    py_sequence_loop(start_processing("parameters_Run1.yaml", 1000001, 1000004))
+    expected = [Path(f"res/rt_is.{frame}").read_text() for frame in range(1000001, 1000005)]
+    for path in Path("res").iterdir():
+        path.unlink()
+    run_parallel(splitter / "parameters_Run1.yaml", 1000001, 1000004, n_processes=2, mode="sequence")
+    assert [Path(f"res/rt_is.{frame}").read_text() for frame in range(1000001, 1000005)] == expected
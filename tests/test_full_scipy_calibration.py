@@ -0,0 +1,96 @@
+"""Tests for the least-squares fallback calibration engine."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from optv.calibration import Calibration
+from optv.imgcoord import image_coordinates
+from optv.tracking_framebuf import TargetArray
+from optv.transforms import convert_arr_metric_to_pixel
+
+from pyptv import ptv
+from pyptv.parameter_manager import ParameterManager
+
+
+@pytest.fixture
+def camera():
+    cavity = Path(__file__).parent / "test_cavity"
+    pm = ParameterManager()
+    pm.from_yaml(cavity / "parameters_Run1.yaml")
+    cpar = ptv._populate_cpar(pm.get_parameter("ptv"), pm.num_cams)
+    cal = Calibration()
+    cal.from_file(
+        str(cavity / "cal" / "cam1.tif.ori"), str(cavity / "cal" / "cam1.tif.addpar")
+    )
+    return cpar, cal
+
+
+def _targets(xy, unmatched=()):
+    targs = TargetArray(len(xy))
+    for tix, pos in enumerate(xy):
+        targs[tix].set_pnr(-999 if tix in unmatched else tix)
+        targs[tix].set_pos(pos)
+    return targs
+
+
+def test_target_array_positions():
+    targs = _targets(np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]), unmatched=(1,))
+    xy = ptv.target_array_positions(targs)
+
+    np.testing.assert_array_equal(xy[[0, 2]], [[1.0, 2.0], [5.0, 6.0]])
+    assert np.all(np.isnan(xy[1]))
+
+
+def test_full_scipy_calibration_recovers_pose_and_distortion(camera):
+    cpar, cal = camera
+    truth = ptv.calibration_to_dict(cal)
+    truth["rad_dist"] = np.array([2e-5, 0.0, 0.0])
+    truth["decent"] = np.array([1e-5, -1e-5])
+    true_cal = ptv.calibration_from_dict(truth)
+
+    rng = np.random.default_rng(0)
+    XYZ = rng.uniform([-30, -30, -15], [30, 30, 20], size=(80, 3))
+    xy = convert_arr_metric_to_pixel(
+        image_coordinates(XYZ, true_cal, cpar.get_multimedia_params()), cpar
+    )
+    targs = _targets(xy, unmatched=(3, 17))
+
+    cal.set_pos(cal.get_pos() + np.array([1.0, -2.0, 1.5]))
+    cal.set_angles(cal.get_angles() + np.array([0.005, -0.004, 0.003]))
+
+    residuals = ptv.full_scipy_calibration(
+        cal, XYZ, targs, cpar, flags=["k1", "p1", "p2"], extrinsics=True
+    )
+
+    assert residuals.shape == (80, 2)
+    assert np.all(residuals[[3, 17]] == 0)
+    assert np.abs(residuals).max() * 100 < 1e-3
+    np.testing.assert_allclose(cal.get_pos(), truth["pos"], atol=1e-3)
+    np.testing.assert_allclose(cal.get_angles(), truth["angs"], atol=1e-6)
+    np.testing.assert_allclose(cal.get_radial_distortion(), truth["rad_dist"], atol=1e-8)
+    np.testing.assert_allclose(cal.get_decentering(), truth["decent"], atol=1e-8)
+
+
+def test_full_scipy_calibration_intrinsics_only(camera):
+    cpar, cal = camera
+    pos, angs = cal.get_pos().copy(), cal.get_angles().copy()
+    truth = ptv.calibration_to_dict(cal)
+    truth["affine"] = np.array([1.001, 0.0])
+    true_cal = ptv.calibration_from_dict(truth)
+
+    rng = np.random.default_rng(1)
+    XYZ = rng.uniform([-30, -30, -15], [30, 30, 20], size=(40, 3))
+    xy = convert_arr_metric_to_pixel(
+        image_coordinates(XYZ, true_cal, cpar.get_multimedia_params()), cpar
+    )
+
+    # the exterior orientation stays fixed unless asked for, as in calib_particles
+    ptv.full_scipy_calibration(cal, XYZ, _targets(xy), cpar, flags=["scale"])
+
+    np.testing.assert_array_equal(cal.get_pos(), pos)
+    np.testing.assert_array_equal(cal.get_angles(), angs)
+    np.testing.assert_allclose(cal.get_affine(), [1.001, 0.0], atol=1e-7)
@@ -0,0 +1,84 @@
+"""Tests for the NumPy highpass backend against liboptv preprocess_image."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from imageio.v3 import imread
+from optv.image_processing import preprocess_image
+from optv.parameters import ControlParams
+
+from pyptv import ptv
+from pyptv.highpass import box_highpass
+from pyptv.processing import start_processing
+
+
+def _liboptv(img: np.ndarray, filter_size: int) -> np.ndarray:
+    cpar = ControlParams(1)
+    cpar.set_image_size((img.shape[1], img.shape[0]))
+    return preprocess_image(img, 0, cpar, filter_size)
+
+
+@pytest.mark.parametrize(
+    "shape, filter_size",
+    [((1024, 1280), 25), ((51, 51), 25), ((52, 60), 25), ((199, 130), 7), ((10, 12), 2), ((40, 30), 0)],
+)
+@pytest.mark.parametrize("workers, band_rows", [(1, None), (3, None), (2, 17), (4, 1)])
+def test_matches_preprocess_image(shape, filter_size, workers, band_rows):
+    rng = np.random.default_rng(sum(shape))
+    noise = rng.integers(0, 256, size=shape).astype(np.uint8)
+    particles = np.where(rng.random(shape) < 0.02, 250, 5).astype(np.uint8)
+    for img in (noise, particles):
+        out = box_highpass(img, filter_size, workers=workers, band_rows=band_rows)
+        assert out.dtype == np.uint8
+        np.testing.assert_array_equal(out, _liboptv(img, filter_size))
+
+
+def test_simple_highpass_backends(cavity):
+    exp = start_processing("parameters_Run1.yaml")
+    img = imread("img/cam1.10001")
+    expected = ptv.simple_highpass(img, exp.cpar)
+    np.testing.assert_array_equal(ptv.simple_highpass(img, exp.cpar, backend="numpy"), expected)
+    # strided input, as the quadrant views of a splitter image
+    wide = np.zeros((img.shape[0], 2 * img.shape[1]), np.uint8)
+    wide[:, 1::2] = img
+    np.testing.assert_array_equal(box_highpass(wide[:, 1::2], workers=2), expected)
+
+    with pytest.raises(ValueError, match="smaller than the 51x51"):
+        box_highpass(img[:50])
+    with pytest.raises(ValueError, match="uint8"):
+        box_highpass(img.astype(float))
+    with pytest.raises(ValueError, match="backend"):
+        ptv.simple_highpass(img, exp.cpar, backend="cuda")
+
+
+def test_sequence_loop_highpass_parameters(cavity):
+    ptv.py_sequence_loop(start_processing("parameters_Run1.yaml", 10001, 10001))
+    expected = Path("res/rt_is.10001").read_text()
+    default_targets = Path("img/cam1.10001_targets").read_text()
+
+    exp = start_processing("parameters_Run1.yaml", 10001, 10001)
+    exp.pm.parameters["ptv"].update(highpass_backend="numpy", highpass_workers=2)
+    ptv.py_sequence_loop(exp)
+    assert Path("res/rt_is.10001").read_text() == expected
+
+    # both backends follow the filter size
+    results = []
+    for backend in ("optv", "numpy"):
+        exp = start_processing("parameters_Run1.yaml", 10001, 10001)
+        exp.pm.parameters["ptv"].update(highpass_backend=backend, highpass_filter_size=5)
+        ptv.py_sequence_loop(exp)
+        results.append(Path("img/cam1.10001_targets").read_text())
+    assert results[0] == results[1] != default_targets
+
+
+def test_batch_workers_share_cpus(monkeypatch):
+    from pyptv import highpass
+
+    monkeypatch.setattr(highpass.os, "sched_getaffinity", lambda pid: set(range(16)), raising=False)
+    monkeypatch.setattr(highpass, "_processes", 1)
+    assert highpass.default_workers() == 8
+    highpass.share_cpus(4)
+    assert highpass.default_workers() == 4
+    highpass.share_cpus(32)
+    assert highpass.default_workers() == 1
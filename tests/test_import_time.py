@@ -0,0 +1,29 @@
+"""Headless entry points must not import calibration or GUI dependencies."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ["scipy.optimize", "scipy.sparse", "skimage", "traits.api", "pyface", "tqdm"]
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "pyptv.ptv",
+        "pyptv.pyptv_batch",
+        "pyptv.pyptv_batch_parallel",
+        "pyptv.pyptv_batch_plugins",
+    ],
+)
+def test_headless_import_is_light(module):
+    code = (
+        f"import json, sys; import {module}; "
+        f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    assert json.loads(out.strip().splitlines()[-1]) == []
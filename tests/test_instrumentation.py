@@ -0,0 +1,161 @@
+"""Tests for stage timing spans and counters."""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from pyptv.instrumentation import JsonlSink, MemorySink, Metrics, SummarySink, read_jsonl
+from pyptv.instrumentation import metrics as global_metrics
+from pyptv.processing import start_processing
+from pyptv.ptv import py_sequence_loop, py_trackcorr_init, run_tracker
+
+
+@pytest.fixture(autouse=True)
+def detach_metrics():
+    yield
+    global_metrics.detach()
+
+
+def test_disabled_metrics_record_nothing():
+    m = Metrics()
+    sink = MemorySink()
+    m.sinks.append(sink)
+
+    assert m.span("a") is m.span("b")  # shared no-op
+    with m.span("a"):
+        pass
+    m.count("n", 3)
+
+    assert sink.events == []
+    assert m.summary() == {"stages": {}, "counters": {}}
+
+
+def test_spans_counters_and_sinks(tmp_path, capsys):
+    m = Metrics()
+    memory = MemorySink()
+    m.enable(memory, JsonlSink(tmp_path / "m.jsonl"), SummarySink(), run="x")
+    for frame in (1, 2):
+        m.frame = frame
+        for cam in range(2):
+            with m.span("stage", cam=cam):
+                pass
+            m.count("targets", 10 + cam, cam=cam)
+    m.disable()
+
+    assert len(memory.events) == 8
+    assert memory.events[0]["frame"] == 1 and memory.events[0]["run"] == "x"
+    assert read_jsonl(tmp_path / "m.jsonl") == memory.events
+
+    summary = m.summary()
+    assert summary["stages"]["stage"]["count"] == 4
+    assert summary["counters"]["targets"] == {"frames": 2, "total": 42, "mean_per_frame": 21.0}
+    assert sum(m.stages["stage"].histogram().values()) == 4
+    assert "stage" in capsys.readouterr().out
+
+    # events from another process aggregate the same way
+    other = Metrics()
+    other.ingest(read_jsonl(tmp_path / "m.jsonl"))
+    assert other.summary()["counters"] == summary["counters"]
+
+
+def test_sequence_loop_stages(cavity):
+    sink = MemorySink()
+    global_metrics.reset()
+    global_metrics.enable(sink)
+    py_sequence_loop(start_processing("parameters_Run1.yaml", 10001, 10002))
+    global_metrics.disable()
+
+    summary = global_metrics.summary()
+    for stage in ("read", "highpass", "target_recognition", "matched_coords"):
+        assert summary["stages"][stage]["count"] == 2 * 4
+    for stage in ("correspondences", "point_positions", "write_rt_is"):
+        assert summary["stages"][stage]["count"] == 2
+    particles = global_metrics.counters["particles"]
+    assert sorted(particles) == [10001, 10002]
+    with open("res/rt_is.10001") as f:
+        assert particles[10001] == int(f.readline())
+
+
+def _ptv_is_digest():
+    return [
+        hashlib.md5(p.read_bytes()).hexdigest() for p in sorted(Path("res").glob("ptv_is.*"))
+    ]
+
+
+def test_run_tracker_stepped_matches_full_forward(cavity):
+    py_sequence_loop(start_processing("parameters_Run1.yaml"))
+    # the first pass adds particles to rt_is; compare against a repeat pass
+    for _ in range(2):
+        py_trackcorr_init(start_processing("parameters_Run1.yaml")).full_forward()
+    reference = _ptv_is_digest()
+
+    global_metrics.reset()
+    global_metrics.enable(MemorySink())
+    run_tracker(py_trackcorr_init(start_processing("parameters_Run1.yaml")))
+    global_metrics.disable()
+
+    assert _ptv_is_digest() == reference
+    assert global_metrics.summary()["stages"]["track.step"]["count"] == 4
+
+
+def test_memory_spans_nested_peaks():
+    import tracemalloc
+
+    import numpy as np
+
+    m = Metrics()
+    sink = MemorySink()
+    m.enable(sink, memory=True)
+    assert tracemalloc.is_tracing()
+    with m.span("outer"):
+        big = np.ones(4_000_000, dtype=np.uint8)
+        del big
+        with m.span("inner"):
+            small = np.ones(1_000_000, dtype=np.uint8)
+        del small
+    m.disable()
+    assert not tracemalloc.is_tracing()
+
+    inner, outer = sink.events
+    assert 1_000_000 <= inner["mem_peak"] < 2_000_000
+    assert inner["mem_net"] >= 1_000_000
+    # the outer peak survives the reset done by the inner span
+    assert outer["mem_peak"] >= 4_000_000
+    assert abs(outer["mem_net"]) < 100_000
+    memory = m.summary()["memory"]
+    assert memory["stages"]["outer"]["peak"] == outer["mem_peak"]
+    assert memory["chunks"]["main"]["mem_peak"] == outer["mem_peak"]
+
+
+def test_memory_per_chunk():
+    mib = 1024 * 1024
+    m = Metrics()
+    m.ingest(
+        {"type": "span", "name": "read", "seconds": 0.1, "mem_peak": peak * mib,
+         "mem_net": 0, "rss": rss * mib, "chunk": chunk}
+        for chunk, peak, rss in [("1-5", 2, 100), ("1-5", 3, 90), ("6-9", 1, 120)]
+    )
+    memory = m.memory_summary()
+    assert memory["chunks"] == {
+        "1-5": {"mem_peak": 3 * mib, "rss": 100 * mib},
+        "6-9": {"mem_peak": 1 * mib, "rss": 120 * mib},
+    }
+    if memory["available"]:
+        assert memory["chunks_fit"] == memory["available"] // (120 * mib)
+    assert "end-of-span RSS" in "\n".join(m._format_memory(memory)) or not memory["available"]
+
+
+def test_sequence_loop_memory(cavity, capsys):
+    global_metrics.reset()
+    global_metrics.enable(SummarySink(), memory=True)
+    py_sequence_loop(start_processing("parameters_Run1.yaml", 10001, 10001))
+    global_metrics.disable()
+
+    memory = global_metrics.summary()["memory"]
+    assert memory["image_pixels"] > 0
+    read = memory["stages"]["read"]
+    # the decoded image is the least a read has to allocate
+    assert read["peak"] >= memory["image_pixels"]
+    assert read["peak_per_mpixel"] == pytest.approx(read["peak"] / (memory["image_pixels"] / 1e6))
+    assert "peak MiB" in capsys.readouterr().out
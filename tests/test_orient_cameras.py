@@ -0,0 +1,172 @@
+"""Tests for parallel per-camera orientation."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pyptv import ptv
+from pyptv.ground_truth import generate_ground_truth
+from pyptv.standalone_calibration import load_parameter_manager, run_standalone_calibration
+
+
+def _setup(cavity: Path):
+    yaml_path = cavity / "parameters_Run1.yaml"
+    gt = generate_ground_truth(yaml_path, noise_sigma_px=0.0, seed=0)
+    pm = load_parameter_manager(yaml_path)
+    return yaml_path, gt, pm
+
+
+def _perturbed_cals(yaml_path: Path, pm):
+    cals = []
+    for cam, ori in enumerate(pm.parameters["cal_ori"]["img_ori"][: pm.num_cams]):
+        ori = yaml_path.parent / ori
+        cal = ptv.Calibration()
+        cal.from_file(str(ori), str(ori).replace(".ori", ".addpar"))
+        cal.set_pos(cal.get_pos() + np.array([1.0, -1.0, 0.5]) * (cam + 1))
+        cal.set_angles(cal.get_angles() + 0.002)
+        cals.append(cal)
+    return cals
+
+
+def test_orient_cameras_parallel_matches_serial(cavity: Path):
+    yaml_path, gt, pm = _setup(cavity)
+    ptv_params = pm.get_parameter("ptv")
+
+    def tasks():
+        return [
+            {
+                "cam": cam,
+                "mode": "fine",
+                "cal": cal,
+                "xyz": gt.xyz,
+                "xy": gt.xy[cam],
+                "pnr": gt.pnr,
+                "flags": [],
+            }
+            for cam, cal in enumerate(_perturbed_cals(yaml_path, pm))
+        ]
+
+    serial = {r["cam"]: r for r in ptv.orient_cameras(tasks(), ptv_params, pm.num_cams, n_workers=1)}
+    parallel = list(ptv.orient_cameras(tasks(), ptv_params, pm.num_cams, n_workers=2))
+
+    assert sorted(r["cam"] for r in parallel) == list(range(pm.num_cams))
+    for result in parallel:
+        ref = serial[result["cam"]]
+        assert result["fallback"] is False
+        np.testing.assert_allclose(result["cal"]["pos"], ref["cal"]["pos"])
+        np.testing.assert_allclose(result["cal"]["angs"], ref["cal"]["angs"])
+        np.testing.assert_allclose(result["residuals"], ref["residuals"])
+
+
+def test_orient_cameras_sortgrid(cavity: Path, monkeypatch):
+    yaml_path, gt, pm = _setup(cavity)
+    cals = ptv._read_calibrations(
+        ptv._populate_cpar(pm.get_parameter("ptv"), pm.num_cams), pm.num_cams
+    )
+
+    # detections in shuffled order must be matched back to the known points
+    rng = np.random.default_rng(0)
+    tasks = []
+    for cam, cal in enumerate(cals):
+        order = rng.permutation(len(gt.pnr))
+        tasks.append(
+            {"cam": cam, "mode": "sortgrid", "cal": cal, "xyz": gt.xyz, "xy": gt.xy[cam][order]}
+        )
+
+    for result in ptv.orient_cameras(tasks, pm.get_parameter("ptv"), pm.num_cams, n_workers=2):
+        cam = result["cam"]
+        matched = result["pnr"] != -999
+        assert matched.sum() == len(gt.pnr)
+        np.testing.assert_allclose(
+            result["xy"][matched], gt.xy[cam][result["pnr"][matched]], atol=1e-6
+        )
+
+
+def test_run_standalone_calibration_workers(cavity: Path, monkeypatch):
+    yaml_path, gt, pm = _setup(cavity)
+
+    cals = run_standalone_calibration(
+        yaml_path, gt.xyz, gt.xy, gt.pnr, flags=[], init_external="first4", n_workers=2
+    )
+
+    assert len(cals) == pm.num_cams
+    truth = ptv._read_calibrations(
+        ptv._populate_cpar(pm.get_parameter("ptv"), pm.num_cams), pm.num_cams
+    )
+    for cal, ref in zip(cals, truth):
+        np.testing.assert_allclose(cal.get_pos(), ref.get_pos(), atol=1e-3)
+
+
+def test_orient_fallback_only_on_errors(cavity: Path, monkeypatch):
+    import optv.orientation
+
+    yaml_path, gt, pm = _setup(cavity)
+    cal = _perturbed_cals(yaml_path, pm)[0]
+    task = {
+        "cam": 0, "mode": "fine", "cal": cal, "xyz": gt.xyz, "xy": gt.xy[0], "pnr": gt.pnr,
+        "flags": [], "scipy_fallback": True,
+    }
+
+    def fail(*args):
+        raise ValueError("orientation failed")
+
+    monkeypatch.setattr(optv.orientation, "full_calibration", fail)
+    (result,) = ptv.orient_cameras([task], pm.get_parameter("ptv"), pm.num_cams, n_workers=1)
+    assert result["fallback"] is True
+
+    def interrupt(*args):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(optv.orientation, "full_calibration", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        list(ptv.orient_cameras([task], pm.get_parameter("ptv"), pm.num_cams, n_workers=1))
+
+
+def test_orient_failed_initial_guess(cavity: Path, monkeypatch):
+    import optv.orientation
+
+    yaml_path, gt, pm = _setup(cavity)
+    cal = _perturbed_cals(yaml_path, pm)[0]
+    task = {
+        "cam": 0, "mode": "fine", "cal": cal, "xyz": gt.xyz, "xy": gt.xy[0], "pnr": gt.pnr,
+        "init_xyz": gt.xyz[:4], "init_xy": gt.xy[0][:4], "flags": [],
+    }
+    monkeypatch.setattr(optv.orientation, "external_calibration", lambda *args: False)
+    (result,) = ptv.orient_cameras([task], pm.get_parameter("ptv"), pm.num_cams, n_workers=1)
+    # the fine step is skipped, but its keys are there
+    assert result["success"] is False
+    assert result["fallback"] is False
+    assert result["targ_ix"] == [] and result["residuals"].shape == (0, 2)
+
+
+def test_orient_cameras_pools_only_fine_steps(cavity: Path, monkeypatch):
+    import concurrent.futures
+
+    yaml_path, gt, pm = _setup(cavity)
+    pools = []
+    executor = concurrent.futures.ProcessPoolExecutor
+
+    def spy(*args, **kwargs):
+        pools.append(kwargs)
+        return executor(*args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", spy)
+    monkeypatch.setattr(ptv.os, "cpu_count", lambda: 4)
+    cals = _perturbed_cals(yaml_path, pm)
+    sortgrid = [
+        {"cam": cam, "mode": "sortgrid", "cal": cal, "xyz": gt.xyz, "xy": gt.xy[cam]}
+        for cam, cal in enumerate(cals)
+    ]
+    assert len(list(ptv.orient_cameras(sortgrid, pm.get_parameter("ptv"), pm.num_cams))) == 4
+    assert pools == []
+
+    fine = [
+        {"cam": cam, "mode": "fine", "cal": cal, "xyz": gt.xyz, "xy": gt.xy[cam],
+         "pnr": gt.pnr, "flags": []}
+        for cam, cal in enumerate(cals[:2])
+    ]
+    assert len(list(ptv.orient_cameras(fine, pm.get_parameter("ptv"), pm.num_cams))) == 2
+    assert [kwargs["max_workers"] for kwargs in pools] == [2]
@@ -0,0 +1,99 @@
+"""Tests for the compiled parameter cache."""
+
+from __future__ import annotations
+
+import pickle
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+
+from pyptv import parameter_cache
+from pyptv.parameter_cache import compile_parameters, load_yaml
+from pyptv.parameter_manager import ParameterManager
+from pyptv.ptv import py_start_proc_c
+
+
+@pytest.fixture
+def yaml_path(tmp_path: Path):
+    src = Path(__file__).parent / "test_cavity" / "parameters_Run1.yaml"
+    dst = tmp_path / "parameters_Run1.yaml"
+    shutil.copyfile(src, dst)
+    parameter_cache.clear_parameter_cache()
+    yield dst
+    parameter_cache.clear_parameter_cache()
+
+
+def test_load_yaml_returns_independent_copies(yaml_path):
+    digest, first = load_yaml(yaml_path)
+    first["ptv"]["imx"] = -1
+
+    again, second = load_yaml(yaml_path)
+    assert again == digest
+    assert second == yaml.safe_load(yaml_path.read_text())
+    assert len(parameter_cache._parsed) == 1
+
+
+def test_load_yaml_sees_edits(yaml_path):
+    digest, params = load_yaml(yaml_path)
+    params["ptv"]["imx"] = 640
+    yaml_path.write_text(yaml.safe_dump(params))
+
+    new_digest, edited = load_yaml(yaml_path)
+    assert new_digest != digest
+    assert edited["ptv"]["imx"] == 640
+
+
+def test_parameter_manager_records_digest(yaml_path):
+    pm = ParameterManager()
+    pm.from_yaml(yaml_path)
+    assert pm.yaml_digest == load_yaml(yaml_path)[0]
+
+
+def test_bundle_pickles_and_starts_processing(yaml_path, monkeypatch):
+    bundle = compile_parameters(yaml_path)
+    assert compile_parameters(yaml_path) is bundle
+
+    restored = pickle.loads(pickle.dumps(bundle))
+    assert restored == bundle
+
+    pm = restored.to_manager()
+    pm.parameters["ptv"]["imx"] = -1
+    assert bundle.parameters["ptv"]["imx"] != -1
+    assert pm.yaml_path == yaml_path.resolve()
+
+    monkeypatch.chdir(Path(__file__).parent / "test_cavity")
+    cpar, *_rest = py_start_proc_c(restored)
+    assert cpar.get_num_cams() == bundle.num_cams
+
+
+def test_compile_parameters_rejects_missing_section(yaml_path):
+    params = yaml.safe_load(yaml_path.read_text())
+    del params["criteria"]
+    yaml_path.write_text(yaml.safe_dump(params))
+
+    with pytest.raises((ValueError, KeyError)):
+        compile_parameters(yaml_path)
+
+
+def test_optv_objects_built_once_per_content(yaml_path, monkeypatch):
+    monkeypatch.chdir(Path(__file__).parent / "test_cavity")
+    bundle = compile_parameters(yaml_path)
+    # the objects built to validate the bundle are the ones a worker gets
+    cpar, spar, vpar, track_par, tpar, _cals, _epar = py_start_proc_c(bundle.to_manager())
+    again = py_start_proc_c(bundle.to_manager())
+    assert again[0] is cpar and again[2] is vpar and again[3] is track_par and again[4] is tpar
+    # the frame range is set per run, so SequenceParams are never shared
+    assert again[1] is not spar
+
+    pm = ParameterManager()
+    pm.from_yaml(yaml_path)
+    assert py_start_proc_c(pm)[0] is cpar
+
+    # an edit in memory builds new objects
+    pm.parameters["ptv"]["imx"] = 640
+    edited = py_start_proc_c(pm)[0]
+    assert edited is not cpar
+    assert edited.get_image_size() == (640, bundle.parameters["ptv"]["imy"])
+    assert cpar.get_image_size()[0] == bundle.parameters["ptv"]["imx"]
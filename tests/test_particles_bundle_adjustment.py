@@ -0,0 +1,169 @@
+"""Tests for joint bundle adjustment of calibration from particles."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from optv.imgcoord import image_coordinates
+from optv.transforms import convert_arr_metric_to_pixel
+
+from pyptv import ptv
+from pyptv.parameter_manager import ParameterManager
+
+
+def _project(points, cals, cpar):
+    mm_params = cpar.get_multimedia_params()
+    return np.stack(
+        [
+            convert_arr_metric_to_pixel(image_coordinates(points, cal, mm_params), cpar)
+            for cal in cals
+        ]
+    )
+
+
+def _perturb(cal, dpos, dang):
+    cal.set_pos(cal.get_pos() + np.asarray(dpos))
+    cal.set_angles(cal.get_angles() + np.asarray(dang))
+
+
+def test_calibration_flags_roundtrip():
+    cal = ptv.calibration_from_dict(
+        {
+            "pos": np.zeros(3),
+            "angs": np.zeros(3),
+            "prim_point": np.array([0.1, -0.2, 60.0]),
+            "rad_dist": np.array([1e-4, 2e-6, 0.0]),
+            "decent": np.zeros(2),
+            "affine": np.array([1.0, 0.0]),
+            "glass": np.array([0.0, 0.0, 100.0]),
+        }
+    )
+    flags = ["cc", "xh", "k2", "shear"]
+    np.testing.assert_allclose(
+        ptv.get_calibration_flags(cal, flags), [60.0, 0.1, 2e-6, 0.0]
+    )
+
+    ptv.set_calibration_flags(cal, flags, [61.0, 0.3, 0.0, 1e-3])
+    np.testing.assert_allclose(cal.get_primary_point(), [0.3, -0.2, 61.0])
+    np.testing.assert_allclose(cal.get_radial_distortion(), [1e-4, 0.0, 0.0])
+    np.testing.assert_allclose(cal.get_affine(), [1.0, 1e-3])
+
+
+def test_particles_ba_jac_sparsity_shape():
+    observed = np.array([[1, 1, 0], [1, 0, 1], [0, 1, 1]], dtype=bool)
+    pattern = ptv.particles_ba_jac_sparsity(observed, fixed_cam=0, n_flags=1)
+
+    # 6 observations * 2 rows + gauge row; 1 + 7 + 7 camera columns + 9 points
+    assert pattern.shape == (13, 24)
+    dense = pattern.toarray()
+    # camera 0 rows only see its own flag column and their point
+    assert dense[0, 0] and not dense[0, 1:15].any()
+    assert dense[0, 15:18].all() and not dense[0, 18:].any()
+    # gauge row depends on the positions of the free cameras only
+    assert dense[-1, [1, 2, 3, 8, 9, 10]].all()
+    assert dense[-1].sum() == 6
+
+
+def test_particles_bundle_adjustment_recovers_cameras(cavity):
+    pm = ParameterManager()
+    pm.from_yaml(cavity / "parameters_Run1.yaml")
+    cpar, *_rest, cals, _epar = ptv.py_start_proc_c(pm)
+    truth = [ptv.calibration_to_dict(cal) for cal in cals]
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform([-25, -25, -10], [25, 25, 15], size=(300, 3))
+    detections = _project(points, cals, cpar)
+    detections[rng.random(detections.shape[:2]) < 0.2] = np.nan
+
+    _perturb(cals[1], [2.0, -1.0, 1.5], [0.01, -0.005, 0.008])
+    _perturb(cals[3], [-1.0, 1.0, 0.5], [0.0, 0.004, 0.0])
+    start = points + rng.normal(0, 0.3, size=points.shape)
+
+    refined, mask, report = ptv.particles_bundle_adjustment(
+        start, detections, cpar, cals, max_points=250
+    )
+
+    assert report["n_points"] == 250 == mask.sum()
+    assert report["rms_initial"] > 1.0
+    assert report["rms_final"] < 0.05
+    for cal, state in zip(cals, truth):
+        np.testing.assert_allclose(cal.get_pos(), state["pos"], atol=0.01)
+        np.testing.assert_allclose(cal.get_angles(), state["angs"], atol=1e-4)
+    np.testing.assert_allclose(refined, points[mask], atol=0.01)
+
+
+def _write_frame(frame, points, detections):
+    num_cams = detections.shape[0]
+    pnr = np.full((len(points), num_cams), -1, dtype=int)
+    for cam in range(num_cams):
+        seen = np.flatnonzero(np.isfinite(detections[cam, :, 0]))
+        pnr[seen, cam] = np.arange(seen.size)
+        rows = [
+            f"{i:4d} {x:9.4f} {y:9.4f}     9     3     3   500    -1"
+            for i, (x, y) in enumerate(detections[cam, seen])
+        ]
+        Path(f"img/cam{cam + 1}.{frame}_targets").write_text(
+            "\n".join([str(seen.size), *rows]) + "\n"
+        )
+
+    rt_is = [str(len(points))]
+    ptv_is = [str(len(points))]
+    for i, (xyz, p) in enumerate(zip(points, pnr)):
+        rt_is.append(
+            f"{i + 1:4d} {xyz[0]:9.3f} {xyz[1]:9.3f} {xyz[2]:9.3f} "
+            + " ".join(f"{v:4d}" for v in p)
+        )
+        ptv_is.append(f"  -1   -1 {xyz[0]:10.3f} {xyz[1]:10.3f} {xyz[2]:10.3f}")
+    Path(f"res/rt_is.{frame}").write_text("\n".join(rt_is) + "\n")
+    Path(f"res/ptv_is.{frame}").write_text("\n".join(ptv_is) + "\n")
+
+
+def test_calib_particles_joint_mode(cavity):
+    yaml_path = cavity / "parameters_Run1.yaml"
+    params = yaml.safe_load(yaml_path.read_text())
+    params["shaking"].update(
+        {
+            "shaking_first_frame": 10001,
+            "shaking_last_frame": 10003,
+            "shaking_bundle_adjustment": True,
+            "shaking_ba_max_points": 0,
+        }
+    )
+    yaml_path.write_text(yaml.safe_dump(params, sort_keys=False))
+
+    pm = ParameterManager()
+    pm.from_yaml(yaml_path)
+    cpar, spar, vpar, track_par, tpar, cals, epar = ptv.py_start_proc_c(pm)
+    truth = [ptv.calibration_to_dict(cal) for cal in cals]
+
+    rng = np.random.default_rng(1)
+    (cavity / "res").mkdir(exist_ok=True)
+    for frame in range(10001, 10004):
+        points = rng.uniform([-25, -25, -10], [25, 25, 15], size=(60, 3))
+        detections = _project(points, cals, cpar)
+        detections[rng.random(detections.shape[:2]) < 0.15] = np.nan
+        _write_frame(frame, points + rng.normal(0, 0.2, size=points.shape), detections)
+
+    # the .ori file of camera 3 has drifted
+    ori = cavity / "cal" / "cam3.tif.ori"
+    addpar = cavity / "cal" / "cam3.tif.addpar"
+    _perturb(cals[2], [1.5, 1.0, -1.0], [-0.006, 0.004, 0.0])
+    cals[2].write(str(ori).encode(), str(addpar).encode())
+
+    exp = type("Exp", (), {})()
+    exp.pm, exp.cpar, exp.spar, exp.vpar, exp.tpar = pm, cpar, spar, vpar, tpar
+    exp.cals = cals
+
+    targs_all, targ_ix_all, residuals_all = ptv.calib_particles(exp)
+
+    assert len(targs_all) == len(targ_ix_all) == len(residuals_all) == 4
+    for targs, residuals in zip(targs_all, residuals_all):
+        assert residuals.shape == (len(targs), 2)
+        assert np.abs(residuals).max() * 100 < 0.1
+
+    written = ptv._read_calibrations(cpar, 4)
+    np.testing.assert_allclose(written[2].get_pos(), truth[2]["pos"], atol=0.01)
+    np.testing.assert_allclose(written[2].get_angles(), truth[2]["angs"], atol=1e-4)
@@ -0,0 +1,83 @@
+"""Tests for cProfile support of batch runs."""
+
+import pstats
+
+import pytest
+
+from pyptv import ptv
+from pyptv.profiling import (
+    MERGED_COLLAPSED,
+    MERGED_PSTATS,
+    collapsed_stacks,
+    merge_profile_dir,
+    optv_call_boundaries,
+    profiled,
+    top_functions,
+)
+from pyptv.processing import start_processing
+
+
+def _names(stats: pstats.Stats) -> set:
+    return {name for (_filename, _line, name) in stats.stats}
+
+
+def test_call_boundaries_are_restored():
+    original = ptv.correspondences, ptv.Tracker
+    with optv_call_boundaries():
+        assert ptv.correspondences is not original[0]
+        assert ptv.correspondences.__wrapped__ is original[0]
+        assert issubclass(ptv.Tracker, original[1])
+    assert (ptv.correspondences, ptv.Tracker) == original
+
+
+def test_profiled_none_is_noop():
+    with profiled(None) as profiler:
+        assert profiler is None
+
+
+def test_optv_calls_are_separate_entries(cavity):
+    output = cavity / "prof" / "main.pstats"
+    with profiled(output):
+        exp = start_processing("parameters_Run1.yaml", 10000, 10001)
+        ptv.py_sequence_loop(exp)
+        ptv.run_tracker(ptv.py_trackcorr_init(exp))
+
+    names = _names(pstats.Stats(str(output)))
+    for name in ("correspondences", "target_recognition", "preprocess_image", "Tracker.full_forward"):
+        assert name in names
+
+    stats = merge_profile_dir(output.parent)
+    assert (output.parent / MERGED_PSTATS).exists()
+    lines = (output.parent / MERGED_COLLAPSED).read_text().splitlines()
+    assert lines
+    stack, us = lines[0].rsplit(" ", 1)
+    assert int(us) > 0 and stack
+    assert any(";correspondences (correspondences.pyx:1)" in line for line in lines)
+    assert top_functions(stats, "tottime", 3)[0]["tottime"] > 0
+
+
+def test_collapsed_stacks_preserve_own_time(cavity):
+    output = cavity / "prof.pstats"
+    with profiled(output):
+        sum(i * i for i in range(20000))
+    stats = pstats.Stats(str(output))
+    own = sum(entry[2] for entry in stats.stats.values())
+    stacks = collapsed_stacks(stats, min_share=0.0)
+    assert sum(stacks.values()) == pytest.approx(own * 1e6, rel=0.05, abs=5)
+
+
+def test_parallel_run_merges_worker_profiles(cavity):
+    from pyptv.pyptv_batch_parallel import main as run_parallel
+
+    profile_dir = cavity / "res" / "profile"
+    run_parallel(
+        cavity / "parameters_Run1.yaml", 10000, 10003, n_processes=2, mode="both",
+        profile_dir=profile_dir,
+    )
+    files = sorted(p.name for p in profile_dir.glob("*.pstats"))
+    assert files == ["tracking.pstats", "worker_10000-10001.pstats", "worker_10002-10003.pstats"]
+
+    stats = merge_profile_dir(profile_dir)
+    calls = {name: entry[1] for (_f, _l, name), entry in stats.stats.items()}
+    # one correspondences call per frame, summed over both workers
+    assert calls["correspondences"] == 4
@@ -7,6 +7,8 @@ from optv.correspondences import correspondences, MatchedCoords
 from optv.tracker import default_naming
 from optv.orientation import point_positions
 
+from pyptv.frame_source import open_frame_source
+
 
 
 class Sequence:
@@ -73,41 +75,27 @@ class Sequence:
         last_frame = spar.get_last()
         print(f" From {first_frame = } to {last_frame = }")
 
+        # when we work with splitter, we read only one image
+        base_image_name = spar.get_img_base_name(0)
+
+        # Handle bytes vs string issue
+        if isinstance(base_image_name, bytes):
+            base_image_name = base_image_name.decode('utf-8')
+
+        # one directory listing finds all frames, missing ones are reported up front
+        seq_params = dict(self.exp.pm.get_parameter('sequence')) if hasattr(self.exp, 'pm') else {}
+        seq_params['base_name'] = [base_image_name]
+        source = open_frame_source(seq_params, 1)
+        source.check_frames(first_frame, last_frame)
+
         for frame in range(first_frame, last_frame + 1):
             print(f"Processing frame {frame}")
 
             detections = []
             corrected = []
 
-            # when we work with splitter, we read only one image
-            base_image_name = spar.get_img_base_name(0)
-            
-            # Handle bytes vs string issue
-            if isinstance(base_image_name, bytes):
-                base_image_name = base_image_name.decode('utf-8')
-            
-            print(f"Base image name: '{base_image_name}' (type: {type(base_image_name)}) for frame {frame}")
-            
-            # Safe string formatting - handle cases where format specifier might be missing
-            try:
-                imname = Path(base_image_name % frame)  # works with jumps from 1 to 10
-                print(f"Formatted image name: {imname}")
-            except (TypeError, ValueError) as e:
-                print(f"String formatting failed for '{base_image_name}' with frame {frame}: {e}")
-                # Fallback: assume base_image_name is already formatted or needs frame appended
-                if '%' not in base_image_name:
-                    # No format specifier, try appending frame number
-                    base_path = Path(base_image_name)
-                    imname = base_path.parent / f"{base_path.stem}_{frame:04d}{base_path.suffix}"
-                    print(f"Using fallback image name: {imname}")
-                else:
-                    raise ValueError(f"String formatting error with base_image_name '{base_image_name}': {e}")
-            
-            if not imname.exists():
-                raise FileNotFoundError(f"{imname} does not exist")
-            
             # now we read and split 
-            full_image = imread(imname)
+            full_image = source.read(0, frame)
             if full_image.ndim > 2:
                 from skimage.color import rgb2gray
                 full_image = rgb2gray(full_image)
@@ -215,4 +203,5 @@ class Sequence:
                         raise
 
         
+        source.close()
         print("Sequence completed successfully")
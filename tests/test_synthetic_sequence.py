@@ -0,0 +1,152 @@
+"""Tests for the synthetic particle-image sequence renderer."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pyptv.processing import start_processing
+from pyptv.cli import cli
+from pyptv.ptv import py_sequence_loop, read_rt_is_file, read_targets
+from pyptv.synthetic_sequence import (
+    FLOWS,
+    ParticleSequenceSpec,
+    TrackingDataSpec,
+    generate_tracking_data,
+    load_ground_truth,
+    render_particle_sequence,
+    render_particles,
+    score_tracking,
+    simulate_trajectories,
+)
+
+VOLUME = ((-10.0, 10.0), (-10.0, 10.0), (-5.0, 5.0))
+
+
+@pytest.mark.parametrize("flow", sorted(FLOWS))
+def test_trajectories_stay_in_volume(flow):
+    traj = simulate_trajectories(500, range(1, 21), VOLUME, flow=flow, speed=0.5, seed=1)
+    assert traj.xyz.shape == (20, 500, 3)
+    lo = np.array([v[0] for v in VOLUME])
+    hi = np.array([v[1] for v in VOLUME])
+    assert np.all(traj.xyz >= lo) and np.all(traj.xyz <= hi)
+
+    # a particle keeping its id moves by at most the flow speed
+    same = traj.ids[1:] == traj.ids[:-1]
+    step = np.linalg.norm(traj.xyz[1:] - traj.xyz[:-1], axis=-1)
+    assert same.any()
+    assert step[same].max() <= 0.5 * np.sqrt(3) + 1e-9
+
+    again = simulate_trajectories(500, range(1, 21), VOLUME, flow=flow, speed=0.5, seed=1)
+    np.testing.assert_array_equal(traj.xyz, again.xyz)
+
+
+def test_particles_leaving_get_new_ids():
+    traj = simulate_trajectories(200, range(30), VOLUME, flow="uniform", speed=1.0)
+    assert traj.ids.max() >= 200
+    assert len(np.unique(traj.ids[-1])) == 200
+    with pytest.raises(ValueError):
+        simulate_trajectories(10, range(2), VOLUME, flow="nope")
+
+
+def test_render_particles_centroid():
+    xy = np.array([[20.3, 10.7], [50.0, 40.25]])
+    img = render_particles(xy, np.array([200.0, 100.0]), (64, 80), sigma_px=1.2)
+    assert img.dtype == np.uint8 and img.shape == (64, 80)
+    assert img[10, 20] == img.max()
+    # centroids over pixel centers (index + 0.5), as target_recognition reports them
+    yy, xx = np.mgrid[5:17, 14:27] + 0.5
+    patch = img[5:17, 14:27].astype(float)
+    assert np.sum(xx * patch) / patch.sum() == pytest.approx(20.3, abs=0.05)
+    assert np.sum(yy * patch) / patch.sum() == pytest.approx(10.7, abs=0.05)
+    # spots crossing the border are clipped, not wrapped
+    render_particles(np.array([[0.2, 63.9]]), np.array([200.0]), (64, 80))
+
+
+def test_rendered_sequence_is_reconstructed(cavity):
+    spec = ParticleSequenceSpec(n_particles=300, first=10000, last=10001, seed=3)
+    summary = render_particle_sequence(cavity / "parameters_Run1.yaml", spec)
+    assert summary["visible_fraction"] > 0.9
+
+    gt = load_ground_truth(summary["ground_truth"])
+    assert gt["xyz"].shape == (2, 300, 3)
+    assert gt["xy"].shape == (2, 4, 300, 2)
+    assert Path("img/cam4.10001").exists()
+
+    py_sequence_loop(start_processing("parameters_Run1.yaml", 10000, 10000))
+    found = np.array(read_rt_is_file("res/rt_is.10000"))[:, :3]
+    assert len(found) > 0.7 * 300
+    # nearly every reconstructed particle is close to a true one
+    dist = np.linalg.norm(found[:, None, :] - gt["xyz"][0][None, :, :], axis=-1).min(axis=1)
+    assert np.median(dist) < 0.02
+    assert np.mean(dist < 0.1) > 0.9
+
+
+def test_tracking_data_is_consistent(cavity):
+    spec = TrackingDataSpec(
+        n_particles=400, first=10000, last=10002, dropout=0.1, ghost_rate=0.1, seed=5
+    )
+    summary = generate_tracking_data(cavity / "parameters_Run1.yaml", spec)
+    assert summary["ghosts_per_frame"] == pytest.approx(0.1 * 400, rel=0.2)
+    assert 0.8 * 400 < summary["targets_per_frame"] / 4 < 0.95 * 400
+
+    gt = load_ground_truth(summary["ground_truth"])
+    n_rows = gt["row_counts"][0]
+    rt_is = np.array(read_rt_is_file("res/rt_is.10000"))
+    assert len(rt_is) == n_rows
+    row_ids = gt["row_ids"][:n_rows]
+    true_rows = np.flatnonzero(row_ids >= 0)
+    truth = gt["xyz"][0][np.searchsorted(gt["ids"][0], row_ids[true_rows])]
+    np.testing.assert_allclose(rt_is[true_rows, :3], truth, atol=1e-3)
+
+    for cam in range(4):
+        targets = read_targets(f"img/cam{cam + 1}", 10000)
+        assert [t.pnr() for t in targets] == list(range(len(targets)))
+        ys = [t.pos()[1] for t in targets]
+        assert ys == sorted(ys)
+        # every target points back at the rt_is row of its own particle
+        for t in targets:
+            if t.tnr() >= 0:
+                assert rt_is[t.tnr(), 3 + cam] == t.pnr()
+                assert row_ids[t.tnr()] >= 0
+
+
+def test_targets_file_columns(tmp_path):
+    from pyptv.synthetic_sequence import _write_targets_file
+
+    xy = np.array([[1.5, 2.25], [300.125, 400.0625]])
+    tnr = np.array([7, -1])
+    _write_targets_file(tmp_path / "cam1.10000_targets", xy, tnr)
+    # the layout of ptv.write_targets
+    rows = np.column_stack([np.arange(2), xy, np.full((2, 3), (9, 3, 3)), np.full(2, 1000), tnr])
+    np.savetxt(tmp_path / "expected", rows, fmt="%4d %9.4f %9.4f %5d %5d %5d %5d %5d", header="2", comments="")
+    assert (tmp_path / "cam1.10000_targets").read_text() == (tmp_path / "expected").read_text()
+
+
+def test_tracking_score(cavity, capsys):
+    argv = ["synth", "parameters_Run1.yaml", "--targets", "--particles", "300",
+            "--first", "10000", "--last", "10003", "--noise-px", "0.05", "--ghosts", "0.05", "--json"]
+    assert cli(argv) == 0
+    capsys.readouterr()
+    assert cli(["track", "parameters_Run1.yaml", "--first", "10000", "--last", "10003", "--score", "--json"]) == 0
+    score = json.loads(capsys.readouterr().out)["score"]
+    assert score["true_links"] > 0.9 * 3 * 300
+    assert score["precision"] > 0.95 and score["recall"] > 0.95
+    assert score == score_tracking(cavity / "res")
+
+
+def test_tracking_score_empty_frame(tmp_path):
+    # frame 2 has no generated rows, but the tracker added and linked one
+    np.savez(
+        tmp_path / "truth.npz",
+        frames=np.array([1, 2, 3]),
+        row_counts=np.array([2, 0, 2]),
+        row_ids=np.array([5, 6, 5, 7]),
+    )
+    (tmp_path / "ptv_is.1").write_text("2\n -1   0 0 0 0\n -1  -1 0 0 0\n")
+    (tmp_path / "ptv_is.2").write_text("1\n  0   1 0 0 0\n")
+    score = score_tracking(tmp_path, tmp_path / "truth.npz")
+    assert score == {
+        "links": 2, "correct_links": 0, "true_links": 0, "precision": 0.0, "recall": 0.0,
+    }